@@ -0,0 +1,196 @@
+"""
+Progressive reading of COPC (Cloud Optimized Point Cloud) files.
+
+A COPC file is a LAZ 1.4 file whose points are stored in an octree: level 0
+holds a sparse sample of the whole cloud and every deeper level halves the
+point spacing.  CopcPointSource opens such a file as a layer by reading only
+the coarse levels that fit an overview budget, then refines the part of the
+cloud the camera is looking at with deeper levels, choosing the deepest level
+whose points still fit the layer's point budget.  Memory therefore stays
+bounded no matter how large the file is.
+
+Requires laspy with the lazrs backend (laspy.CopcReader).
+"""
+
+import threading
+from math import ceil, log2
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+try:
+    import laspy
+    from laspy.copc import Bounds, load_octree_for_query
+    LASPY_AVAILABLE = True
+except ImportError:
+    LASPY_AVAILABLE = False
+
+DEFAULT_OVERVIEW_BUDGET = 2_000_000
+DEFAULT_POINT_BUDGET = 10_000_000
+
+
+def is_copc_file(file_path: str) -> bool:
+    """
+    True if the file is a COPC LAZ (its first VLR is the COPC info VLR) that
+    laspy can decompress; without a LAZ backend it loads like any LAZ file.
+    """
+    if not LASPY_AVAILABLE or not laspy.LazBackend.detect_available():
+        return False
+    try:
+        with laspy.open(file_path) as reader:
+            return any(vlr.user_id == "copc" for vlr in reader.header.vlrs)
+    except Exception:
+        return False
+
+
+class CopcPointSource:
+    """Octree-level streaming access to one COPC file."""
+
+    def __init__(self, file_path: str, origin: Optional[Sequence[float]] = None,
+                 overview_budget: int = DEFAULT_OVERVIEW_BUDGET,
+                 point_budget: int = DEFAULT_POINT_BUDGET):
+        if not LASPY_AVAILABLE:
+            raise ImportError("Reading COPC files requires laspy (with the lazrs backend)")
+        from fileio.las_loader import header_descriptor, local_origin
+        self.file_path = file_path
+        self._reader = laspy.CopcReader.open(file_path)
+        self._lock = threading.Lock()  # the reader shares one file handle
+        self.header = self._reader.header
+        self.header_info = header_descriptor(self.header)
+        info = self._reader.copc_info
+        self.root_spacing = float(info.spacing)
+        self.origin = np.asarray(origin if origin is not None else local_origin(self.header.mins), dtype=np.float64)
+        self.overview_budget = overview_budget
+        self.point_budget = point_budget
+        self.overview_level = -1
+        self._overview = None
+        # What the layer currently holds beyond the overview
+        self.detail_bounds = None
+        self.detail_level = -1
+
+    def close(self):
+        with self._lock:
+            self._reader.__exit__(None, None, None)
+
+    def level_point_counts(self, bounds: Optional[Sequence[float]] = None, levels: Optional[range] = None) -> Dict[int, int]:
+        """
+        Points per octree level within world XY ``bounds`` (xmin, ymin, xmax, ymax),
+        from the hierarchy only (nothing is decompressed).  Counts are for
+        whole nodes, so they overestimate slightly at the edges of ``bounds``.
+        """
+        with self._lock:
+            nodes = load_octree_for_query(
+                self._reader.source, self._reader.copc_info, self._reader.root_page,
+                query_bounds=self._bounds(bounds), level_range=levels
+            )
+        counts = {}
+        for node in nodes:
+            counts[node.key.level] = counts.get(node.key.level, 0) + node.point_count
+        return counts
+
+    def level_for_spacing(self, spacing: float) -> int:
+        """Shallowest octree level whose point spacing is at most ``spacing``."""
+        if spacing <= 0:
+            return 0
+        return max(0, ceil(log2(self.root_spacing / spacing)))
+
+    def overview(self):
+        """
+        Read the coarsest levels of the whole file that fit the overview budget.
+
+        Returns:
+            dict: las (LasColumns), points (float32 Nx3 relative to origin),
+            origin, dims and level, shaped like load_point_cloud_data's result
+        """
+        counts = self.level_point_counts()
+        self.overview_level = self._deepest_level_within(counts, self.overview_budget, first_level=0)
+        las = self._query(None, range(0, self.overview_level + 1))
+        print(f"[COPC] Overview of '{self.file_path}': levels 0-{self.overview_level}, "
+              f"{las.point_count:,} of {self.header.point_count:,} points")
+        self._overview = las
+        self.detail_bounds = None
+        self.detail_level = -1
+        return self._result(las, self.overview_level)
+
+    def refine(self, bounds: Sequence[float], spacing: float):
+        """
+        Add the octree levels needed for ``spacing`` (world units between
+        points on screen) within world XY ``bounds`` to the overview.
+
+        Returns:
+            dict like overview(), or None when the layer already holds that
+            detail (or the overview is detailed enough)
+        """
+        if self._overview is None:
+            self.overview()
+        wanted = self.level_for_spacing(spacing)
+        first = self.overview_level + 1
+        if wanted < first:
+            if self.detail_level < 0:
+                return None
+            # Zoomed back out: drop the detail
+            self.detail_bounds = None
+            self.detail_level = -1
+            return self._result(self._overview, self.overview_level)
+        counts = self.level_point_counts(bounds, range(first, wanted + 1))
+        budget = self.point_budget - self._overview.point_count
+        level = self._deepest_level_within(counts, budget, first_level=first)
+        if level < first:
+            return None
+        bounds = tuple(float(v) for v in bounds)
+        if level == self.detail_level and self.detail_bounds is not None and self._contains(self.detail_bounds, bounds):
+            return None
+        detail = self._query(bounds, range(first, level + 1))
+        print(f"[COPC] Refined '{self.file_path}' to level {level} in {bounds}: +{detail.point_count:,} points")
+        self.detail_bounds = bounds
+        self.detail_level = level
+        return self._result(self._concat(self._overview, detail), level)
+
+    def _deepest_level_within(self, counts, budget, first_level):
+        total = 0
+        level = first_level - 1
+        for lvl in sorted(counts):
+            if lvl < first_level:
+                continue
+            total += counts[lvl]
+            if total > budget:
+                break
+            level = lvl
+        if level < first_level and first_level == 0:
+            level = 0  # always show at least the root level
+        return level
+
+    def _bounds(self, bounds):
+        if bounds is None:
+            return None
+        xmin, ymin, xmax, ymax = bounds
+        return Bounds(mins=np.array([xmin, ymin]), maxs=np.array([xmax, ymax])).ensure_3d(self.header.mins, self.header.maxs)
+
+    def _query(self, bounds, levels):
+        from fileio.las_columns import LasColumns
+        from fileio.las_loader import _record_to_chunk
+        with self._lock:
+            record = self._reader.query(bounds=self._bounds(bounds), level=levels)
+        columns = _record_to_chunk(record, raw_xyz=True, wanted=None)
+        return LasColumns(columns, self.header.scales, self.header.offsets, dims=sorted(columns),
+                          header=self.header_info)
+
+    @staticmethod
+    def _concat(a, b):
+        from fileio.las_columns import LasColumns
+        columns = {name: np.concatenate((a.raw(name), b.raw(name))) for name in a}
+        return LasColumns(columns, a.scales, a.offsets, dims=list(a), header=a.header)
+
+    @staticmethod
+    def _contains(outer, inner):
+        return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
+
+    def _result(self, las, level):
+        from fileio.las_loader import local_points
+        return {
+            "las": las,
+            "points": local_points(las, self.origin),
+            "origin": self.origin,
+            "dims": sorted(las),
+            "level": level,
+        }
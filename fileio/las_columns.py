@@ -0,0 +1,122 @@
+"""
+Column container for loaded LAS/LAZ dimensions.
+
+LasColumns behaves like the plain dict of arrays the loader used to return,
+but keeps every dimension in its native LAS dtype.  X/Y/Z may be stored as the
+raw int32 record values together with the header scale and offset; they are
+only scaled to float64 when a caller actually asks for them.
+
+Dimensions can also be lazy: the mapping knows every dimension name in the
+file, but a column is only decoded (through the loader callback) the first
+time it is read.  With ``point_count`` given, even X/Y/Z may start out
+unloaded.  row_reader() reads unloaded columns at given rows only (e.g. for
+streaming them to a file) without keeping them.
+
+``header`` optionally carries the source file's header descriptor (see
+las_loader.header_descriptor) so the columns can be written back out with
+the original point format, scales, offsets and CRS.
+"""
+
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+XYZ_DIMS = ("X", "Y", "Z")
+
+
+class LasColumns(Mapping):
+    """Read-only mapping of dimension name -> 1D array with lazily scaled XYZ."""
+
+    def __init__(self, columns: Dict[str, np.ndarray],
+                 scales: Optional[Sequence[float]] = None,
+                 offsets: Optional[Sequence[float]] = None,
+                 dims: Optional[Sequence[str]] = None,
+                 loader: Optional[Callable[[str], np.ndarray]] = None,
+                 header: Optional[Dict] = None,
+                 point_count: Optional[int] = None):
+        self._columns = dict(columns)
+        # Known size while no column is loaded yet (every dimension lazy)
+        self._point_count = point_count
+        self._dims = list(dims) if dims is not None else list(columns)
+        self._loader = loader
+        self._row_reader = None
+        self.scales = np.asarray(scales, dtype=np.float64) if scales is not None else None
+        self.offsets = np.asarray(offsets, dtype=np.float64) if offsets is not None else None
+        self.header = header
+
+    def __getitem__(self, name):
+        arr = self.raw(name)
+        if self.is_raw(name):
+            axis = XYZ_DIMS.index(name)
+            return arr * self.scales[axis] + self.offsets[axis]
+        return arr
+
+    def __iter__(self):
+        return iter(self._dims)
+
+    def __len__(self):
+        return len(self._dims)
+
+    def __contains__(self, name):
+        # Membership must not trigger decoding of a lazy column
+        return name in self._dims
+
+    def set_loader(self, loader: Optional[Callable[[str], np.ndarray]]):
+        """Set the callback used to decode dimensions that are not loaded yet."""
+        self._loader = loader
+
+    def set_row_reader(self, factory: Optional[Callable[[List[str]], object]]):
+        """Set the callback opening a reader of unloaded dimensions at given rows (see row_reader)."""
+        self._row_reader = factory
+
+    def row_reader(self, names: Sequence[str]) -> Callable[[np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Function returning the stored values of dimensions ``names`` at
+        ascending ``rows``.  Loaded dimensions are indexed; unloaded ones are
+        decoded only around the rows, in one forward pass over the source
+        across successive calls with increasing rows, and are not kept.
+        """
+        lazy = [name for name in names
+                if name not in self._columns and name in self._dims and self._row_reader is not None]
+        stream = self._row_reader(lazy) if lazy else None
+
+        def read(rows):
+            values = {name: self.raw(name)[rows] for name in names if name not in lazy}
+            if stream is not None:
+                values.update(stream.take(rows))
+            return values
+
+        return read
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._columns
+
+    @property
+    def loaded_dims(self) -> List[str]:
+        return [name for name in self._dims if name in self._columns]
+
+    def is_raw(self, name: str) -> bool:
+        """True if the column is stored as unscaled integer record values."""
+        return (name in XYZ_DIMS and self.scales is not None
+                and np.issubdtype(self.raw(name).dtype, np.integer))
+
+    def raw(self, name: str) -> np.ndarray:
+        """Return the stored array for a dimension without any scaling, decoding it if needed."""
+        if name not in self._columns:
+            if name not in self._dims or self._loader is None:
+                raise KeyError(name)
+            print(f"[LOADER] Decoding dimension '{name}' on first access")
+            self._columns[name] = self._loader(name)
+        return self._columns[name]
+
+    @property
+    def point_count(self) -> int:
+        for arr in self._columns.values():
+            return len(arr)
+        return self._point_count or 0
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the loaded columns."""
+        return sum(arr.nbytes for arr in self._columns.values())
@@ -5,8 +5,11 @@ LAZ/LAS file export functionality with CRS and dimension preservation.
 import numpy as np
 import os
 import tempfile
+from collections.abc import Mapping
 from typing import Optional, Dict, Any
 
+from fileio.las_columns import LasColumns, XYZ_DIMS
+
 try:
     import laspy
     LASPY_AVAILABLE = True
@@ -14,20 +17,51 @@ except ImportError:
     LASPY_AVAILABLE = False
 
 
+def to_world_coordinates(points: np.ndarray, origin: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Return float64 world coordinates for layer points stored relative to ``origin``.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if origin is None:
+        return points
+    return points + np.asarray(origin, dtype=np.float64)
+
+
+DEFAULT_EXPORT_CHUNK_SIZE = 1_000_000
+
+
 def export_points_to_laz(points: np.ndarray, 
                         output_path: str,
                         original_las: Optional[Any] = None,
                         point_indices: Optional[np.ndarray] = None,
-                        preserve_all_dimensions: bool = True) -> bool:
+                        preserve_all_dimensions: bool = True,
+                        origin: Optional[np.ndarray] = None,
+                        chunk_size: int = DEFAULT_EXPORT_CHUNK_SIZE) -> bool:
     """
     Export points to LAZ file with full dimension and CRS preservation.
     
+    Points are streamed to the file in chunks of ``chunk_size`` through a
+    laspy writer, so memory stays bounded by one chunk whatever the layer
+    size.  For each chunk the original records are gathered with a single
+    index operation and copied across whole, instead of per dimension.
+    
+    ``original_las`` may also be a layer's columns (LasColumns, or a plain
+    dict of arrays keyed by dimension name).  Columns are then copied into the
+    matching output dimensions, and the LasColumns header descriptor supplies
+    the point format, scales, offsets and CRS.  Columns that were never
+    accessed are not loaded onto the layer: each chunk's rows are decoded
+    from the source file, around those rows only, for all copied dimensions
+    at once (LasColumns.row_reader).
+    
     Args:
         points: Nx3 numpy array of points (x, y, z)
         output_path: Output file path
         original_las: Original LAS data for copying dimensions and CRS
         point_indices: Indices of original points (for dimension copying)
         preserve_all_dimensions: Whether to preserve all original dimensions
+        origin: Origin the points are relative to (layer 'origin'); added
+            back in float64 so the file holds world coordinates
+        chunk_size: Number of points written per chunk
         
     Returns:
         bool: Success status
@@ -38,86 +72,74 @@ def export_points_to_laz(points: np.ndarray,
         
     try:
         # Handle case where original_las might be a dict (from layer manager)
-        if original_las is not None and isinstance(original_las, dict):
-            print("[INFO] Converting dict format LAS data to laspy object")
-            # Try to get the actual laspy object from the dict
-            if 'las' in original_las:
-                original_las = original_las['las']
-            else:
-                print("[WARN] Dict format LAS data doesn't contain 'las' key, using basic export")
-                original_las = None
+        if isinstance(original_las, dict) and 'las' in original_las:
+            original_las = original_las['las']
         
-        if original_las and hasattr(original_las, 'header') and preserve_all_dimensions:
-            # Create new LAS file based on original header
-            header = laspy.LasHeader(
-                point_format=original_las.header.point_format,
-                version=original_las.header.version
-            )
-            
-            # Copy header properties
-            header.offsets = original_las.header.offsets
-            header.scales = original_las.header.scales
-            
-            # Copy CRS information if available
-            if hasattr(original_las.header, 'crs') and original_las.header.crs:
-                header.crs = original_las.header.crs
-                print(f"[INFO] Preserved CRS: {original_las.header.crs}")
-            
-            # Copy other header attributes
-            if hasattr(original_las.header, 'global_encoding'):
-                header.global_encoding = original_las.header.global_encoding
-            if hasattr(original_las.header, 'creation_date'):
-                header.creation_date = original_las.header.creation_date
-            if hasattr(original_las.header, 'generating_software'):
-                header.generating_software = original_las.header.generating_software
-            
-            las_file = laspy.LasData(header)
-            
-            # Set coordinates
-            las_file.x = points[:, 0]
-            las_file.y = points[:, 1]
-            las_file.z = points[:, 2]
-            
-            # Copy all other dimensions if point_indices provided
-            if point_indices is not None:
-                dimensions_copied = []
-                for dim_name in original_las.point_format.dimension_names:
-                    if dim_name not in ['X', 'Y', 'Z']:
-                        try:
-                            original_data = getattr(original_las, dim_name.lower())
-                            if len(original_data) > max(point_indices):
-                                setattr(las_file, dim_name.lower(), original_data[point_indices])
-                                dimensions_copied.append(dim_name)
-                            else:
-                                print(f"[WARN] Dimension {dim_name} index out of range")
-                        except Exception as e:
-                            print(f"[WARN] Could not copy dimension {dim_name}: {e}")
-                
-                print(f"[INFO] Copied dimensions: {dimensions_copied}")
-            
-            # Set point count
-            header.point_count = len(points)
-            
-        else:
+        point_count = len(points)
+        if point_indices is not None:
+            point_indices = np.asarray(point_indices)
+        source_records = None
+        source_columns = None
+        header = None
+        if original_las is not None and preserve_all_dimensions:
+            if isinstance(original_las, Mapping):
+                # Layer columns: write them straight back, no re-read of the source file
+                source_columns = original_las
+                source_count = source_columns.point_count if isinstance(source_columns, LasColumns) \
+                    else len(_column(source_columns, next(iter(source_columns), None)))
+                descriptor = getattr(original_las, 'header', None)
+                if descriptor is not None:
+                    header = _header_from_descriptor(descriptor)
+            elif hasattr(original_las, 'header'):
+                source_records = original_las.points.array
+                source_count = len(source_records)
+                header = _header_from_original(original_las.header)
+            if point_indices is None and source_count != point_count:
+                print("[WARN] No point indices and point count differs from the original; dimensions not copied")
+                source_records = source_columns = None
+            elif point_indices is not None and (len(point_indices) != point_count or (
+                    point_count and point_indices.max() >= source_count)):
+                # One bounds check for all dimensions, not one per dimension
+                print("[WARN] Point indices do not match the original data; dimensions not copied")
+                source_records = source_columns = None
+        if header is None:
             # Create basic LAS file
             print("[INFO] Creating basic LAS file (no original header available)")
             header = laspy.LasHeader(point_format=3, version="1.2")
-            las_file = laspy.LasData(header)
-            las_file.x = points[:, 0]
-            las_file.y = points[:, 1]
-            las_file.z = points[:, 2]
-            
-            # Set basic intensity if we have enough dimensions
-            if points.shape[1] > 3:
-                las_file.intensity = np.ones(len(points), dtype=np.uint16) * 1000
-            
-        # Update header bounds
-        header.min = [float(np.min(points[:, i])) for i in range(3)]
-        header.max = [float(np.max(points[:, i])) for i in range(3)]
+            header.offsets = _chunked_min(points, origin, chunk_size)
+        copy_columns = _column_mapping(header, source_columns) if source_columns is not None else {}
+        read_rows = _row_reader(source_columns, list(copy_columns.values())) if copy_columns else None
+        
+        with laspy.open(output_path, mode="w", header=header) as writer:
+            for start in range(0, point_count, chunk_size):
+                stop = min(start + chunk_size, point_count)
+                rows = point_indices[start:stop] if point_indices is not None else slice(start, stop)
+                if source_records is not None:
+                    # Gather this chunk's original records in one go
+                    record = laspy.ScaleAwarePointRecord(
+                        source_records[rows], header.point_format, header.scales, header.offsets
+                    )
+                else:
+                    record = laspy.ScaleAwarePointRecord.zeros(stop - start, header=header)
+                    if copy_columns:
+                        values = _gather_rows(read_rows, rows, start, stop)
+                        for laspy_name, column_name in copy_columns.items():
+                            record[laspy_name] = values[column_name]
+                    if source_columns is None and points.shape[1] > 3:
+                        # Set basic intensity if we have enough dimensions
+                        record.intensity = np.full(stop - start, 1000, dtype=np.uint16)
+                xyz = to_world_coordinates(points[start:stop, :3], origin)
+                record.x = xyz[:, 0]
+                record.y = xyz[:, 1]
+                record.z = xyz[:, 2]
+                writer.write_points(record)
         
-        # Write the file
-        las_file.write(output_path)
-        print(f"[INFO] LAZ file exported: {output_path} ({len(points)} points)")
+        if source_records is not None:
+            copied = [name for name in header.point_format.dimension_names if name not in ('X', 'Y', 'Z')]
+            print(f"[INFO] Copied dimensions: {copied}")
+        elif copy_columns:
+            print(f"[INFO] Copied dimensions: {list(copy_columns.values())}")
+        print(f"[INFO] LAZ file exported: {output_path} ({point_count} points)")
         return True
         
     except Exception as e:
@@ -127,10 +149,113 @@ def export_points_to_laz(points: np.ndarray,
         return False
 
 
+def _header_from_original(original_header) -> "laspy.LasHeader":
+    """New header with the original's point format, scales, offsets, CRS and provenance."""
+    header = laspy.LasHeader(
+        point_format=original_header.point_format,
+        version=original_header.version
+    )
+    
+    # Copy header properties
+    header.offsets = original_header.offsets
+    header.scales = original_header.scales
+    
+    # Copy CRS information if available
+    if hasattr(original_header, 'crs') and original_header.crs:
+        header.crs = original_header.crs
+        print(f"[INFO] Preserved CRS: {original_header.crs}")
+    
+    # Copy other header attributes
+    if hasattr(original_header, 'global_encoding'):
+        header.global_encoding = original_header.global_encoding
+    if hasattr(original_header, 'creation_date'):
+        header.creation_date = original_header.creation_date
+    if hasattr(original_header, 'generating_software'):
+        header.generating_software = original_header.generating_software
+    return header
+
+
+def _header_from_descriptor(descriptor: Dict[str, Any]) -> "laspy.LasHeader":
+    """New header from a layer's header descriptor (las_loader.header_descriptor)."""
+    import copy
+    header = laspy.LasHeader(
+        point_format=copy.deepcopy(descriptor['point_format']),
+        version=descriptor['version']
+    )
+    header.offsets = descriptor['offsets']
+    header.scales = descriptor['scales']
+    header.vlrs.extend(descriptor['vlrs'])
+    if descriptor.get('crs_wkt') and not any(_is_crs_vlr(vlr) for vlr in header.vlrs):
+        try:
+            import pyproj
+            header.add_crs(pyproj.CRS.from_wkt(descriptor['crs_wkt']))
+        except Exception as e:
+            print(f"[WARN] Could not write CRS: {e}")
+    if descriptor.get('crs_wkt'):
+        print("[INFO] Preserved CRS from layer header")
+    return header
+
+
+def _is_crs_vlr(vlr) -> bool:
+    return vlr.user_id == "LASF_Projection"
+
+
+def _column_mapping(header: "laspy.LasHeader", columns: Mapping) -> Dict[str, str]:
+    """Output dimension (laspy name) -> layer column name, for the columns the layer has."""
+    from fileio.las_loader import LASPY_TO_PDAL_DIMS
+    mapping = {}
+    for name in header.point_format.dimension_names:
+        if name in XYZ_DIMS:
+            continue
+        column_name = LASPY_TO_PDAL_DIMS.get(name, name)
+        if column_name in columns:
+            mapping[name] = column_name
+    return mapping
+
+
+def _column(columns: Mapping, name: Optional[str]) -> np.ndarray:
+    """Stored array of a layer column (raw record values for LasColumns XYZ)."""
+    if name is None:
+        return np.empty(0)
+    return columns.raw(name) if isinstance(columns, LasColumns) else np.asarray(columns[name])
+
+
+def _row_reader(columns: Mapping, names: list):
+    """Function returning the layer columns ``names`` at ascending rows (LasColumns.row_reader)."""
+    if isinstance(columns, LasColumns):
+        return columns.row_reader(names)
+    return lambda rows: {name: np.asarray(columns[name])[rows] for name in names}
+
+
+def _gather_rows(read_rows, rows, start: int, stop: int) -> Dict[str, np.ndarray]:
+    """A chunk's column values at ``rows`` (a slice or index array), read in ascending order."""
+    if isinstance(rows, slice):
+        return read_rows(np.arange(start, stop))
+    if np.all(rows[1:] >= rows[:-1]):
+        return read_rows(rows)
+    order = np.argsort(rows, kind='stable')
+    values = {}
+    for name, sorted_values in read_rows(rows[order]).items():
+        # Back to the caller's order
+        values[name] = np.empty_like(sorted_values)
+        values[name][order] = sorted_values
+    return values
+
+
+def _chunked_min(points: np.ndarray, origin: Optional[np.ndarray], chunk_size: int) -> np.ndarray:
+    """Floor of the per-axis world minimum, computed a chunk at a time (used as header offsets)."""
+    mins = np.zeros(3, dtype=np.float64)
+    for start in range(0, len(points), chunk_size):
+        chunk_min = to_world_coordinates(points[start:start + chunk_size], origin).min(axis=0)
+        mins = chunk_min if start == 0 else np.minimum(mins, chunk_min)
+    return np.floor(mins)
+
+
 def create_temp_laz_file(points: np.ndarray, 
                         original_las: Optional[Any] = None,
                         point_indices: Optional[np.ndarray] = None,
-                        prefix: str = "temp_export") -> Optional[str]:
+                        prefix: str = "temp_export",
+                        origin: Optional[np.ndarray] = None) -> Optional[str]:
     """
     Create temporary LAZ file for cross-section or filtered data.
     
@@ -139,6 +264,7 @@ def create_temp_laz_file(points: np.ndarray,
         original_las: Original LAS data for copying metadata
         point_indices: Indices of original points
         prefix: Filename prefix
+        origin: Origin the points are relative to
         
     Returns:
         str: Temporary file path or None if failed
@@ -150,7 +276,7 @@ def create_temp_laz_file(points: np.ndarray,
         temp_path = os.path.join(temp_dir, temp_filename)
         
         success = export_points_to_laz(
-            points, temp_path, original_las, point_indices, preserve_all_dimensions=True
+            points, temp_path, original_las, point_indices, preserve_all_dimensions=True, origin=origin
         )
         
         return temp_path if success else None
@@ -160,37 +286,6 @@ def create_temp_laz_file(points: np.ndarray,
         return None
 
 
-def find_original_point_indices(subset_points: np.ndarray, 
-                               original_points: np.ndarray,
-                               tolerance: float = 0.001) -> np.ndarray:
-    """
-    Find indices of subset points in original point cloud.
-    
-    Args:
-        subset_points: Subset of points to match
-        original_points: Original full point cloud
-        tolerance: Distance tolerance for matching
-        
-    Returns:
-        np.ndarray: Array of indices in original_points
-    """
-    from scipy.spatial import cKDTree
-    
-    # Build spatial index for original points
-    tree = cKDTree(original_points)
-    
-    indices = []
-    for point in subset_points:
-        distances, idx = tree.query(point, k=1)
-        if distances <= tolerance:
-            indices.append(idx)
-        else:
-            # Use closest point if no exact match
-            indices.append(idx)
-            
-    return np.array(indices)
-
-
 def get_las_metadata_for_export(original_las: Any) -> Dict[str, Any]:
     """
     Extract metadata from original LAS file for export preservation.
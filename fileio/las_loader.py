@@ -6,23 +6,60 @@ import warnings
 warnings.filterwarnings("ignore", message=".*PROJ.*DATABASE.LAYOUT.VERSION.*")
 warnings.filterwarnings("ignore", message=".*pj_obj_create.*")
 
-def load_point_cloud_data(file_path, chunk_size=100000):
+def load_point_cloud_data(file_path, chunk_size=100000, use_cache=True, progress_callback=None, chunk_callback=None,
+                          origin=None, bounds=None, polygon=None):
     """
     Loads a LAS/LAZ file and returns a dict with:
-      - las: dict of arrays for all dimensions
-      - points: Nx3 numpy array of XYZ
-      - cloud: pyvista.PolyData object
+      - las: lazy LasColumns for all dimensions (native dtypes, XYZ scaled on access)
+      - points: C-contiguous Nx3 float32 array of XYZ relative to ``origin``
+      - origin: float64 (x, y, z) the points are stored relative to
       - dims: list of dimension names
+
+    Projected coordinates (UTM and the like) do not fit float32, so points are
+    kept as float32 offsets from a float64 origin: half the memory of float64
+    XYZ, no VTK jitter at large coordinates, and a buffer VTK takes as-is.
+    Pass the scene's origin to put several files in one coordinate frame;
+    by default it is derived from the header bounds (see local_origin).
+
+    ``bounds`` (xmin, ymin, xmax, ymax) and/or ``polygon`` (list of x, y
+    vertices), in world coordinates, load only the points inside that area
+    (see iter_las_chunks for how far the filter is pushed into the reader).
+
+    Only X/Y/Z are read up front; other dimensions are decoded the first time
+    they are accessed (e.g. when picked in the sidebar's "Color by" box).
+    progress_callback and chunk_callback are passed through to open_las_columns;
+    chunks are handed to chunk_callback already shifted to ``origin`` as float32.
+    On a point cache hit nothing is decoded, so chunk_callback gets ``points``
+    itself once it is built (the receiver samples it; nothing is copied here).
+
+    No VTK objects are built here: the viewer wraps ``points`` in a PolyData
+    without copying when the layer is first drawn (PointCloudViewer.make_point_mesh).
     """
-    import pyvista as pv
     import numpy as np
-    las, dims = load_las_file(file_path, chunk_size=chunk_size)
-    points = np.vstack((las["X"], las["Y"], las["Z"])) .transpose()
-    cloud = pv.PolyData(points)
+    if origin is None:
+        origin = local_origin(read_las_header(file_path).get("mins"))
+    origin = np.asarray(origin, dtype=np.float64)
+
+    chunks_seen = []
+
+    def local_chunk(xyz):
+        # xyz is a fresh per-chunk array; shift it in place
+        xyz -= origin
+        chunks_seen.append(len(xyz))
+        chunk_callback(xyz.astype(np.float32))
+
+    from fileio.spatial_filter import SpatialFilter
+    las, dims = open_las_columns(file_path, chunk_size=chunk_size, use_cache=use_cache,
+                                 progress_callback=progress_callback,
+                                 chunk_callback=local_chunk if chunk_callback is not None else None,
+                                 region=SpatialFilter.from_args(bounds, polygon))
+    points = local_points(las, origin)
+    if chunk_callback is not None and not chunks_seen and len(points):
+        chunk_callback(points)
     return {
         "las": las,
         "points": points,
-        "cloud": cloud,
+        "origin": origin,
         "dims": dims
     }
 def get_normalized_scalars(las_data, dim_name):
@@ -52,30 +89,10 @@ def load_default_las_with_progress(settings_path, progress_bar):
                 settings = json.load(f)
             default_file = settings.get("last_file", None)
             if default_file and os.path.exists(default_file):
-                import json as _json
-                chunk_size = 100000
-                pipeline = {
-                    "pipeline": [
-                        {"type": "readers.las", "filename": default_file},
-                        {"type": "filters.chipper", "capacity": chunk_size}
-                    ]
-                }
-                p = pdal.Pipeline(_json.dumps(pipeline))
-                p.execute()
-                arrays = p.arrays
-                total_points = sum(arr.shape[0] for arr in arrays)
-                loaded = 0
-                # Concatenate all arrays for each dimension
-                if arrays:
-                    dims = arrays[0].dtype.names
-                    las_data = {d: np.concatenate([arr[d] for arr in arrays]) for d in dims}
-                    for arr in arrays:
-                        loaded += arr.shape[0]
-                        progress = int(loaded / total_points * 100)
-                        progress_bar.setValue(progress)
-                    print(f"[LOADER] Available dimensions in '{default_file}': {list(dims)}")
+                las_data, dims = load_las_file(default_file, progress_callback=progress_bar.setValue)
+                if dims:
                     progress_bar.setValue(100)
-                    return (las_data, list(dims)), default_file
+                    return (las_data, dims), default_file
                 else:
                     print(f"[LOADER] No arrays found in file: {default_file}")
                     return (None, []), default_file
@@ -86,36 +103,583 @@ def load_default_las_with_progress(settings_path, progress_bar):
 import os
 import json
 import numpy as np
-import pdal
-
-def load_las_file(file_path, chunk_size=100000):
-    import json as _json
-    pipeline = {
-        "pipeline": [
-            {"type": "readers.las", "filename": file_path},
-            {"type": "filters.chipper", "capacity": chunk_size}
-        ]
+
+try:
+    import pdal
+    PDAL_AVAILABLE = True
+except ImportError:
+    PDAL_AVAILABLE = False
+
+try:
+    import laspy
+    LASPY_AVAILABLE = True
+    # laspy decodes LAZ only through lazrs or laszip, which are optional
+    LAZ_BACKEND_AVAILABLE = bool(laspy.LazBackend.detect_available())
+except ImportError:
+    LASPY_AVAILABLE = False
+    LAZ_BACKEND_AVAILABLE = False
+
+# laspy dimension names mapped to the PDAL names layers have always used
+# (the sidebar dimension list and saved layer settings refer to these).
+LASPY_TO_PDAL_DIMS = {
+    "intensity": "Intensity",
+    "return_number": "ReturnNumber",
+    "number_of_returns": "NumberOfReturns",
+    "scan_direction_flag": "ScanDirectionFlag",
+    "edge_of_flight_line": "EdgeOfFlightLine",
+    "classification": "Classification",
+    "synthetic": "Synthetic",
+    "key_point": "KeyPoint",
+    "withheld": "Withheld",
+    "overlap": "Overlap",
+    "scanner_channel": "ScanChannel",
+    "scan_angle_rank": "ScanAngleRank",
+    "scan_angle": "ScanAngleRank",
+    "user_data": "UserData",
+    "point_source_id": "PointSourceId",
+    "gps_time": "GpsTime",
+    "red": "Red",
+    "green": "Green",
+    "blue": "Blue",
+    "nir": "Infrared",
+}
+
+
+def _laspy_decodes(file_path):
+    """
+    True if laspy should read the file's points: LAS always, LAZ only with a
+    LAZ backend installed.  Otherwise PDAL reads it, as it always did.
+    """
+    if not LASPY_AVAILABLE:
+        return False
+    if LAZ_BACKEND_AVAILABLE or not PDAL_AVAILABLE:
+        return True
+    with laspy.open(file_path) as reader:
+        return not reader.header.are_points_compressed
+
+
+class LoadCancelled(Exception):
+    """Raised from a loader callback to abandon a load in progress."""
+
+
+def read_las_header(file_path):
+    """
+    Read the LAS/LAZ header without decoding any points.
+
+    Returns:
+        dict: point_count, sorted PDAL dimension names, header bounds as
+        mins/maxs, plus scales and offsets when laspy reads the file
+    """
+    if _laspy_decodes(file_path):
+        with laspy.open(file_path) as reader:
+            header = reader.header
+            dims = {LASPY_TO_PDAL_DIMS.get(name, name) for name in header.point_format.dimension_names}
+            return {
+                "point_count": int(header.point_count),
+                "dims": sorted(dims),
+                "scales": np.array(header.scales, dtype=np.float64),
+                "offsets": np.array(header.offsets, dtype=np.float64),
+                "mins": np.array(header.mins, dtype=np.float64),
+                "maxs": np.array(header.maxs, dtype=np.float64),
+            }
+    pipeline = pdal.Pipeline(json.dumps({"pipeline": [{"type": "readers.las", "filename": file_path}]}))
+    info = pipeline.quickinfo["readers.las"]
+    dims = [d.strip() for d in info.get("dimensions", "").split(",") if d.strip()]
+    bounds = info.get("bounds") or {}
+    mins = maxs = None
+    if bounds:
+        mins = np.array([bounds.get("minx", 0.0), bounds.get("miny", 0.0), bounds.get("minz", 0.0)], dtype=np.float64)
+        maxs = np.array([bounds.get("maxx", 0.0), bounds.get("maxy", 0.0), bounds.get("maxz", 0.0)], dtype=np.float64)
+    return {"point_count": int(info["num_points"]), "dims": sorted(dims), "scales": None, "offsets": None,
+            "mins": mins, "maxs": maxs}
+
+
+# VLRs describing how the source file was stored rather than its points;
+# they must not be copied into files written from a layer.
+_STORAGE_VLR_USER_IDS = ("copc", "laszip encoded", "LASF_Spec")
+
+
+def header_descriptor(header):
+    """
+    Lightweight description of a laspy header, kept with a layer's columns.
+
+    Holds what an export needs to reproduce the file's layout (point format
+    including extra bytes, version, scales, offsets, CRS VLRs), so writing a
+    layer back out never requires reopening the source.  LASF_Spec VLRs
+    (extra bytes, waveform) are regenerated by laspy from the point format.
+
+    Returns:
+        dict: point_format (laspy PointFormat), version, scales, offsets,
+        crs_wkt (None if the file has no CRS) and vlrs
+    """
+    import copy
+    crs_wkt = None
+    try:
+        crs = header.parse_crs()
+        crs_wkt = crs.to_wkt() if crs is not None else None
+    except Exception:
+        # pyproj missing or CRS unparsable; fall back to a WKT VLR's text
+        for vlr in header.vlrs:
+            if hasattr(vlr, "string"):
+                crs_wkt = vlr.string
+                break
+    return {
+        "point_format": copy.deepcopy(header.point_format),
+        "version": str(header.version),
+        "scales": np.array(header.scales, dtype=np.float64),
+        "offsets": np.array(header.offsets, dtype=np.float64),
+        "crs_wkt": crs_wkt,
+        "vlrs": [vlr for vlr in header.vlrs if vlr.user_id not in _STORAGE_VLR_USER_IDS],
     }
-    p = pdal.Pipeline(_json.dumps(pipeline))
-    p.execute()
-    arrays = p.arrays
-    # Collect all field names from all arrays (should be the same for all)
-    all_fields = set()
-    for arr in arrays:
-        all_fields.update(arr.dtype.names)
-    all_fields = sorted(all_fields)
-    # Prepare storage for each field
-    field_data = {field: [] for field in all_fields}
-    for arr in arrays:
-        for field in all_fields:
-            if field in arr.dtype.names:
-                # Convert to float if needed for compatibility
-                field_data[field].append(arr[field] * arr[field].dtype.type(1.0))
-    # Concatenate arrays for each field
-    for field in all_fields:
-        field_data[field] = np.concatenate(field_data[field])
-    print(f"[LOADER] Available dimensions in '{file_path}': {list(all_fields)}")
-    return field_data, list(all_fields)
+
+
+def read_header_descriptor(file_path):
+    """header_descriptor of a file, reading only its header; None without laspy."""
+    if not LASPY_AVAILABLE:
+        return None
+    with laspy.open(file_path) as reader:
+        return header_descriptor(reader.header)
+
+
+def local_origin(mins):
+    """
+    Choose the float64 origin a file's points are stored relative to.
+
+    X/Y are the header minimum rounded down to whole units so offsets stay
+    small and readable; Z is left at 0 so heights remain true elevations
+    (profiles, elevation coloring) without adding the origin back.
+    """
+    if mins is None:
+        return np.zeros(3, dtype=np.float64)
+    return np.array([np.floor(mins[0]), np.floor(mins[1]), 0.0], dtype=np.float64)
+
+
+def local_points(las, origin, block_size=1 << 20):
+    """
+    Build the C-contiguous float32 Nx3 array of XYZ minus ``origin``.
+
+    Raw int32 XYZ is scaled with the origin folded into the header offset, in
+    blocks, so large absolute coordinates never pass through float32 and no
+    full-size float64 temporary is allocated.
+    """
+    from fileio.las_columns import XYZ_DIMS
+    count = las.point_count
+    points = np.empty((count, 3), dtype=np.float32)
+    for axis, name in enumerate(XYZ_DIMS):
+        raw = las.is_raw(name)
+        column = las.raw(name) if raw else las[name]
+        scale = las.scales[axis] if raw else 1.0
+        shift = (las.offsets[axis] if raw else 0.0) - origin[axis]
+        for start in range(0, count, block_size):
+            block = column[start:start + block_size]
+            points[start:start + len(block), axis] = block * scale + shift
+    return points
+
+
+# LAZ 1.4 (point formats 6-10) stores fields in separately compressed layers;
+# these are the layers needed for each dimension.
+_DECOMPRESSION_LAYERS = {
+    "Z": "Z",
+    "Classification": "CLASSIFICATION",
+    "ScanDirectionFlag": "FLAGS",
+    "EdgeOfFlightLine": "FLAGS",
+    "Synthetic": "FLAGS",
+    "KeyPoint": "FLAGS",
+    "Withheld": "FLAGS",
+    "Overlap": "FLAGS",
+    "Intensity": "INTENSITY",
+    "ScanAngleRank": "SCAN_ANGLE",
+    "UserData": "USER_DATA",
+    "PointSourceId": "POINT_SOURCE_ID",
+    "GpsTime": "GPS_TIME",
+    "Red": "RGB",
+    "Green": "RGB",
+    "Blue": "RGB",
+    "Infrared": "NIR",
+}
+
+
+def _decompression_selection(dims):
+    """Build a laspy DecompressionSelection covering only the given dimensions."""
+    if dims is None:
+        return laspy.DecompressionSelection.all()
+    selection = laspy.DecompressionSelection.XY_RETURNS_CHANNEL
+    for name in dims:
+        layer = _DECOMPRESSION_LAYERS.get(name)
+        if layer is not None:
+            selection |= getattr(laspy.DecompressionSelection, layer)
+        elif name not in ("X", "Y", "ReturnNumber", "NumberOfReturns", "ScanChannel"):
+            selection |= laspy.DecompressionSelection.ALL_EXTRA_BYTES
+    return selection
+
+
+def _is_copc(header):
+    """True if the header carries the COPC info VLR (octree-indexed LAZ)."""
+    return any(vlr.user_id == "copc" for vlr in header.vlrs)
+
+
+def _record_to_chunk(points, raw_xyz, wanted):
+    chunk = {}
+    for axis in ("X", "Y", "Z"):
+        if wanted is None or axis in wanted:
+            chunk[axis] = np.asarray(points[axis] if raw_xyz else getattr(points, axis.lower()))
+    for name in points.point_format.dimension_names:
+        pdal_name = LASPY_TO_PDAL_DIMS.get(name, name)
+        if name in ("X", "Y", "Z") or (wanted is not None and pdal_name not in wanted):
+            continue
+        chunk[pdal_name] = np.asarray(points[name])
+    return chunk
+
+
+def iter_las_chunks(file_path, chunk_size=100000, raw_xyz=False, dims=None, region=None):
+    """
+    Stream a LAS/LAZ file as a sequence of chunks.
+
+    Each chunk is a dict of 1D arrays keyed by PDAL dimension name, holding at
+    most ``chunk_size`` points in their native LAS dtypes.  Only one chunk is
+    decoded at a time, so callers can copy it into preallocated storage and let
+    it go.
+
+    With ``raw_xyz=True`` X/Y/Z are the unscaled int32 record values (laspy
+    only; PDAL always hands back scaled doubles).  ``dims`` restricts the
+    chunk to a subset of dimensions; with LAZ 1.4 files the other fields are
+    not even decompressed.  LAZ goes through laspy only when it has a LAZ
+    backend (lazrs or laszip), otherwise through PDAL.
+
+    ``region`` (a SpatialFilter) keeps only the points inside an area.  Files
+    whose header bounds miss it are not decoded at all; COPC files are queried
+    through their octree so only intersecting nodes are decompressed; PDAL
+    applies it with filters.crop.  Plain LAS/LAZ has no index laspy can use,
+    so there every chunk is still decoded and then masked.
+    """
+    wanted = set(dims) if dims is not None else None
+    if region is not None:
+        region.points_scanned = 0
+    if _laspy_decodes(file_path):
+        selection = _decompression_selection(dims)
+        with laspy.open(file_path, decompression_selection=selection) as reader:
+            header = reader.header
+            if region is not None and not region.intersects(header.mins, header.maxs):
+                print(f"[LOADER] '{file_path}' lies outside {region}; nothing to read")
+                return
+            if region is not None and _is_copc(header):
+                xmin, ymin, xmax, ymax = region.bounds
+                with laspy.CopcReader.open(file_path, decompression_selection=selection) as copc:
+                    queried = copc.query(bounds=laspy.Bounds(mins=np.array([xmin, ymin]), maxs=np.array([xmax, ymax])))
+                print(f"[LOADER] COPC query of '{file_path}' returned {len(queried):,} of {header.point_count:,} points")
+                records = (queried[start:start + chunk_size] for start in range(0, len(queried), chunk_size))
+            else:
+                records = reader.chunk_iterator(chunk_size)
+            for points in records:
+                if region is not None:
+                    region.points_scanned += len(points)
+                    mask = region.mask(points.x, points.y)
+                    if not mask.any():
+                        continue
+                    points = points[mask]
+                yield _record_to_chunk(points, raw_xyz, wanted)
+    elif PDAL_AVAILABLE:
+        reader_type = "readers.copc" if file_path.lower().endswith(".copc.laz") else "readers.las"
+        stages = [{"type": reader_type, "filename": file_path}]
+        if region is not None:
+            if reader_type == "readers.copc":
+                xmin, ymin, xmax, ymax = region.bounds
+                stages[0]["bounds"] = f"([{xmin}, {xmax}], [{ymin}, {ymax}])"
+            stages.extend(region.pdal_stages())
+        pipeline = pdal.Pipeline(json.dumps({"pipeline": stages}))
+        for arr in pipeline.iterator(chunk_size=chunk_size):
+            if region is not None:
+                region.points_scanned += len(arr)
+            yield {name: arr[name] for name in arr.dtype.names if wanted is None or name in wanted}
+    else:
+        raise ImportError("Reading LAS/LAZ files requires laspy or pdal")
+
+
+def load_las_file(file_path, chunk_size=100000, progress_callback=None, raw_xyz=False, dims=None,
+                  chunk_callback=None, region=None):
+    """
+    Load dimensions of a LAS/LAZ file into LasColumns.
+
+    Points are streamed in chunks and copied into per-dimension arrays that are
+    allocated once from the header point count, so peak memory stays at the
+    size of the loaded columns plus a single chunk.  Dimensions keep their
+    native LAS dtypes (uint8 classification, uint16 intensity, ...).
+
+    Args:
+        file_path: LAS/LAZ file to read
+        chunk_size: Number of points decoded per chunk
+        progress_callback: Optional callable receiving a 0-100 progress value
+        raw_xyz: Keep X/Y/Z as int32 record values; they are scaled on access
+        dims: Optional subset of dimension names to load (default: all)
+        chunk_callback: Optional callable receiving each decoded chunk dict;
+            it may raise LoadCancelled to stop the load
+        region: Optional SpatialFilter; only points inside it are loaded, and
+            storage grows with the selection instead of the header count
+
+    Returns:
+        tuple: (LasColumns keyed by dimension name, sorted list of loaded dimension names)
+    """
+    from fileio.las_columns import LasColumns
+    header = read_las_header(file_path)
+    total_points = header["point_count"]
+    raw_xyz = raw_xyz and header["scales"] is not None
+    # A spatial selection is usually a small part of the file
+    expected_points = total_points if region is None else 0
+    field_data = None
+    loaded = 0
+    for chunk in iter_las_chunks(file_path, chunk_size=chunk_size, raw_xyz=raw_xyz, dims=dims, region=region):
+        count = len(next(iter(chunk.values()))) if chunk else 0
+        if count == 0:
+            # A region filter can leave a chunk empty (or without fields); it sets up nothing
+            continue
+        if field_data is None:
+            field_data = {name: np.empty(max(expected_points, count), dtype=arr.dtype) for name, arr in chunk.items()}
+            capacity = max(expected_points, count)
+        if loaded + count > capacity:
+            # Header under-reports the point count; grow rather than fail
+            capacity = max(loaded + count, 2 * capacity)
+            for name in field_data:
+                field_data[name] = np.resize(field_data[name], capacity)
+        for name, arr in chunk.items():
+            field_data[name][loaded:loaded + count] = arr
+        loaded += count
+        if chunk_callback is not None:
+            chunk_callback(chunk)
+        if progress_callback is not None and total_points > 0:
+            done = loaded if region is None else region.points_scanned
+            progress_callback(min(int(done / total_points * 100), 100))
+    if not field_data:
+        print(f"[LOADER] No points found in '{file_path}'")
+        return LasColumns({}), []
+    if loaded < capacity:
+        field_data = {name: arr[:loaded] for name, arr in field_data.items()}
+    all_fields = sorted(field_data)
+    print(f"[LOADER] Loaded dimensions from '{file_path}': {all_fields}")
+    if raw_xyz:
+        return LasColumns(field_data, header["scales"], header["offsets"]), all_fields
+    return LasColumns(field_data), all_fields
+
+
+def open_las_columns(file_path, chunk_size=100000, use_cache=True, progress_callback=None, chunk_callback=None,
+                     region=None):
+    """
+    Open a LAS/LAZ file as lazy LasColumns.
+
+    X/Y/Z are loaded immediately (memory-mapped from the point cache when the
+    file was opened before).  Every other dimension is decoded on first access,
+    from the cache if it holds that column, otherwise from the file; freshly
+    decoded columns are added to the cache for the next open.
+
+    chunk_callback, if given, receives the XYZ of each decoded chunk as a new
+    Nx3 float64 array so callers can display the cloud while it loads; on a
+    cache hit nothing is decoded and it is not called.  Raising LoadCancelled
+    from either callback stops the load.
+
+    With ``region`` (a SpatialFilter) only the points inside it are loaded,
+    and lazily decoded dimensions apply the same filter.  The point cache
+    holds whole files, so it is bypassed for spatially filtered reads.
+
+    Returns:
+        tuple: (LasColumns, sorted list of all dimension names in the file)
+    """
+    from fileio.point_cache import get_point_cache
+    cache = get_point_cache() if use_cache and region is None else None
+    cached = cache.load(file_path) if cache is not None else None
+    if cached is not None:
+        las, dims = cached
+        if progress_callback is not None:
+            progress_callback(100)
+    else:
+        header = read_las_header(file_path)
+
+        def xyz_chunk(chunk):
+            if header["scales"] is not None:
+                xyz = np.column_stack((chunk["X"], chunk["Y"], chunk["Z"])) * header["scales"] + header["offsets"]
+            else:
+                xyz = np.column_stack((chunk["X"], chunk["Y"], chunk["Z"]))
+            chunk_callback(xyz)
+
+        xyz, _ = load_las_file(file_path, chunk_size=chunk_size, progress_callback=progress_callback,
+                               raw_xyz=True, dims=["X", "Y", "Z"],
+                               chunk_callback=xyz_chunk if chunk_callback is not None else None,
+                               region=region)
+        from fileio.las_columns import LasColumns
+        dims = header["dims"]
+        if len(xyz):
+            las = LasColumns({axis: xyz.raw(axis) for axis in xyz}, xyz.scales, xyz.offsets, dims=dims)
+        else:
+            # Empty file or nothing inside the region
+            las = LasColumns({axis: np.empty(0, dtype=np.float64) for axis in ("X", "Y", "Z")}, dims=dims)
+        if cache is not None and len(xyz):
+            cache.store(file_path, las, ["X", "Y", "Z"])
+
+    las.set_loader(_dimension_loader(file_path, las, chunk_size, region, cache))
+    las.set_row_reader(_row_reader(file_path, las, chunk_size, region))
+    las.header = read_header_descriptor(file_path)
+    print(f"[LOADER] Available dimensions in '{file_path}': {dims}")
+    return las, dims
+
+
+def lazy_las_columns(file_path, dims, point_count, scales=None, offsets=None, chunk_size=100000, use_cache=True):
+    """
+    Open a file whose points were decoded elsewhere (e.g. in a worker process)
+    as LasColumns without decoding anything.
+
+    The columns are memory-mapped from the point cache when it holds the
+    file; otherwise every dimension, X/Y/Z included, is decoded on first
+    access, like open_las_columns' lazy dimensions.
+
+    Returns:
+        tuple: (LasColumns, sorted list of all dimension names in the file)
+    """
+    from fileio.las_columns import LasColumns
+    from fileio.point_cache import get_point_cache
+    cache = get_point_cache() if use_cache else None
+    cached = cache.load(file_path) if cache is not None else None
+    if cached is not None:
+        las, dims = cached
+    else:
+        las = LasColumns({}, scales, offsets, dims=dims, point_count=point_count)
+    las.set_loader(_dimension_loader(file_path, las, chunk_size, None, cache))
+    las.set_row_reader(_row_reader(file_path, las, chunk_size, None))
+    las.header = read_header_descriptor(file_path)
+    return las, list(dims)
+
+
+def _dimension_loader(file_path, las, chunk_size, region, cache):
+    """LasColumns loader decoding one dimension of a file (X/Y/Z as raw records) and caching it."""
+    from fileio.las_columns import XYZ_DIMS
+
+    def decode_dimension(name):
+        if las.point_count == 0:
+            return np.empty(0)
+        raw_xyz = name in XYZ_DIMS and las.scales is not None
+        column = load_las_file(file_path, chunk_size=chunk_size, dims=[name], region=region,
+                               raw_xyz=raw_xyz)[0].raw(name)
+        if cache is not None:
+            cache.store_column(file_path, name, column)
+        return column
+
+    return decode_dimension
+
+
+def _row_reader(file_path, las, chunk_size, region):
+    """LasColumns row reader callback: a _RowReader over the given dimensions of the file."""
+    return lambda names: _RowReader(file_path, las, names, chunk_size, region)
+
+
+class _RowReader:
+    """
+    Values of a file's dimensions (X/Y/Z as raw records) at given layer rows,
+    decoding only around those rows and holding at most one chunk.
+
+    Without a region laspy seeks to each run of nearby rows and reads just
+    that span.  With one, filtered chunks are streamed forward across calls,
+    remembering the layer row each file chunk starts at, so a read further
+    back seeks to its chunk instead of re-streaming the file (COPC queries and
+    PDAL have nothing to seek to and start over).
+    """
+
+    def __init__(self, file_path, las, names, chunk_size, region):
+        self.file_path = file_path
+        self.names = list(names)
+        self.chunk_size = chunk_size
+        self.region = region
+        self.raw_xyz = las.scales is not None
+        self._seekable = _laspy_decodes(file_path)
+        if self._seekable and region is not None:
+            with laspy.open(file_path) as reader:
+                self._seekable = not _is_copc(reader.header)
+        self._chunks = None
+        self._chunk = None
+        self._chunk_row = 0
+        # Layer row at the start of each file chunk streamed so far (region reads)
+        self._chunk_starts = [0]
+
+    def take(self, rows):
+        """Dict of dimension name -> values at ``rows`` (ascending layer rows)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        parts = {name: [] for name in self.names}
+        if self.region is None and self._seekable:
+            self._take_spans(rows, parts)
+        else:
+            self._take_streamed(rows, parts)
+        return {name: np.concatenate(values) if values else np.empty(0) for name, values in parts.items()}
+
+    def _take_spans(self, rows, parts):
+        with laspy.open(self.file_path, decompression_selection=_decompression_selection(self.names)) as reader:
+            i = 0
+            while i < len(rows):
+                first = int(rows[i])
+                # Rows less than a chunk past the first are read as one span
+                j = int(np.searchsorted(rows, first + self.chunk_size))
+                reader.seek(first)
+                points = reader.read_points(int(rows[j - 1]) - first + 1)
+                chunk = _record_to_chunk(points, self.raw_xyz, set(self.names))
+                for name in self.names:
+                    parts[name].append(chunk[name][rows[i:j] - first])
+                i = j
+
+    def _take_streamed(self, rows, parts):
+        i = 0
+        while i < len(rows):
+            row = int(rows[i])
+            if self._chunk is None or row < self._chunk_row:
+                self._restart(row)
+                continue
+            stop = self._chunk_row + len(self._chunk[self.names[0]])
+            if row >= stop:
+                self._next_chunk()
+                continue
+            j = int(np.searchsorted(rows, stop))
+            for name in self.names:
+                parts[name].append(self._chunk[name][rows[i:j] - self._chunk_row])
+            i = j
+
+    def _next_chunk(self):
+        try:
+            self._chunk_row, self._chunk = next(self._chunks)
+        except StopIteration:
+            self._chunk = None
+            raise IndexError(f"Row beyond the points of '{self.file_path}'") from None
+
+    def _restart(self, row):
+        if self._seekable:
+            # Last file chunk known to start at or before the row
+            self._chunks = self._seek_stream(int(np.searchsorted(self._chunk_starts, row, side="right")) - 1)
+        else:
+            if self._chunk is not None:
+                print(f"[LOADER] Re-reading '{self.file_path}' from the start for row {row:,}")
+            self._chunks = self._full_stream()
+        self._next_chunk()
+
+    def _seek_stream(self, chunk_index):
+        wanted = set(self.names)
+        row = self._chunk_starts[chunk_index]
+        with laspy.open(self.file_path, decompression_selection=_decompression_selection(self.names)) as reader:
+            reader.seek(chunk_index * self.chunk_size)
+            while True:
+                points = reader.read_points(self.chunk_size)
+                if len(points) == 0:
+                    return
+                mask = self.region.mask(points.x, points.y)
+                count = int(mask.sum())
+                chunk_index += 1
+                if chunk_index == len(self._chunk_starts):
+                    self._chunk_starts.append(row + count)
+                if count:
+                    yield row, _record_to_chunk(points[mask], self.raw_xyz, wanted)
+                row += count
+
+    def _full_stream(self):
+        row = 0
+        for chunk in iter_las_chunks(self.file_path, chunk_size=self.chunk_size, raw_xyz=self.raw_xyz,
+                                     dims=self.names, region=self.region):
+            count = len(chunk[self.names[0]]) if chunk else 0
+            if count:
+                yield row, chunk
+            row += count
+
 
 def save_last_file(settings_file, file_path):
     try:
@@ -135,74 +699,158 @@ def load_last_file(settings_file):
     return None
 
 def print_las_dimensions(file_path, chunk_size=100000):
-    import json as _json
-    pipeline = {
-        "pipeline": [
-            {"type": "readers.las", "filename": file_path},
-            {"type": "filters.chipper", "capacity": chunk_size}
-        ]
-    }
-    p = pdal.Pipeline(_json.dumps(pipeline))
-    p.execute()
-    arrays = p.arrays
-    if not arrays:
-        print(f"[LOADER] No data arrays returned for '{file_path}'.")
-        return []
-    # Use dtype.names from the first array (should be the same for all)
-    dims = arrays[0].dtype.names
-    print(f"[LOADER] Available dimensions in '{file_path}': {list(dims)}")
-    return list(dims)
+    """Print the dimensions of a LAS/LAZ file, read from its header only."""
+    dims = read_las_header(file_path)["dims"]
+    print(f"[LOADER] Available dimensions in '{file_path}': {dims}")
+    return dims
 
-def get_las_metadata_summary(file_path):
-    import pdal
-    import json
-    pipeline_json = {
-        "pipeline": [
-            {
-                "type": "readers.las",
-                "filename": file_path
+
+def read_las_metadata(file_path):
+    """
+    Read schema, point counts, bounds, CRS and VLRs from the header and VLRs
+    only; no points are decoded, so this takes milliseconds on any file size.
+
+    Returns:
+        dict with version, point_format, point_count, points_by_return,
+        scales, offsets, mins, maxs, crs (WKT/name or None), vlrs
+        (list of dicts) and schema (list of dicts with name, type, bits)
+    """
+    if LASPY_AVAILABLE:
+        with laspy.open(file_path) as reader:
+            header = reader.header
+            by_return = [int(n) for n in header.number_of_points_by_return]
+            while by_return and by_return[-1] == 0:
+                by_return.pop()
+            try:
+                crs = header.parse_crs()
+                crs = crs.name if crs is not None else None
+            except Exception as e:
+                crs = f"unreadable ({e})"
+            vlrs = [
+                {"user_id": vlr.user_id, "record_id": vlr.record_id, "description": vlr.description}
+                for vlr in list(header.vlrs) + list(header.evlrs or [])
+            ]
+            schema = [
+                {
+                    "name": LASPY_TO_PDAL_DIMS.get(dim.name, dim.name),
+                    "type": str(dim.dtype) if dim.dtype is not None else "bit field",
+                    "bits": dim.num_bits,
+                }
+                for dim in header.point_format.dimensions
+            ]
+            return {
+                "version": str(header.version),
+                "point_format": header.point_format.id,
+                "point_count": int(header.point_count),
+                "points_by_return": by_return,
+                "scales": list(header.scales),
+                "offsets": list(header.offsets),
+                "mins": list(header.mins),
+                "maxs": list(header.maxs),
+                "crs": crs,
+                "vlrs": vlrs,
+                "schema": schema,
+                "generating_software": header.generating_software,
+                "creation_date": str(header.creation_date) if header.creation_date else None,
             }
-        ]
+    # PDAL quickinfo also reads only the header
+    pipeline = pdal.Pipeline(json.dumps({"pipeline": [{"type": "readers.las", "filename": file_path}]}))
+    info = pipeline.quickinfo["readers.las"]
+    bounds = info.get("bounds") or {}
+    srs = info.get("srs") or {}
+    return {
+        "version": None,
+        "point_format": None,
+        "point_count": int(info.get("num_points", 0)),
+        "points_by_return": [],
+        "scales": None,
+        "offsets": None,
+        "mins": [bounds.get("minx"), bounds.get("miny"), bounds.get("minz")] if bounds else None,
+        "maxs": [bounds.get("maxx"), bounds.get("maxy"), bounds.get("maxz")] if bounds else None,
+        "crs": srs.get("horizontal") or srs.get("wkt") or None,
+        "vlrs": [],
+        "schema": [{"name": d.strip(), "type": None, "bits": None}
+                   for d in info.get("dimensions", "").split(",") if d.strip()],
+        "generating_software": None,
+        "creation_date": None,
     }
-    pipeline = pdal.Pipeline(json.dumps(pipeline_json))
-    pipeline.execute()
-    metadata = pipeline.metadata  # Already a dict in recent pdal
-    log = pipeline.log
-    # Access schema information robustly
-    readers_las = metadata.get('metadata', {}).get('readers.las', {})
-    schema = readers_las.get('schema')
+
+
+def get_las_metadata_summary(file_path):
+    """Format the header-only metadata of a LAS/LAZ file for the "LAS Metadata" dialog."""
+    meta = read_las_metadata(file_path)
     lines = []
-    schema_found = False
-    if schema and 'dimensions' in schema:
-        lines.append("[PDAL] LAS Schema Dimensions:")
-        for dim in schema['dimensions']:
-            lines.append(f"  Name: {dim.get('name')}, Type: {dim.get('type')}, Size: {dim.get('size')}")
-        schema_found = True
-    else:
-        lines.append("[PDAL] No schema/dimensions found in metadata.")
-
-    # Access statistics robustly
-    stats_found = False
-    stats = readers_las.get('stats')
-    if stats:
-        if 'statistic' in stats:
-            lines.append("[PDAL] LAS Dimension Statistics:")
-            for stat in stats['statistic']:
-                lines.append(f"  Dimension: {stat.get('name')}, Min: {stat.get('minimum')}, Max: {stat.get('maximum')}, Average: {stat.get('average')}")
-            stats_found = True
-        if 'bbox' in stats and 'native' in stats['bbox']:
-            bbox = stats['bbox']['native']
-            lines.append(f"[PDAL] Bounding Box: MinX={bbox.get('minx')}, MinY={bbox.get('miny')}, MinZ={bbox.get('minz')}, MaxX={bbox.get('maxx')}, MaxY={bbox.get('maxy')}, MaxZ={bbox.get('maxz')}")
-            stats_found = True
-        else:
-            lines.append("[PDAL] No bounding box found in statistics.")
+    if meta["version"]:
+        lines.append(f"[LAS] Version {meta['version']}, point format {meta['point_format']}")
+    if meta["generating_software"] or meta["creation_date"]:
+        lines.append(f"[LAS] Generated by {meta['generating_software']} on {meta['creation_date']}")
+    lines.append(f"[LAS] Point count: {meta['point_count']:,}")
+    if meta["points_by_return"]:
+        lines.append("[LAS] Points by return:")
+        for i, count in enumerate(meta["points_by_return"], start=1):
+            lines.append(f"  Return {i}: {count:,}")
+    if meta["mins"] and meta["maxs"]:
+        (minx, miny, minz), (maxx, maxy, maxz) = meta["mins"], meta["maxs"]
+        lines.append(f"[LAS] Bounding Box: MinX={minx}, MinY={miny}, MinZ={minz}, MaxX={maxx}, MaxY={maxy}, MaxZ={maxz}")
+    if meta["scales"]:
+        lines.append(f"[LAS] Scales: {meta['scales']}, Offsets: {meta['offsets']}")
+    lines.append(f"[LAS] CRS: {meta['crs'] or 'not set'}")
+    if meta["vlrs"]:
+        lines.append("[LAS] VLRs:")
+        for vlr in meta["vlrs"]:
+            lines.append(f"  {vlr['user_id']} ({vlr['record_id']}): {vlr['description']}")
     else:
-        lines.append("[PDAL] No statistics found in metadata.")
+        lines.append("[LAS] No VLRs")
+    lines.append("[LAS] Schema Dimensions:")
+    for dim in meta["schema"]:
+        lines.append(f"  Name: {dim['name']}, Type: {dim['type']}, Bits: {dim['bits']}")
+    return "\n".join(lines)
+
+
+def compute_las_statistics(file_path, chunk_size=1000000, use_cache=True, progress_callback=None):
+    """
+    Compute min/max/mean of every dimension by streaming the whole file.
+
+    This decodes every point, so it is meant to run on a background worker
+    (fileio.load_worker.LasStatisticsWorker).  Results are cached per file
+    (invalidated when the file changes), so it only runs once.
+
+    Returns:
+        dict: dimension name -> {"minimum", "maximum", "average"}
+    """
+    from fileio.point_cache import get_point_cache
+    cache = get_point_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.load_stats(file_path)
+        if cached is not None:
+            return cached
+    total_points = read_las_header(file_path)["point_count"]
+    mins, maxs, sums = {}, {}, {}
+    loaded = 0
+    for chunk in iter_las_chunks(file_path, chunk_size=chunk_size):
+        for name, arr in chunk.items():
+            if len(arr) == 0:
+                continue
+            lo, hi, total = float(arr.min()), float(arr.max()), float(arr.sum(dtype=np.float64))
+            mins[name] = min(mins.get(name, lo), lo)
+            maxs[name] = max(maxs.get(name, hi), hi)
+            sums[name] = sums.get(name, 0.0) + total
+        loaded += len(next(iter(chunk.values()))) if chunk else 0
+        if progress_callback is not None and total_points > 0:
+            progress_callback(min(int(loaded / total_points * 100), 100))
+    stats = {
+        name: {"minimum": mins[name], "maximum": maxs[name], "average": sums[name] / loaded}
+        for name in sorted(mins)
+    }
+    if cache is not None:
+        cache.store_stats(file_path, stats)
+    return stats
+
 
-    # If neither schema nor stats found, print the full metadata for user inspection
-    if not schema_found and not stats_found:
-        lines.append("[PDAL] Full available metadata:")
-        lines.append(json.dumps(metadata, indent=2))
+def format_las_statistics(stats):
+    lines = ["[LAS] Dimension Statistics:"]
+    for name, stat in stats.items():
+        lines.append(f"  Dimension: {name}, Min: {stat['minimum']}, Max: {stat['maximum']}, Average: {stat['average']}")
     return "\n".join(lines)
 
 def main():
@@ -0,0 +1,187 @@
+"""
+Background loading of LAS/LAZ files.
+
+PointCloudLoadWorker runs load_point_cloud_data on a QThread so the GUI stays
+responsive, emitting the XYZ of each decoded chunk for progressive display,
+and builds the layer's LOD structures (viewer.point_octree.build_layer_lod)
+before handing it over, so the first draw or camera drag does not.
+COPC files are opened as a coarse overview instead (fileio.copc_reader), and
+CopcRefineWorker fetches deeper octree levels for the area in view, with
+their LOD structures.
+MultiFileLoadWorker decodes several files in parallel processes
+(fileio.parallel_loader).  LasStatisticsWorker computes full-file dimension
+statistics the same way.
+"""
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from fileio.las_loader import load_point_cloud_data, compute_las_statistics, LoadCancelled
+from fileio.copc_reader import CopcPointSource, is_copc_file
+
+
+class PointCloudLoadWorker(QThread):
+    chunk_signal = pyqtSignal(object)      # Nx3 float32 XYZ (relative to origin) of a decoded chunk
+    progress_signal = pyqtSignal(int)      # 0-100
+    finished_signal = pyqtSignal(object)   # dict returned by load_point_cloud_data plus "lod"
+    error_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal()
+
+    def __init__(self, file_path, chunk_size=100000, origin=None, bounds=None, polygon=None, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.origin = origin  # scene origin the points are stored relative to
+        self.bounds = bounds  # optional area to load (see load_point_cloud_data)
+        self.polygon = polygon
+        self._cancel_requested = False
+
+    def cancel(self):
+        """Ask the worker to stop after the chunk currently being decoded."""
+        self._cancel_requested = True
+
+    def is_cancel_requested(self):
+        return self._cancel_requested
+
+    def _check_cancel(self):
+        if self._cancel_requested:
+            raise LoadCancelled(self.file_path)
+
+    def _on_chunk(self, xyz):
+        self._check_cancel()
+        self.chunk_signal.emit(xyz)
+
+    def _on_progress(self, value):
+        self._check_cancel()
+        self.progress_signal.emit(value)
+
+    def run(self):
+        from viewer.point_octree import build_layer_lod
+        try:
+            if self.bounds is None and self.polygon is None and is_copc_file(self.file_path):
+                self._check_cancel()
+                source = CopcPointSource(self.file_path, origin=self.origin)
+                data = source.overview()
+                data["copc"] = source
+                self._on_chunk(data["points"])
+                data["lod"] = build_layer_lod(data["points"])
+                self._check_cancel()
+                self.progress_signal.emit(100)
+                self.finished_signal.emit(data)
+                return
+            data = load_point_cloud_data(
+                self.file_path,
+                chunk_size=self.chunk_size,
+                progress_callback=self._on_progress,
+                chunk_callback=self._on_chunk,
+                origin=self.origin,
+                bounds=self.bounds,
+                polygon=self.polygon
+            )
+            self._check_cancel()
+            data["lod"] = build_layer_lod(data["points"])
+            self._check_cancel()
+            self.finished_signal.emit(data)
+        except LoadCancelled:
+            print(f"[LOADER] Load cancelled: {self.file_path}")
+            self.cancelled_signal.emit()
+        except Exception as e:
+            print(f"[ERROR] Background load failed for {self.file_path}: {e}")
+            self.error_signal.emit(str(e))
+
+
+class MultiFileLoadWorker(QThread):
+    file_loaded_signal = pyqtSignal(object)  # dict for one file: file_path, "lod" plus load_point_cloud_data keys
+    progress_signal = pyqtSignal(int)        # 0-100, by files completed
+    finished_signal = pyqtSignal()
+    error_signal = pyqtSignal(str)
+    cancelled_signal = pyqtSignal()
+
+    def __init__(self, file_paths, origin=None, workers=None, parent=None):
+        super().__init__(parent)
+        self.file_paths = list(file_paths)
+        self.file_path = f"{len(self.file_paths)} files"  # for status messages shared with single loads
+        self.origin = origin
+        self.workers = workers
+        self.failed = []
+        self._cancel_requested = False
+
+    def cancel(self):
+        """Stop after the files currently being decoded; their results are discarded."""
+        self._cancel_requested = True
+
+    def is_cancel_requested(self):
+        return self._cancel_requested
+
+    def run(self):
+        from fileio.parallel_loader import load_files_parallel
+        done = 0
+        try:
+            for data in load_files_parallel(self.file_paths, origin=self.origin, workers=self.workers,
+                                            is_cancelled=self.is_cancel_requested):
+                done += 1
+                if "error" in data:
+                    self.failed.append(data["file_path"])
+                    self.error_signal.emit(f"Failed to load {data['file_path']}: {data['error']}")
+                else:
+                    self.file_loaded_signal.emit(data)
+                self.progress_signal.emit(int(done / len(self.file_paths) * 100))
+        except Exception as e:
+            print(f"[ERROR] Parallel load failed: {e}")
+            self.error_signal.emit(str(e))
+        if self._cancel_requested:
+            print("[LOADER] Parallel load cancelled")
+            self.cancelled_signal.emit()
+        else:
+            self.finished_signal.emit()
+
+
+class CopcRefineWorker(QThread):
+    finished_signal = pyqtSignal(object)   # dict from CopcPointSource.refine plus "lod", or None if unchanged
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, source, bounds, spacing, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.bounds = bounds    # world XY (xmin, ymin, xmax, ymax) in view
+        self.spacing = spacing  # world units per screen pixel
+
+    def run(self):
+        from viewer.point_octree import build_layer_lod
+        try:
+            result = self.source.refine(self.bounds, self.spacing)
+            if result is not None:
+                # LOD ordering / octree for the new points, built here rather than on the GUI thread
+                result["lod"] = build_layer_lod(result["points"])
+            self.finished_signal.emit(result)
+        except Exception as e:
+            print(f"[ERROR] COPC refine failed for {self.source.file_path}: {e}")
+            self.error_signal.emit(str(e))
+
+
+class LasStatisticsWorker(QThread):
+    progress_signal = pyqtSignal(int)      # 0-100
+    finished_signal = pyqtSignal(object)   # dict returned by compute_las_statistics
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def _on_progress(self, value):
+        if self._cancel_requested:
+            raise LoadCancelled(self.file_path)
+        self.progress_signal.emit(value)
+
+    def run(self):
+        try:
+            stats = compute_las_statistics(self.file_path, progress_callback=self._on_progress)
+            self.finished_signal.emit(stats)
+        except LoadCancelled:
+            print(f"[LOADER] Statistics cancelled: {self.file_path}")
+        except Exception as e:
+            print(f"[ERROR] Statistics failed for {self.file_path}: {e}")
+            self.error_signal.emit(str(e))
@@ -0,0 +1,253 @@
+"""
+Parallel loading of several LAS/LAZ files.
+
+Each file is decoded in its own process (LAZ decompression only partly
+releases the GIL, so threads would mostly take turns).  The parent allocates
+a shared memory block per file, sized from the header point count, and owns
+it throughout: the worker attaches by name, writes the finished float32
+point array into it and detaches, and the parent then uses the block as the
+layer's point array without copying or pickling the points.  Because the
+parent's handle stays open from allocation to release, the block survives
+the worker on every platform (on Windows a named mapping disappears with its
+last handle).
+
+The workers also build the layer's LOD structures (viewer.point_octree.
+build_layer_lod) next to the decode, so N files take one file's time there
+too; the point ordering goes back through a second shared block and only the
+octree's small leaf arrays are pickled.
+
+The workers return only the columns' metadata; the parent opens the other
+dimensions lazily (memory-mapped from the point cache when the worker's store
+is still there), so nothing is decoded a second time in the parent.
+"""
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+POINT_DTYPE = np.dtype(np.float32)
+
+
+def order_dtype(count: int) -> np.dtype:
+    """dtype of a ``count`` point LOD ordering (int32 while indices fit)."""
+    return np.dtype(np.int32 if count < 2 ** 31 else np.int64)
+
+
+def _open_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block the parent owns, without this process's resource tracker claiming it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the name too, but spawned workers share
+    # the parent's tracker, and the parent's unlink() unregisters it
+    return shared_memory.SharedMemory(name=name)
+
+
+def _decode_into_shared_memory(file_path: str, origin: Sequence[float], chunk_size: int,
+                               shm_name: str, order_shm_name: str, capacity: int,
+                               octree_min_points: Optional[int] = None) -> Dict:
+    """
+    Worker process: decode a file into the parent's block of ``capacity``
+    points and build its LOD structures, writing their point ordering into
+    the parent's ordering block.
+    """
+    from fileio.las_loader import load_point_cloud_data
+    from viewer.point_octree import build_layer_lod
+    data = load_point_cloud_data(file_path, chunk_size=chunk_size, origin=origin)
+    points = data["points"]
+    las = data["las"]
+    lod = build_layer_lod(points, octree_min_points)
+    result = {
+        "file_path": file_path,
+        "count": len(points),
+        "origin": data["origin"],
+        "dims": data["dims"],
+        "scales": las.scales,
+        "offsets": las.offsets,
+    }
+    if len(points) > capacity:
+        # The header under-reports the point count; hand everything back the slow way
+        result["points"] = points
+        result["lod"] = lod
+        return result
+    octree = lod["octree"]
+    order = octree.order if octree is not None else lod["lod_order"]
+    result["lod"] = {"bounds": lod["bounds"], "octree": octree.state() if octree is not None else None,
+                     "has_order": order is not None}
+    _write_shared(shm_name, points)
+    if order is not None:
+        _write_shared(order_shm_name, order.astype(order_dtype(capacity), copy=False))
+    return result
+
+
+def _write_shared(shm_name: str, values: np.ndarray):
+    shm = _open_shared_memory(shm_name)
+    try:
+        block = np.frombuffer(shm.buf, dtype=values.dtype, count=values.size).reshape(values.shape)
+        block[:] = values
+        del block
+    finally:
+        shm.close()
+
+
+class _SharedBlock:
+    """
+    Owner of a shared memory block exposed as one numpy array.
+
+    numpy keeps the owner as the array's base, so the block lives exactly as
+    long as the array (and any view of it) and is closed when the last one
+    goes.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Sequence[int], dtype: np.dtype):
+        self._shm = shm
+        self._array = np.frombuffer(shm.buf, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        self.__array_interface__ = self._array.__array_interface__
+
+    def __del__(self):
+        # Drop our export of the buffer first, or close() refuses
+        self._array = None
+        self._shm.close()
+
+
+def allocate_shared_points(count: int) -> shared_memory.SharedMemory:
+    """Create a block for ``count`` float32 XYZ points, owned by the caller."""
+    return shared_memory.SharedMemory(create=True, size=max(count * 3 * POINT_DTYPE.itemsize, 1))
+
+
+def allocate_shared_order(count: int) -> shared_memory.SharedMemory:
+    """Create a block for the LOD ordering of ``count`` points, owned by the caller."""
+    return shared_memory.SharedMemory(create=True, size=max(count * order_dtype(count).itemsize, 1))
+
+
+def attach_shared_points(shm: shared_memory.SharedMemory, count: int) -> np.ndarray:
+    """
+    Turn an owned block holding ``count`` points into the layer's Nx3 array.
+
+    The block's name is unlinked straight away (it is not needed once the
+    worker is done, and this way it cannot leak if the app exits early); the
+    memory is freed when the array, and any VTK mesh wrapping it, is released.
+    """
+    shm.unlink()
+    return np.asarray(_SharedBlock(shm, (count, 3), POINT_DTYPE))
+
+
+def attach_shared_order(shm: shared_memory.SharedMemory, count: int, capacity: int) -> np.ndarray:
+    """Like attach_shared_points, for a block allocated by allocate_shared_order(capacity)."""
+    shm.unlink()
+    return np.asarray(_SharedBlock(shm, (count,), order_dtype(capacity)))
+
+
+def release_shared_points(shm: shared_memory.SharedMemory):
+    """Free a block that will not be attached (the load failed or was cancelled)."""
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def common_origin(file_paths: Sequence[str]) -> np.ndarray:
+    """Origin for a set of files: local_origin of the lowest header minimum among them."""
+    from fileio.las_loader import local_origin, read_las_header
+    mins = []
+    for path in file_paths:
+        try:
+            mins.append(read_las_header(path).get("mins"))
+        except Exception as e:
+            # load_files_parallel reports the file itself
+            print(f"[WARN] Could not read header of {path}: {e}")
+    mins = [m for m in mins if m is not None]
+    return local_origin(np.min(mins, axis=0) if mins else None)
+
+
+def load_files_parallel(file_paths: List[str], origin: Optional[Sequence[float]] = None,
+                        workers: Optional[int] = None, chunk_size: int = 100000,
+                        is_cancelled: Optional[Callable[[], bool]] = None,
+                        octree_min_points: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Decode several files concurrently, yielding each as soon as it is ready.
+
+    All files are stored relative to one origin (``origin``, or common_origin
+    of the files) so they drop straight into a single scene.
+
+    Yields:
+        dict: file_path plus the keys of load_point_cloud_data (las, points,
+        origin, dims) and lod (build_layer_lod's result, with
+        ``octree_min_points``, by default the viewer's setting), or file_path
+        and error if that file failed
+    """
+    from fileio.las_loader import lazy_las_columns, read_las_header
+    from viewer.lod_system import get_lod_system
+    if octree_min_points is None:
+        octree_min_points = get_lod_system().octree_min_points
+    origin = np.asarray(origin if origin is not None else common_origin(file_paths), dtype=np.float64)
+    workers = min(workers or os.cpu_count() or 1, len(file_paths)) or 1
+    print(f"[LOADER] Loading {len(file_paths)} files with {workers} processes")
+    # future -> (points block, ordering block, capacity)
+    blocks = {}
+    # spawn: forking a process that runs Qt and VTK threads is not safe
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {}
+            for path in file_paths:
+                try:
+                    capacity = read_las_header(path)["point_count"]
+                except Exception as e:
+                    print(f"[ERROR] Failed to read header of {path}: {e}")
+                    yield {"file_path": path, "error": str(e)}
+                    continue
+                shm, order_shm = allocate_shared_points(capacity), allocate_shared_order(capacity)
+                future = pool.submit(_decode_into_shared_memory, path, origin, chunk_size, shm.name, order_shm.name,
+                                     capacity, octree_min_points)
+                futures[future] = path
+                blocks[future] = (shm, order_shm, capacity)
+            for future in as_completed(futures):
+                path = futures[future]
+                if is_cancelled is not None and is_cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    return
+                shm, order_shm, capacity = blocks.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[ERROR] Failed to load {path}: {e}")
+                    release_shared_points(shm)
+                    release_shared_points(order_shm)
+                    yield {"file_path": path, "error": str(e)}
+                    continue
+                if "points" in result:
+                    release_shared_points(shm)
+                    release_shared_points(order_shm)
+                    points, lod = result["points"], result["lod"]
+                else:
+                    points = attach_shared_points(shm, result["count"])
+                    lod = _attach_lod(result["lod"], order_shm, result["count"], capacity)
+                las, dims = lazy_las_columns(path, result["dims"], result["count"],
+                                             result["scales"], result["offsets"], chunk_size=chunk_size)
+                yield {"file_path": path, "las": las, "points": points, "origin": result["origin"], "dims": dims,
+                       "lod": lod}
+    finally:
+        # Cancelled, failed or abandoned: the pool has shut down, so no worker still writes
+        for shm, order_shm, _ in blocks.values():
+            release_shared_points(shm)
+            release_shared_points(order_shm)
+
+
+def _attach_lod(worker_lod: Dict, order_shm: shared_memory.SharedMemory, count: int, capacity: int) -> Dict:
+    """build_layer_lod's result from a worker's description and the ordering it wrote."""
+    if not worker_lod["has_order"]:
+        release_shared_points(order_shm)
+        return {"lod_order": None, "octree": None, "bounds": worker_lod["bounds"]}
+    order = attach_shared_order(order_shm, count, capacity)
+    if worker_lod["octree"] is not None:
+        from viewer.point_octree import PointOctree
+        return {"lod_order": None, "octree": PointOctree.from_state(worker_lod["octree"], order),
+                "bounds": worker_lod["bounds"]}
+    return {"lod_order": order, "octree": None, "bounds": worker_lod["bounds"]}
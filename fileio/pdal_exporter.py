@@ -0,0 +1,171 @@
+"""
+COPC export and batch conversion.
+
+COPC (Cloud Optimized Point Cloud) is LAZ 1.4 with points ordered in an
+octree and a hierarchy VLR describing it.  Files converted once open
+progressively and support spatial reads (see fileio.copc_reader), instead of
+needing a full decode every time.
+
+laspy cannot write COPC, so conversion goes through PDAL's writers.copc, or
+the ``untwine`` command line tool when the PDAL Python bindings are missing.
+
+Usage:
+    python -m fileio.pdal_exporter <directory> [--output-dir DIR] [--recursive] [--workers N] [--overwrite]
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, List, Optional
+
+import numpy as np
+
+try:
+    import pdal
+    PDAL_AVAILABLE = True
+except ImportError:
+    PDAL_AVAILABLE = False
+
+COPC_SUFFIX = ".copc.laz"
+LAS_EXTENSIONS = (".las", ".laz")
+
+
+def copc_output_path(input_path: str, output_dir: Optional[str] = None) -> str:
+    """Output name for a converted file: tile.laz -> tile.copc.laz, next to the input by default."""
+    base = os.path.basename(input_path)
+    for ext in (COPC_SUFFIX, ".laz", ".las", ".LAZ", ".LAS"):
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+            break
+    return os.path.join(output_dir or os.path.dirname(os.path.abspath(input_path)), base + COPC_SUFFIX)
+
+
+def convert_to_copc(input_path: str, output_path: Optional[str] = None, overwrite: bool = False) -> str:
+    """
+    Convert a LAS/LAZ file to COPC, keeping every dimension and the CRS.
+
+    The file is written under a temporary name and moved into place when
+    complete.  An output newer than its input is left alone unless
+    ``overwrite`` is set.
+
+    Returns:
+        str: Path of the COPC file
+    """
+    output_path = output_path or copc_output_path(input_path)
+    if (not overwrite and os.path.exists(output_path)
+            and os.path.getmtime(output_path) >= os.path.getmtime(input_path)):
+        print(f"[COPC] Up to date: {output_path}")
+        return output_path
+    tmp_path = f"{output_path[:-len(COPC_SUFFIX)]}.tmp-{os.getpid()}{COPC_SUFFIX}"
+    try:
+        if PDAL_AVAILABLE:
+            pipeline = pdal.Pipeline(json.dumps({"pipeline": [
+                {"type": "readers.las", "filename": input_path},
+                {"type": "writers.copc", "filename": tmp_path, "forward": "all"}
+            ]}))
+            pipeline.execute()
+        elif shutil.which("untwine"):
+            # --single_file makes untwine write one COPC file at --output_dir instead of a tile directory
+            subprocess.run(["untwine", f"--files={input_path}", f"--output_dir={tmp_path}", "--single_file"],
+                           check=True, capture_output=True)
+        else:
+            raise ImportError("COPC conversion requires the pdal Python bindings or the untwine tool")
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"[COPC] Converted '{input_path}' -> '{output_path}'")
+    return output_path
+
+
+def export_points_to_copc(points: np.ndarray,
+                          output_path: str,
+                          original_las: Optional[Any] = None,
+                          point_indices: Optional[np.ndarray] = None,
+                          origin: Optional[np.ndarray] = None) -> bool:
+    """
+    Export points to a COPC file.
+
+    Takes the same arguments as las_exporter.export_points_to_laz, which
+    writes an intermediate LAS that is then converted.
+
+    Returns:
+        bool: Success status
+    """
+    from fileio.las_exporter import export_points_to_laz
+    fd, tmp_las = tempfile.mkstemp(suffix=".las")
+    os.close(fd)
+    try:
+        if not export_points_to_laz(points, tmp_las, original_las, point_indices,
+                                    preserve_all_dimensions=True, origin=origin):
+            return False
+        convert_to_copc(tmp_las, output_path, overwrite=True)
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to export COPC file: {e}")
+        return False
+    finally:
+        os.remove(tmp_las)
+
+
+def find_conversion_inputs(directory: str, recursive: bool = False) -> List[str]:
+    """LAS/LAZ files in a directory that are not COPC already."""
+    from fileio.copc_reader import is_copc_file
+    if recursive:
+        paths = [os.path.join(root, f) for root, _, files in os.walk(directory) for f in files]
+    else:
+        paths = [os.path.join(directory, f) for f in os.listdir(directory)]
+    return sorted(
+        p for p in paths
+        if p.lower().endswith(LAS_EXTENSIONS) and not p.lower().endswith(COPC_SUFFIX) and not is_copc_file(p)
+    )
+
+
+def convert_directory_to_copc(directory: str, output_dir: Optional[str] = None, recursive: bool = False,
+                              workers: Optional[int] = None, overwrite: bool = False) -> List[str]:
+    """
+    Convert every plain LAS/LAZ tile in a directory to COPC, one file per
+    process across all cores (``workers`` defaults to os.cpu_count()).
+
+    Returns:
+        list: Paths of the COPC files written or already up to date
+    """
+    inputs = find_conversion_inputs(directory, recursive=recursive)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    print(f"[COPC] Converting {len(inputs)} files in '{directory}' with {workers} workers")
+    outputs = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(convert_to_copc, path, copc_output_path(path, output_dir), overwrite): path
+            for path in inputs
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            path = futures[future]
+            try:
+                outputs.append(future.result())
+                print(f"[COPC] {done}/{len(inputs)} done: {os.path.basename(path)}")
+            except Exception as e:
+                print(f"[COPC] {done}/{len(inputs)} failed: {path}: {e}")
+    return sorted(outputs)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert LAS/LAZ tiles to COPC for fast, progressive viewing")
+    parser.add_argument("directory")
+    parser.add_argument("--output-dir", default=None, help="Where to write .copc.laz files (default: next to the inputs)")
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel conversions (default: all cores)")
+    parser.add_argument("--overwrite", action="store_true", help="Convert even if an up to date output exists")
+    args = parser.parse_args()
+    convert_directory_to_copc(args.directory, output_dir=args.output_dir, recursive=args.recursive,
+                              workers=args.workers, overwrite=args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Columnar point cache for instant re-opening of LAS/LAZ files.
+
+Decoded dimensions are written as individual .npy columns in a per-file cache
+directory keyed by path + mtime + size (XYZ on first open, other dimensions as
+they are first decoded).  Later loads memory-map those columns
+(np.load(mmap_mode='r')), so re-opening skips LAZ decoding entirely and layers
+opened from the same file share the OS page cache.
+
+The cache is size bounded; least recently used entries are evicted first.
+
+Usage:
+    python -m fileio.point_cache prewarm <directory> [--recursive]
+    python -m fileio.point_cache info
+    python -m fileio.point_cache clear
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fileio.las_columns import LasColumns
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "LIDAR_VIEWER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".lidar_viewer", "point_cache")
+)
+DEFAULT_MAX_CACHE_BYTES = 20 * 1024 ** 3  # 20 GB
+META_FILE = "meta.json"
+STATS_DIR = "stats"
+LAS_EXTENSIONS = (".las", ".laz")
+
+
+class PointCache:
+    """Size-bounded LRU cache of memory-mapped LAS dimension columns."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def cache_key(self, file_path: str) -> str:
+        """Key a source file by absolute path, modification time and size."""
+        stat = os.stat(file_path)
+        ident = f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def entry_dir(self, file_path: str) -> str:
+        return os.path.join(self.cache_dir, self.cache_key(file_path))
+
+    def has(self, file_path: str) -> bool:
+        try:
+            return os.path.exists(os.path.join(self.entry_dir(file_path), META_FILE))
+        except OSError:
+            return False
+
+    def load(self, file_path: str) -> Optional[Tuple[LasColumns, List[str]]]:
+        """
+        Memory-map the cached columns for a file.
+
+        Returns:
+            tuple: (LasColumns, dimension names), or None on a cache miss
+        """
+        if not self.has(file_path):
+            return None
+        entry = self.entry_dir(file_path)
+        try:
+            meta = self._read_meta(entry)
+            columns = {
+                name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r")
+                for name in meta["dims"]
+            }
+            self._touch(entry, meta)
+        except Exception as e:
+            print(f"[CACHE] Discarding unreadable cache entry for '{file_path}': {e}")
+            self._remove_entry(entry)
+            return None
+        all_dims = meta.get("all_dims", meta["dims"])
+        print(f"[CACHE] Hit for '{file_path}' ({meta['point_count']:,} points, "
+              f"{len(meta['dims'])}/{len(all_dims)} dimensions cached)")
+        return LasColumns(columns, meta.get("scales"), meta.get("offsets"), dims=all_dims), list(all_dims)
+
+    def store(self, file_path: str, las: LasColumns, dims: List[str]) -> bool:
+        """
+        Write columns of a loaded file into the cache, then enforce the size bound.
+
+        Only ``dims`` are written; the full dimension list of ``las`` is recorded
+        so the remaining columns can be added later with store_column().
+        """
+        entry = self.entry_dir(file_path)
+        tmp_entry = f"{entry}.tmp-{os.getpid()}"
+        try:
+            os.makedirs(tmp_entry, exist_ok=True)
+            nbytes = 0
+            for name in dims:
+                column = las.raw(name) if isinstance(las, LasColumns) else las[name]
+                np.save(os.path.join(tmp_entry, f"{name}.npy"), np.ascontiguousarray(column))
+                nbytes += column.nbytes
+            raw = isinstance(las, LasColumns) and las.is_raw("X")
+            meta = {
+                "source": os.path.abspath(file_path),
+                "dims": list(dims),
+                "all_dims": list(las),
+                "point_count": len(las.raw(dims[0]) if isinstance(las, LasColumns) else las[dims[0]]) if dims else 0,
+                "scales": las.scales.tolist() if raw else None,
+                "offsets": las.offsets.tolist() if raw else None,
+                "nbytes": nbytes,
+                "last_access": time.time(),
+            }
+            # meta.json is written last; its presence marks a complete entry
+            with open(os.path.join(tmp_entry, META_FILE), "w") as f:
+                json.dump(meta, f)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_entry, entry)
+        except Exception as e:
+            print(f"[CACHE] Failed to cache '{file_path}': {e}")
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            return False
+        print(f"[CACHE] Stored '{file_path}' ({nbytes / 1024 ** 2:.1f} MB)")
+        self.evict(keep=os.path.basename(entry))
+        return True
+
+    def store_column(self, file_path: str, name: str, column: np.ndarray) -> bool:
+        """Add one more dimension column to an existing cache entry."""
+        if not self.has(file_path):
+            return False
+        entry = self.entry_dir(file_path)
+        try:
+            meta = self._read_meta(entry)
+            if name in meta["dims"]:
+                return True
+            tmp_path = os.path.join(entry, f"{name}.npy.tmp-{os.getpid()}")
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(column))
+            os.replace(tmp_path, os.path.join(entry, f"{name}.npy"))
+            meta["dims"].append(name)
+            meta["nbytes"] += column.nbytes
+            self._touch(entry, meta)
+        except Exception as e:
+            print(f"[CACHE] Failed to cache dimension '{name}' of '{file_path}': {e}")
+            return False
+        self.evict(keep=os.path.basename(entry))
+        return True
+
+    def load_stats(self, file_path: str) -> Optional[Dict]:
+        """Return the cached full-file statistics for a file, if computed before."""
+        path = self._stats_path(file_path)
+        try:
+            with open(path, "r") as f:
+                stats = json.load(f)
+            # Modification time is the statistics' last access for eviction
+            os.utime(path)
+            return stats
+        except (OSError, ValueError):
+            return None
+
+    def store_stats(self, file_path: str, stats: Dict) -> bool:
+        """Cache full-file statistics (compute_las_statistics) under the file's key."""
+        path = self._stats_path(file_path)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp-{os.getpid()}"
+            with open(tmp_path, "w") as f:
+                json.dump(stats, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[CACHE] Failed to cache statistics of '{file_path}': {e}")
+            return False
+        return True
+
+    def _stats_path(self, file_path: str) -> str:
+        return os.path.join(self.cache_dir, STATS_DIR, f"{self.cache_key(file_path)}.json")
+
+    def entries(self) -> List[Dict]:
+        """List cache entries with their metadata, oldest access first."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        result = []
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            if not os.path.exists(os.path.join(entry, META_FILE)):
+                continue
+            try:
+                meta = self._read_meta(entry)
+            except Exception:
+                continue
+            meta["key"] = name
+            result.append(meta)
+        return sorted(result, key=lambda m: m.get("last_access", 0))
+
+    def stats_entries(self) -> List[Dict]:
+        """List cached statistics files (key, nbytes, last_access), oldest access first."""
+        stats_dir = os.path.join(self.cache_dir, STATS_DIR)
+        if not os.path.isdir(stats_dir):
+            return []
+        result = []
+        for name in os.listdir(stats_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(stats_dir, name))
+            except OSError:
+                continue
+            result.append({"key": name[:-len(".json")], "nbytes": stat.st_size, "last_access": stat.st_mtime})
+        return sorted(result, key=lambda m: m["last_access"])
+
+    def total_bytes(self) -> int:
+        return sum(m.get("nbytes", 0) for m in self.entries() + self.stats_entries())
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used entries and statistics until the cache fits
+        max_bytes.  An entry that cannot be removed yet (on Windows, while a
+        layer still memory-maps its columns) is kept and retried next time.
+        """
+        entries = [(meta, False) for meta in self.entries()] + [(meta, True) for meta in self.stats_entries()]
+        entries.sort(key=lambda item: item[0].get("last_access", 0))
+        total = sum(meta.get("nbytes", 0) for meta, _ in entries)
+        removed = 0
+        for meta, is_stats in entries:
+            if total <= self.max_bytes:
+                break
+            if meta["key"] == keep:
+                continue
+            if is_stats:
+                try:
+                    os.remove(os.path.join(self.cache_dir, STATS_DIR, f"{meta['key']}.json"))
+                except OSError as e:
+                    print(f"[CACHE] Could not evict statistics {meta['key']}: {e}")
+                    continue
+            elif not self._remove_entry(os.path.join(self.cache_dir, meta["key"])):
+                continue
+            total -= meta.get("nbytes", 0)
+            removed += 1
+            print(f"[CACHE] Evicted {'statistics ' + meta['key'] if is_stats else repr(meta.get('source'))}")
+        return removed
+
+    def clear(self):
+        try:
+            shutil.rmtree(self.cache_dir)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[CACHE] Could not remove all of '{self.cache_dir}': {e}")
+
+    def _remove_entry(self, entry: str) -> bool:
+        """
+        Delete an entry directory, its meta.json last: if a column cannot be
+        deleted (still memory-mapped on Windows) the entry stays listed and
+        the next eviction tries again.
+        """
+        try:
+            for name in os.listdir(entry):
+                if name != META_FILE:
+                    os.remove(os.path.join(entry, name))
+            shutil.rmtree(entry)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[CACHE] Could not remove '{entry}' (retrying at the next eviction): {e}")
+            return False
+        return True
+
+    def _read_meta(self, entry: str) -> Dict:
+        with open(os.path.join(entry, META_FILE), "r") as f:
+            return json.load(f)
+
+    def _touch(self, entry: str, meta: Dict):
+        meta = {k: v for k, v in meta.items() if k != "key"}
+        meta["last_access"] = time.time()
+        # Replace meta.json whole: a reader must never see it half written
+        tmp_path = os.path.join(entry, f"{META_FILE}.tmp-{os.getpid()}-{threading.get_ident()}")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, os.path.join(entry, META_FILE))
+        except OSError as e:
+            print(f"[CACHE] Could not update '{entry}': {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+# Global point cache instance
+_point_cache = None
+
+def get_point_cache() -> PointCache:
+    """Get the global point cache instance"""
+    global _point_cache
+    if _point_cache is None:
+        _point_cache = PointCache()
+    return _point_cache
+
+
+def prewarm_directory(directory: str, recursive: bool = False, cache: Optional[PointCache] = None) -> int:
+    """
+    Decode every LAS/LAZ file in a directory into the cache.
+
+    Returns:
+        int: Number of files newly cached
+    """
+    from fileio.las_loader import load_las_file
+    cache = cache or get_point_cache()
+    if recursive:
+        paths = [os.path.join(root, f) for root, _, files in os.walk(directory) for f in files]
+    else:
+        paths = [os.path.join(directory, f) for f in os.listdir(directory)]
+    paths = sorted(p for p in paths if p.lower().endswith(LAS_EXTENSIONS))
+    cached = 0
+    for path in paths:
+        if cache.has(path):
+            print(f"[CACHE] Already cached: {path}")
+            continue
+        try:
+            las, dims = load_las_file(path, raw_xyz=True)
+            if dims and cache.store(path, las, dims):
+                cached += 1
+        except Exception as e:
+            print(f"[CACHE] Failed to prewarm '{path}': {e}")
+    print(f"[CACHE] Prewarmed {cached} of {len(paths)} files in '{directory}'")
+    return cached
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Manage the LiDAR Viewer point cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Cache directory (default: %(default)s)")
+    parser.add_argument("--max-gb", type=float, default=DEFAULT_MAX_CACHE_BYTES / 1024 ** 3,
+                        help="Cache size bound in GB")
+    sub = parser.add_subparsers(dest="command", required=True)
+    prewarm = sub.add_parser("prewarm", help="Cache every LAS/LAZ file in a directory")
+    prewarm.add_argument("directory")
+    prewarm.add_argument("--recursive", action="store_true")
+    sub.add_parser("info", help="List cache entries")
+    sub.add_parser("clear", help="Delete the whole cache")
+    args = parser.parse_args()
+
+    cache = PointCache(args.cache_dir, int(args.max_gb * 1024 ** 3))
+    if args.command == "prewarm":
+        prewarm_directory(args.directory, recursive=args.recursive, cache=cache)
+    elif args.command == "info":
+        entries = cache.entries()
+        for meta in entries:
+            print(f"{meta['nbytes'] / 1024 ** 2:10.1f} MB  {meta['point_count']:>12,} pts  {meta.get('source')}")
+        print(f"{len(entries)} entries, {cache.total_bytes() / 1024 ** 3:.2f} GB in '{cache.cache_dir}'")
+    elif args.command == "clear":
+        cache.clear()
+        print(f"[CACHE] Cleared '{cache.cache_dir}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Spatial filters for reading part of a LAS/LAZ file.
+
+A SpatialFilter describes an area of interest as an XY bounding box, a
+polygon, or both (points must fall inside both).  The loader uses it to skip
+files whose header bounds miss the area, to push the area down to COPC
+queries and PDAL filters.crop, and to mask each decoded chunk so only the
+points inside are kept.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class SpatialFilter:
+    """XY bounds and/or polygon selecting the points to load, in world coordinates."""
+
+    def __init__(self, bounds: Optional[Sequence[float]] = None,
+                 polygon: Optional[Sequence[Sequence[float]]] = None):
+        if bounds is None and polygon is None:
+            raise ValueError("SpatialFilter needs bounds or a polygon")
+        self.polygon = np.asarray(polygon, dtype=np.float64)[:, :2] if polygon is not None else None
+        if self.polygon is not None and len(self.polygon) < 3:
+            raise ValueError("A polygon needs at least 3 vertices")
+        if bounds is not None:
+            xmin, ymin, xmax, ymax = (float(v) for v in bounds)
+        else:
+            (xmin, ymin), (xmax, ymax) = self.polygon.min(axis=0), self.polygon.max(axis=0)
+        if self.polygon is not None and bounds is not None:
+            # Tighten the box to the part of the polygon inside it
+            pmin, pmax = self.polygon.min(axis=0), self.polygon.max(axis=0)
+            xmin, ymin = max(xmin, pmin[0]), max(ymin, pmin[1])
+            xmax, ymax = min(xmax, pmax[0]), min(ymax, pmax[1])
+        self.bounds = (xmin, ymin, xmax, ymax)
+        self._path = None
+        # Points looked at by the last read, filtered or not (for progress)
+        self.points_scanned = 0
+
+    @classmethod
+    def from_args(cls, bounds=None, polygon=None) -> Optional["SpatialFilter"]:
+        """Build a filter from loader arguments; None when neither is given."""
+        if bounds is None and polygon is None:
+            return None
+        return cls(bounds, polygon)
+
+    def intersects(self, mins: Sequence[float], maxs: Sequence[float]) -> bool:
+        """True if the filter's box overlaps the XY extent mins..maxs (e.g. a LAS header)."""
+        xmin, ymin, xmax, ymax = self.bounds
+        return not (maxs[0] < xmin or mins[0] > xmax or maxs[1] < ymin or mins[1] > ymax)
+
+    def mask(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Boolean mask of the points inside the filter."""
+        x = np.asarray(x)
+        y = np.asarray(y)
+        xmin, ymin, xmax, ymax = self.bounds
+        inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        if self.polygon is not None and inside.any():
+            # Only test the points inside the box against the polygon
+            candidates = np.flatnonzero(inside)
+            if self._path is None:
+                from matplotlib.path import Path
+                self._path = Path(self.polygon)
+            inside[candidates] = self._path.contains_points(np.column_stack((x[candidates], y[candidates])))
+        return inside
+
+    def pdal_stages(self):
+        """filters.crop stages implementing the filter in a PDAL pipeline."""
+        xmin, ymin, xmax, ymax = self.bounds
+        stages = [{"type": "filters.crop", "bounds": f"([{xmin}, {xmax}], [{ymin}, {ymax}])"}]
+        if self.polygon is not None:
+            ring = list(self.polygon) + [self.polygon[0]]
+            wkt = "POLYGON((" + ", ".join(f"{x} {y}" for x, y in ring) + "))"
+            stages.append({"type": "filters.crop", "polygon": wkt})
+        return stages
+
+    def __repr__(self):
+        kind = "polygon" if self.polygon is not None else "bounds"
+        return f"SpatialFilter({kind}, bounds={self.bounds})"
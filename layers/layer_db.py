@@ -1,5 +1,6 @@
 # LayerManager class to encapsulate layer state and management logic
 import colorsys
+import time
 import numpy as np
 VALUE_COLORMAP_OPTION = "Value Colors"
 
@@ -12,6 +13,9 @@ class LayerManager:
         self.layers = {}
         self.current_layer_id = None
         self.current_file_path = None
+        # float64 origin every layer's float32 points are relative to; taken
+        # from the first layer added and reset once the scene is empty
+        self.scene_origin = None
 
     def plot_all_layers(self, viewer, sidebar):
         """Clear and redraw all visible layers in the plotter."""
@@ -19,9 +23,8 @@ class LayerManager:
         if hasattr(viewer, 'plotter'):
             viewer.plotter.clear()
 
-        total_original_points = 0
-        total_rendered_points = 0
-        last_lod_info = None
+        visible = [uuid for uuid, layer in self.layers.items() if layer.get('visible', False)]
+        budgets = self.allocate_point_budget(viewer, visible)
 
         for uuid, layer in self.layers.items():
             actor = layer.get('actor', None)
@@ -33,6 +36,7 @@ class LayerManager:
 
             if not layer.get('visible', False):
                 self.layers[uuid]['actor'] = None
+                self.layers[uuid]['lod_state'] = None
                 continue
 
             settings = load_layer_settings(uuid)
@@ -44,32 +48,27 @@ class LayerManager:
                 cmap=colormap,
                 return_actor=True,
                 show_scalar_bar=False,
-                return_lod_info=True
+                return_lod_info=True,
+                mesh=self.get_layer_mesh(uuid, viewer),
+                lod_order=lambda uuid=uuid: self.get_lod_order(uuid),
+                lod_indices=self._octree_selection(uuid, viewer, budgets.get(uuid)),
+                max_points=budgets.get(uuid)
             )
 
             if isinstance(result, tuple):
                 actor, lod_info = result
-                last_lod_info = lod_info
-                total_original_points += lod_info.get('original_count', 0)
-                total_rendered_points += lod_info.get('final_count', 0)
             else:
                 actor = result
                 lod_info = None
 
             self.layers[uuid]['actor'] = actor
+            self._set_lod_state(uuid, lod_info, scalars, budgets.get(uuid))
 
             point_size = settings.get('point_size') if settings else None
             if point_size is not None and hasattr(viewer, 'set_point_size'):
                 viewer.set_point_size(point_size, actor=actor)
 
-        if hasattr(sidebar, 'update_lod_status') and last_lod_info:
-            combined_lod_info = {
-                'level': last_lod_info.get('level', 'close'),
-                'original_count': total_original_points,
-                'final_count': total_rendered_points,
-                'reduction_percent': ((total_original_points - total_rendered_points) / total_original_points * 100) if total_original_points > 0 else 0
-            }
-            sidebar.update_lod_status(combined_lod_info)
+        self._report_lod_status(viewer, sidebar)
 
         if hasattr(viewer, 'plotter'):
             try:
@@ -99,43 +98,374 @@ class LayerManager:
         settings = load_layer_settings(uuid)
         scalars, colormap = self._prepare_layer_coloring(layer, settings)
         point_size = settings.get('point_size') if settings else None
+        visible = [u for u, l in self.layers.items() if l.get('visible', False)]
+        budget = self.allocate_point_budget(viewer, visible).get(uuid)
 
-        actor = viewer.display_point_cloud(
+        actor, lod_info = viewer.display_point_cloud(
             layer['points'],
             scalars=scalars,
             cmap=colormap,
             return_actor=True,
-            show_scalar_bar=False
+            show_scalar_bar=False,
+            return_lod_info=True,
+            mesh=self.get_layer_mesh(uuid, viewer),
+            lod_order=lambda uuid=uuid: self.get_lod_order(uuid),
+            lod_indices=self._octree_selection(uuid, viewer, budget),
+            max_points=budget
         )
 
         self.layers[uuid]['actor'] = actor
+        self._set_lod_state(uuid, lod_info, scalars, budget)
         if point_size is not None and hasattr(viewer, 'set_point_size'):
             viewer.set_point_size(point_size, actor=actor)
         if hasattr(viewer, 'plotter'):
             viewer.plotter.update()
 
-    def add_layer(self, uuid, file_path, points, las, visible=True, actor=None):
+    def refresh_layer_actor(self, uuid, viewer, sidebar=None):
+        """
+        Show a layer's replaced points (replace_layer_points) in its existing
+        actor instead of redrawing every layer: recolour them, take the
+        layer's share of the point budget for the current view and swap them
+        into the actor (PointCloudViewer.swap_actor_points).
+
+        Returns:
+            bool: False if the layer has no actor to update (redraw it instead)
+        """
+        layer = self.layers.get(uuid)
+        lod_system = getattr(viewer, 'lod_system', None)
+        if (layer is None or layer.get('actor') is None or lod_system is None
+                or not hasattr(viewer, 'swap_actor_points')):
+            return False
+        scalars, _ = self._prepare_layer_coloring(layer, load_layer_settings(uuid))
+        view = viewer.get_camera_view()
+        visible = [u for u, l in self.layers.items() if l.get('visible', False)]
+        budget = self.allocate_point_budget(viewer, visible, view=view).get(uuid)
+        indices = self._octree_selection(uuid, viewer, budget, view=view)
+        if indices is not None:
+            level = 'octree-view'
+        else:
+            mins, maxs = self.get_layer_bounds(uuid) or (np.zeros(3), np.ones(3))
+            level = lod_system.determine_lod_level(layer['points'], viewer,
+                                                   scene_size=max(float(np.linalg.norm(maxs - mins)), 1.0))
+        try:
+            lod_info = viewer.swap_actor_points(
+                actor=layer['actor'], points=layer['points'], scalars=scalars, lod_level=level,
+                mesh=self.get_layer_mesh(uuid, viewer),
+                lod_order=lambda uuid=uuid: self.get_lod_order(uuid),
+                lod_indices=indices,
+                max_points=budget
+            )
+        except Exception as e:
+            print(f"[WARN] Could not swap points of layer {uuid}: {e}")
+            return False
+        self._set_lod_state(uuid, lod_info, scalars, budget)
+        if hasattr(viewer, 'update_manager'):
+            viewer.update_manager.request_update()
+        self._report_lod_status(viewer, sidebar)
+        return True
+
+    def add_layer(self, uuid, file_path, points, las, visible=True, actor=None, origin=None, lod=None):
+        """
+        Add a layer whose points are relative to ``origin`` (already in scene
+        coordinates if None).  Points from a different origin are shifted onto
+        the scene origin so all layers share one coordinate frame.  ``lod`` is
+        viewer.point_octree.build_layer_lod's result for ``points`` when the
+        load worker built it.
+        """
         self.layers[uuid] = {
             'file_path': file_path,
-            'points': points,
+            'points': self._to_scene_origin(points, origin),
             'las': las,
             'visible': visible,
-            'actor': actor
+            'actor': actor,
+            'mesh': None,
+            'spatial_index': None,
+            'lod_order': None,
+            'lod_state': None,
+            'octree': None,
+            'bounds': None,
+            'origin': self.scene_origin
         }
+        self._adopt_layer_lod(self.layers[uuid], points, lod)
         self.current_layer_id = uuid
         self.current_file_path = file_path
 
+    def replace_layer_points(self, uuid, points, las, origin=None, lod=None):
+        """
+        Swap a layer's points and columns (e.g. a COPC layer refined to another
+        level).  ``lod`` is the result of viewer.point_octree.build_layer_lod
+        for ``points`` if it was built ahead, e.g. by the worker that read them.
+        """
+        layer = self.layers.get(uuid)
+        if layer is None:
+            return
+        layer['points'] = self._to_scene_origin(points, origin)
+        layer['las'] = las
+        layer['mesh'] = None
+        layer['spatial_index'] = None
+        layer['lod_state'] = None
+        self._adopt_layer_lod(layer, points, lod)
+
+    @staticmethod
+    def _adopt_layer_lod(layer, points, lod):
+        """Take prebuilt draw structures for ``points`` if the layer still holds them unshifted."""
+        layer['lod_order'] = layer['octree'] = layer['bounds'] = None
+        if lod and layer['points'] is points:
+            # Shifting onto the scene origin would move the octree's leaves and the bounds
+            layer['lod_order'] = lod.get('lod_order')
+            layer['octree'] = lod.get('octree')
+            layer['bounds'] = lod.get('bounds')
+
+    def _to_scene_origin(self, points, origin):
+        if origin is None:
+            if self.scene_origin is None:
+                self.scene_origin = np.zeros(3, dtype=np.float64)
+            return points
+        origin = np.asarray(origin, dtype=np.float64)
+        if self.scene_origin is None:
+            self.scene_origin = origin.copy()
+            print(f"[LAYER] Scene origin set to {self.scene_origin.tolist()}")
+            return points
+        shift = origin - self.scene_origin
+        if not shift.any():
+            return points
+        print(f"[LAYER] Shifting layer points by {shift.tolist()} onto the scene origin")
+        return np.ascontiguousarray(points.astype(np.float64) + shift, dtype=np.float32)
+
+    def to_world(self, points):
+        """Convert scene-local points back to float64 world coordinates."""
+        points = np.asarray(points, dtype=np.float64)
+        if self.scene_origin is None:
+            return points
+        return points + self.scene_origin
+
+    def get_layer_mesh(self, uuid, viewer):
+        """Return the layer's PolyData, built once around its point array without copying."""
+        layer = self.layers.get(uuid)
+        if layer is None or not hasattr(viewer, 'make_point_mesh'):
+            return None
+        if layer.get('mesh') is None:
+            layer['mesh'] = viewer.make_point_mesh(layer['points'])
+        return layer['mesh']
+
+    def get_spatial_index(self, uuid=None):
+        """
+        Return the layer's SpatialIndex (current layer by default), creating it
+        on first use.  Its grid and KD-tree are built lazily and kept until the
+        layer's points are replaced.
+        """
+        uuid = uuid or self.current_layer_id
+        layer = self.layers.get(uuid)
+        if layer is None or layer.get('points') is None:
+            return None
+        if layer.get('spatial_index') is None:
+            from layers.spatial_index import SpatialIndex
+            layer['spatial_index'] = SpatialIndex(layer['points'])
+        return layer['spatial_index']
+
+    def get_lod_order(self, uuid):
+        """Return the layer's LOD point ordering (viewer.lod_system.voxel_lod_order), computed once."""
+        layer = self.layers.get(uuid)
+        if layer is None or layer.get('points') is None:
+            return None
+        if layer.get('lod_order') is None:
+            from viewer.lod_system import voxel_lod_order
+            start = time.time()
+            layer['lod_order'] = voxel_lod_order(layer['points'])
+            print(f"[LOD] Built LOD ordering for layer {uuid} ({len(layer['points']):,} points, "
+                  f"{time.time() - start:.2f}s)")
+        return layer['lod_order']
+
+    def _set_lod_state(self, uuid, lod_info, scalars, budget=None):
+        """Remember what a layer's actor shows so update_layer_lod can swap it later."""
+        if not lod_info or lod_info.get('level') == 'error':
+            self.layers[uuid]['lod_state'] = None
+            return
+        self.layers[uuid]['lod_state'] = {
+            'level': lod_info['level'],
+            'scalars': scalars,
+            'count': lod_info.get('final_count', lod_info.get('original_count', 0)),
+            'budget': budget
+        }
+
+    def get_layer_bounds(self, uuid):
+        """(mins, maxs) of the layer's points, computed once."""
+        layer = self.layers.get(uuid)
+        if layer is None or layer.get('points') is None or len(layer['points']) == 0:
+            return None
+        if layer.get('bounds') is None:
+            points = layer['points']
+            layer['bounds'] = (np.asarray(points.min(axis=0), dtype=np.float64),
+                               np.asarray(points.max(axis=0), dtype=np.float64))
+        return layer['bounds']
+
+    def allocate_point_budget(self, viewer, uuids, view=None):
+        """
+        Share the scene point budget (LODSystem.point_budget) between the
+        layers ``uuids`` by how much of the screen each covers.
+
+        Returns:
+            dict: uuid -> points the layer may draw (empty when LOD is off)
+        """
+        lod_system = getattr(viewer, 'lod_system', None)
+        if lod_system is None or not lod_system.enabled or not uuids:
+            return {}
+        if view is None and hasattr(viewer, 'get_camera_view'):
+            try:
+                view = viewer.get_camera_view()
+            except Exception as e:
+                print(f"[WARN] Could not read camera for the point budget: {e}")
+        layers = {}
+        for uuid in uuids:
+            bounds = self.get_layer_bounds(uuid)
+            if bounds is None:
+                continue
+            layers[uuid] = (len(self.layers[uuid]['points']), lod_system.screen_coverage(bounds, view))
+        return lod_system.allocate_point_budget(layers)
+
+    def _report_lod_status(self, viewer, sidebar):
+        """Show the scene's rendered points and each layer's share of the budget in the sidebar."""
+        if not hasattr(sidebar, 'update_lod_status'):
+            return
+        states = [(uuid, layer) for uuid, layer in self.layers.items()
+                  if layer.get('visible', False) and layer.get('lod_state')]
+        if not states:
+            return
+        total_original_points = sum(len(layer['points']) for _, layer in states)
+        total_rendered_points = sum(layer['lod_state']['count'] for _, layer in states)
+        lod_system = getattr(viewer, 'lod_system', None)
+        sidebar.update_lod_status({
+            'level': states[-1][1]['lod_state']['level'],
+            'original_count': total_original_points,
+            'final_count': total_rendered_points,
+            'reduction_percent': ((total_original_points - total_rendered_points) / total_original_points * 100) if total_original_points > 0 else 0,
+            'budget': lod_system.point_budget() if lod_system is not None and lod_system.enabled else None,
+            # (layer name, points drawn, points allocated or None)
+            'allocation': [
+                (os.path.basename(layer['file_path'] or uuid), layer['lod_state']['count'], layer['lod_state']['budget'])
+                for uuid, layer in states
+            ]
+        })
+
+    def update_layer_lod(self, viewer, interacting=False, sidebar=None):
+        """
+        Re-evaluate each visible layer's LOD level and share of the scene point
+        budget for the current camera and, where they changed, swap the points
+        its actor shows in place (see PointCloudViewer.swap_actor_points).
+        Called with ``interacting`` when a camera drag starts, for a coarse
+        level while moving, and without once the camera settles, for the level
+        the view calls for.  Layers drawn through an octree show a uniform
+        subsample of the whole layer while the camera moves and the visible
+        leaves once it settles.
+
+        Returns:
+            bool: True if any actor changed
+        """
+        lod_system = getattr(viewer, 'lod_system', None)
+        if lod_system is None or not hasattr(viewer, 'swap_actor_points'):
+            return False
+        view = viewer.get_camera_view()
+        visible = [uuid for uuid, layer in self.layers.items()
+                   if layer.get('visible', False) and layer.get('lod_state') and layer.get('actor') is not None]
+        budgets = self.allocate_point_budget(viewer, visible, view=view)
+        changed = False
+        for uuid in visible:
+            layer = self.layers[uuid]
+            state = layer['lod_state']
+            budget = budgets.get(uuid)
+            indices = None
+            if self._uses_octree(layer, lod_system):
+                level = 'octree' if interacting else 'octree-view'
+                if level == state['level'] == 'octree':
+                    continue
+                indices = self._octree_selection(uuid, viewer, budget, view=None if interacting else view,
+                                                 interacting=interacting)
+            else:
+                mins, maxs = self.get_layer_bounds(uuid)
+                level = lod_system.determine_lod_level(layer['points'], viewer, interacting=interacting,
+                                                       scene_size=max(float(np.linalg.norm(maxs - mins)), 1.0))
+                keep = lod_system.lod_point_count(len(layer['points']), level, budget)
+                # Small shifts in the budget share are not worth a re-upload
+                if level == state['level'] and abs(keep - state['count']) <= 0.1 * state['count']:
+                    continue
+            try:
+                lod_info = viewer.swap_actor_points(
+                    actor=layer['actor'], points=layer['points'], scalars=state['scalars'], lod_level=level,
+                    mesh=self.get_layer_mesh(uuid, viewer),
+                    lod_order=lambda uuid=uuid: self.get_lod_order(uuid),
+                    lod_indices=indices,
+                    max_points=budget
+                )
+            except Exception as e:
+                print(f"[WARN] Could not update LOD for layer {uuid}: {e}")
+                continue
+            print(f"[LOD] Layer {uuid}: {state['level']} -> {level} ({lod_info.get('final_count', 0):,} points)")
+            state['level'] = level
+            state['count'] = lod_info.get('final_count', len(layer['points']))
+            state['budget'] = budget
+            changed = True
+        if changed:
+            if hasattr(viewer, 'update_manager'):
+                viewer.update_manager.request_update()
+            if sidebar is not None:
+                self._report_lod_status(viewer, sidebar)
+        return changed
+
+    @staticmethod
+    def _uses_octree(layer, lod_system):
+        return lod_system.enabled and len(layer['points']) >= lod_system.octree_min_points
+
+    def get_octree(self, uuid):
+        """Return the layer's PointOctree (viewer.point_octree), built once."""
+        layer = self.layers.get(uuid)
+        if layer is None or layer.get('points') is None:
+            return None
+        if layer.get('octree') is None:
+            from viewer.point_octree import PointOctree
+            start = time.time()
+            layer['octree'] = PointOctree(layer['points'])
+            print(f"[LOD] Built octree for layer {uuid} ({time.time() - start:.2f}s)")
+        return layer['octree']
+
+    def _octree_selection(self, uuid, viewer, budget, view=None, interacting=False):
+        """
+        Indices to draw for a layer large enough for octree rendering (None
+        for other layers): the leaves visible in ``view`` within ``budget``
+        points (the layer's share of the scene budget), or without a view a
+        uniform subsample of the layer, coarser while ``interacting``.
+        """
+        lod_system = getattr(viewer, 'lod_system', None)
+        layer = self.layers.get(uuid)
+        if lod_system is None or layer is None or not self._uses_octree(layer, lod_system):
+            return None
+        if budget is None:
+            budget = lod_system.point_budget()
+        if interacting:
+            budget //= lod_system.decimation_factor(lod_system.interaction_level)
+        return self.get_octree(uuid).select(budget, view)
+
     def remove_layer(self, uuid):
         if uuid in self.layers:
             del self.layers[uuid]
             if self.current_layer_id == uuid:
                 self.current_layer_id = None
                 self.current_file_path = None
+            if not self.layers:
+                self.scene_origin = None
 
     def set_layer_visible(self, uuid, visible):
         if uuid in self.layers:
             self.layers[uuid]['visible'] = visible
 
+    def get_layer_id_for_actor(self, actor):
+        """uuid of the layer drawn by ``actor`` (e.g. the one a pick hit), or None."""
+        if actor is None:
+            return None
+        for uuid, layer in self.layers.items():
+            if layer.get('actor') is actor:
+                return uuid
+        return None
+
     def get_layer(self, uuid):
         return self.layers.get(uuid, None)
 
@@ -0,0 +1,116 @@
+"""
+Spatial index over one layer's points.
+
+A SpatialIndex answers the XY queries the profile, picking and filter code
+need without scanning the whole layer: a uniform 2D grid for box and polygon
+queries, and a KD-tree (scipy cKDTree on X,Y) for radius and nearest-neighbour
+queries.  Each structure is built the first time it is needed and then kept,
+so repeated profiles, picks and plugin queries on a layer share one build.
+
+LayerManager.get_spatial_index owns one instance per layer and drops it when
+the layer's points change.  Queries take coordinates in the same frame as the
+points (scene coordinates for layers) and return indices into them.
+"""
+
+import threading
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# Aim for this many points per grid cell
+GRID_POINTS_PER_CELL = 64
+
+
+class SpatialIndex:
+    """Lazily built XY grid and KD-tree over an Nx3 point array."""
+
+    def __init__(self, points: np.ndarray, cell_size: Optional[float] = None):
+        self.points = points
+        self.cell_size = cell_size
+        self._tree = None
+        self._grid = None
+        # Profile segments may query from several threads at once
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def tree(self):
+        """cKDTree over the X,Y of the points."""
+        if self._tree is None:
+            with self._lock:
+                if self._tree is None:
+                    from scipy.spatial import cKDTree
+                    print(f"[INDEX] Building KD-tree over {len(self.points):,} points")
+                    self._tree = cKDTree(np.asarray(self.points[:, :2], dtype=np.float64))
+        return self._tree
+
+    def _get_grid(self):
+        if self._grid is None:
+            with self._lock:
+                if self._grid is None:
+                    self._grid = self._build_grid()
+        return self._grid
+
+    def _build_grid(self):
+        xy = np.asarray(self.points[:, :2], dtype=np.float64)
+        mins = xy.min(axis=0)
+        extent = np.maximum(xy.max(axis=0) - mins, 1e-9)
+        cell = self.cell_size
+        if not cell:
+            cells = max(len(xy) / GRID_POINTS_PER_CELL, 1.0)
+            cell = float(np.sqrt(extent[0] * extent[1] / cells)) or float(extent.max())
+        nx, ny = (np.floor(extent / cell).astype(np.int64) + 1)
+        print(f"[INDEX] Building {nx}x{ny} grid (cell {cell:.3g}) over {len(xy):,} points")
+        ix = np.minimum(((xy[:, 0] - mins[0]) / cell).astype(np.int64), nx - 1)
+        iy = np.minimum(((xy[:, 1] - mins[1]) / cell).astype(np.int64), ny - 1)
+        keys = iy * nx + ix
+        # Points sorted by cell; each grid row is one contiguous run of the order
+        order = np.argsort(keys, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(np.bincount(keys, minlength=nx * ny))))
+        return {"mins": mins, "cell": cell, "nx": int(nx), "ny": int(ny), "order": order, "starts": starts}
+
+    def query_bbox(self, xmin: float, ymin: float, xmax: float, ymax: float) -> np.ndarray:
+        """Indices (sorted) of the points with xmin <= x <= xmax and ymin <= y <= ymax."""
+        if len(self.points) == 0:
+            return np.empty(0, dtype=np.intp)
+        grid = self._get_grid()
+        mins, cell, nx, ny = grid["mins"], grid["cell"], grid["nx"], grid["ny"]
+        ix0, ix1 = (np.floor((np.array([xmin, xmax]) - mins[0]) / cell)).astype(np.int64).clip(0, nx - 1)
+        iy0, iy1 = (np.floor((np.array([ymin, ymax]) - mins[1]) / cell)).astype(np.int64).clip(0, ny - 1)
+        if xmax < mins[0] or ymax < mins[1] or xmin > mins[0] + nx * cell or ymin > mins[1] + ny * cell:
+            return np.empty(0, dtype=np.intp)
+        order, starts = grid["order"], grid["starts"]
+        runs = [order[starts[row * nx + ix0]:starts[row * nx + ix1 + 1]] for row in range(iy0, iy1 + 1)]
+        candidates = np.concatenate(runs) if runs else np.empty(0, dtype=np.intp)
+        x = self.points[candidates, 0]
+        y = self.points[candidates, 1]
+        inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        return np.sort(candidates[inside])
+
+    def query_polygon(self, polygon: Sequence[Sequence[float]]) -> np.ndarray:
+        """Indices (sorted) of the points inside an XY polygon."""
+        from fileio.spatial_filter import SpatialFilter
+        region = SpatialFilter(polygon=polygon)
+        candidates = self.query_bbox(*region.bounds)
+        return candidates[region.mask(self.points[candidates, 0], self.points[candidates, 1])]
+
+    def query_radius(self, xy: Sequence[float], radius: float) -> np.ndarray:
+        """Indices (sorted) of the points within ``radius`` (XY) of ``xy``."""
+        return np.sort(np.asarray(self.tree.query_ball_point(np.asarray(xy, dtype=np.float64)[:2], radius),
+                                  dtype=np.intp))
+
+    def nearest(self, xy: Sequence[float], k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(distances, indices) of the ``k`` points nearest to ``xy`` in XY."""
+        distances, indices = self.tree.query(np.asarray(xy, dtype=np.float64)[:2], k=k)
+        return np.atleast_1d(distances), np.atleast_1d(indices)
+
+    def nearest_3d(self, xyz: Sequence[float], k: int = 8) -> Optional[int]:
+        """Index of the point closest to ``xyz`` in 3D among its ``k`` XY neighbours."""
+        if len(self.points) == 0:
+            return None
+        xyz = np.asarray(xyz, dtype=np.float64)
+        _, indices = self.nearest(xyz, k=min(k, len(self.points)))
+        distances = np.linalg.norm(self.points[indices, :3] - xyz[:3], axis=1)
+        return int(indices[np.argmin(distances)])
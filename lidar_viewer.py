@@ -302,7 +302,12 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'layer_manager') and self.layer_manager.layers:
             print(f"[LOD] Redrawing {len(self.layer_manager.layers)} layers with new LOD level")
             self.plot_all_layers()
-    def show_metadata_dialog(self, text, title="LAS Metadata"):
+    def show_metadata_dialog(self, text, title="LAS Metadata", file_path=None):
+        """
+        Show metadata text.  With ``file_path`` the dialog also offers full
+        dimension statistics, computed on a background worker (or shown
+        straight away when cached from an earlier run).
+        """
         from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QPushButton
         dialog = QDialog(self)
         dialog.setWindowTitle(title)
@@ -311,12 +316,51 @@ class MainWindow(QMainWindow):
         text_edit.setReadOnly(True)
         text_edit.setPlainText(text)
         layout.addWidget(text_edit)
+        if file_path:
+            from fileio.las_loader import format_las_statistics
+            from fileio.point_cache import get_point_cache
+            cached_stats = get_point_cache().load_stats(file_path)
+            if cached_stats is not None:
+                text_edit.append("\n" + format_las_statistics(cached_stats))
+            else:
+                btn_stats = QPushButton("Compute Full Statistics", dialog)
+                btn_stats.clicked.connect(lambda: self._start_las_statistics(file_path, dialog, text_edit, btn_stats))
+                layout.addWidget(btn_stats)
         btn_close = QPushButton("Close", dialog)
         btn_close.clicked.connect(dialog.accept)
         layout.addWidget(btn_close)
         dialog.setLayout(layout)
         dialog.resize(800, 600)
         dialog.exec()
+
+    def _start_las_statistics(self, file_path, dialog, text_edit, button):
+        """Compute full statistics in the background and append them to the metadata dialog."""
+        from fileio.load_worker import LasStatisticsWorker
+        from fileio.las_loader import format_las_statistics
+        button.setEnabled(False)
+        button.setText("Computing statistics... 0%")
+        # Parented to the main window so closing the dialog does not destroy a running thread
+        worker = LasStatisticsWorker(file_path, parent=self)
+
+        def on_finished(stats):
+            if dialog.isVisible():
+                text_edit.append("\n" + format_las_statistics(stats))
+                button.hide()
+
+        def on_error(msg):
+            if dialog.isVisible():
+                button.setText(f"Statistics failed: {msg}")
+
+        def on_progress(value):
+            if dialog.isVisible():
+                button.setText(f"Computing statistics... {value}%")
+
+        worker.progress_signal.connect(on_progress)
+        worker.finished_signal.connect(on_finished)
+        worker.error_signal.connect(on_error)
+        worker.finished.connect(worker.deleteLater)
+        worker.start()
+
     def _on_custom_color_changed(self, *args, **kwargs):
         print(f"[DEBUG] _on_custom_color_changed called with args={args}, kwargs={kwargs}")
         current_text = self.sidebar.color_controls.colormap_box.currentText()
@@ -374,8 +418,18 @@ class MainWindow(QMainWindow):
         self.sidebar.point_size_controls.on_point_size_changed = self._on_point_size_changed
         # Connect sidebar open file button to open_file
         self.sidebar.button.clicked.connect(self.open_file)
+        self.sidebar.cancel_load_button.clicked.connect(self.cancel_loading)
+        self._load_worker = None
         self.viewer = PointCloudViewer()
         self.viewer.setObjectName("viewer")
+        # COPC layers load deeper octree levels once the camera settles
+        self._copc_workers = {}
+        self.viewer.add_view_changed_callback(self._refine_copc_layers)
+        # Coarse LOD while the camera is dragged, the view's own level once it settles
+        self.viewer.add_interaction_started_callback(
+            lambda: self.layer_manager.update_layer_lod(self.viewer, interacting=True, sidebar=self.sidebar))
+        self.viewer.add_view_changed_callback(
+            lambda: self.layer_manager.update_layer_lod(self.viewer, sidebar=self.sidebar))
         # Set initial point size in viewer (after viewer is created)
         self.viewer.set_point_size(self.sidebar.point_size_controls.get_point_size())
         print("[INFO] Sidebar and Viewer widgets created.")
@@ -385,7 +439,7 @@ class MainWindow(QMainWindow):
         
         # Integrate point picking (enabled by default)
         from point_picking.point_picker import PointPicker
-        self.point_picker = PointPicker(self.viewer)
+        self.point_picker = PointPicker(self.viewer, layer_manager=self.layer_manager)
         
         # Initialize height profile components
         from profile_line.line_drawer import LineDrawer
@@ -401,6 +455,7 @@ class MainWindow(QMainWindow):
         
         # Set callback for line completion
         self.line_drawer.on_line_completed_callback = self._on_profile_line_completed
+        self.line_drawer.on_polyline_completed_callback = self._on_profile_polyline_completed
         # self._current_file_path and self._current_layer_id are now managed by LayerManager
         self._metadata_action = None    # Reference to metadata menu action
         from viewer.view_toolbar import ViewToolbar
@@ -509,7 +564,6 @@ class MainWindow(QMainWindow):
             print(f"[INFO] Loading default file: {default_file}")
             data = load_point_cloud_data(default_file)
             self._las = data["las"]
-            self._cloud = data["cloud"]
             self._points = data["points"]
             self.viewer.display_point_cloud(self._points)
             print(f"[INFO] Default file loaded: {default_file} ({self._points.shape[0]} points)")
@@ -570,42 +624,7 @@ class MainWindow(QMainWindow):
             print("[DEBUG] _on_layer_added: No file selected.")
             return
         print(f"[DEBUG] _on_layer_added: File selected: {file_path}")
-        from fileio.las_loader import load_point_cloud_data
-        try:
-            data = load_point_cloud_data(file_path)
-            points = data["points"]
-            las = data["las"]
-            cloud = data["cloud"]
-            uuid = generate_layer_id()
-            self.layer_manager.add_layer(uuid, file_path, points, las, visible=True, actor=None)
-            # Save and apply default sidebar settings for new layer
-            default_settings = self.sidebar.get_sidebar_settings()
-            save_layer_settings(uuid, file_path, default_settings)
-            self.sidebar.set_sidebar_settings(default_settings)
-            # Update sidebar and plotter
-            self.plot_all_layers()
-            # After actor is created, re-apply sidebar settings to ensure plotter updates new actor
-            self.sidebar.set_sidebar_settings(default_settings)
-            # Ensure plotter camera and axes are updated for new layer
-            if hasattr(self.viewer, 'plotter'):
-                try:
-                    self.viewer.plotter.add_axes()
-                except Exception as e:
-                    print(f"[WARN] Could not add axes: {e}")
-                try:
-                    self.viewer.plotter.reset_camera()
-                except Exception as e:
-                    print(f"[WARN] Could not reset camera: {e}")
-            all_layers = [(u, l['file_path']) for u, l in self.layer_manager.layers.items()]
-            checked_uuids = set(u for u, l in self.layer_manager.layers.items() if l['visible'])
-            self.sidebar.update_layers(all_layers, current_uuid=uuid, checked_uuids=checked_uuids)
-            self.sidebar.set_status(f"Added: {os.path.basename(file_path)} ({points.shape[0]} points)")
-            self.sidebar.update_file_info(os.path.basename(file_path), points.shape[0])
-            self.sidebar.update_dimensions(data["dims"])
-            print(f"[INFO] Added new layer: {file_path} ({points.shape[0]} points)")
-        except Exception as e:
-            print(f"[ERROR] Failed to add new layer from file: {file_path}: {e}")
-            self.sidebar.set_status(f"Failed to add: {os.path.basename(file_path)}")
+        self.load_and_display(file_path)
 
     def _on_layer_removed_debug(self, uuid):
         print(f"[DEBUG] layer_removed signal received from LayerManagerWidget (Remove button pressed), uuid={uuid}")
@@ -621,6 +640,9 @@ class MainWindow(QMainWindow):
                 print(f"[WARN] Could not remove actor for layer {uuid}: {e}")
         # Remove the layer from LayerManager
         del self.layer_manager.layers[uuid]
+        if not self.layer_manager.layers:
+            # Next file opened into the empty scene picks a fresh origin
+            self.layer_manager.scene_origin = None
         # If the removed layer was current, update current selection
         if self.layer_manager.get_current_layer_id() == uuid:
             remaining = list(self.layer_manager.layers.keys())
@@ -752,32 +774,176 @@ class MainWindow(QMainWindow):
             from fileio.las_loader import get_las_metadata_summary
             print(f"[INFO] Showing LAS metadata for: {current_file_path}")
             summary = get_las_metadata_summary(current_file_path)
-            self.show_metadata_dialog(summary)
+            self.show_metadata_dialog(summary, file_path=current_file_path)
         else:
             self.show_metadata_dialog("No LAS/LAZ file loaded. Cannot show metadata.", title="No File Loaded")
 
     def open_file(self):
         print("[INFO] User triggered file open dialog.")
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select a LAS or LAZ file", "", "LAS/LAZ Files (*.las *.laz)")
-        if file_path:
-            print(f"[INFO] File selected: {file_path}")
-            save_last_file(self.SETTINGS_FILE, file_path)
-            self.load_and_display(file_path)
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "Select LAS or LAZ files", "", "LAS/LAZ Files (*.las *.laz)")
+        if not file_paths:
+            return
+        print(f"[INFO] Files selected: {file_paths}")
+        save_last_file(self.SETTINGS_FILE, file_paths[0])
+        if len(file_paths) == 1:
+            self.load_and_display(file_paths[0])
+        else:
+            self.load_files(file_paths)
+
+    def load_files(self, file_paths):
+        """Decode several files in parallel processes, adding each as a layer when ready."""
+        from fileio.load_worker import MultiFileLoadWorker
+        self.cancel_loading()
+        self.sidebar.set_status(f"Loading {len(file_paths)} files ... Please wait.")
+        worker = MultiFileLoadWorker(file_paths, origin=self.layer_manager.scene_origin, parent=self)
+        worker.file_loaded_signal.connect(lambda data, w=worker: self._on_multi_file_loaded(w, data))
+        worker.progress_signal.connect(lambda value, w=worker: self._on_load_progress(w, value))
+        worker.error_signal.connect(lambda msg, w=worker: print(f"[ERROR] {msg}"))
+        worker.finished_signal.connect(lambda w=worker: self._on_multi_file_load_finished(w))
+        worker.cancelled_signal.connect(lambda w=worker: self._on_file_load_cancelled(w))
+        worker.finished.connect(worker.deleteLater)
+        self._load_worker = worker
+        self.sidebar.set_loading(True)
+        worker.start()
+
+    def _on_multi_file_loaded(self, worker, data):
+        if worker is self._load_worker:
+            self._add_loaded_layer(data["file_path"], data)
 
-    def load_and_display(self, file_path):
-        from fileio.las_loader import load_point_cloud_data
+    def _on_multi_file_load_finished(self, worker):
+        if worker is not self._load_worker:
+            return
+        self._load_worker = None
+        self.sidebar.set_loading(False)
+        failed = len(worker.failed)
+        self.sidebar.set_status(f"Loaded {len(worker.file_paths) - failed} of {len(worker.file_paths)} files")
+
+    def load_and_display(self, file_path, bounds=None, polygon=None):
+        """
+        Load a file on a background thread, previewing points as chunks decode.
+
+        ``bounds`` (xmin, ymin, xmax, ymax) or ``polygon`` (x, y vertices), in
+        world coordinates, load only that area of the file.
+        """
+        from fileio.load_worker import PointCloudLoadWorker
+        from fileio.las_loader import read_las_header
         print(f"[INFO] Loading and displaying file: {file_path}")
+        # Only one background load at a time
+        self.cancel_loading()
         self.sidebar.set_status(f"Loading: {os.path.basename(file_path)} ... Please wait.")
-        QApplication.processEvents()
         try:
-            print(f"[INFO] Started loading: {file_path}")
-            data = load_point_cloud_data(file_path)
+            expected_count = read_las_header(file_path)["point_count"]
+        except Exception as e:
+            print(f"[WARN] Could not read header of {file_path}: {e}")
+            expected_count = 0
+        self.viewer.begin_progressive_display(expected_count)
+
+        worker = PointCloudLoadWorker(file_path, origin=self.layer_manager.scene_origin,
+                                      bounds=bounds, polygon=polygon, parent=self)
+        worker.chunk_signal.connect(lambda xyz, w=worker: self._on_load_chunk(w, xyz))
+        worker.progress_signal.connect(lambda value, w=worker: self._on_load_progress(w, value))
+        worker.finished_signal.connect(lambda data, w=worker: self._on_file_loaded(w, data))
+        worker.error_signal.connect(lambda msg, w=worker: self._on_file_load_failed(w, msg))
+        worker.cancelled_signal.connect(lambda w=worker: self._on_file_load_cancelled(w))
+        worker.finished.connect(worker.deleteLater)
+        self._load_worker = worker
+        self.sidebar.set_loading(True)
+        print(f"[INFO] Started loading: {file_path}")
+        worker.start()
+
+    def _refine_copc_layers(self):
+        """Fetch the octree levels the current view needs for visible COPC layers."""
+        from fileio.load_worker import CopcRefineWorker
+        copc_layers = [(uuid, layer) for uuid, layer in self.layer_manager.layers.items()
+                       if layer.get('copc') is not None and layer.get('visible')]
+        if not copc_layers:
+            return
+        (xmin, ymin, xmax, ymax), spacing = self.viewer.get_view_footprint()
+        origin = self.layer_manager.scene_origin
+        bounds = (xmin + origin[0], ymin + origin[1], xmax + origin[0], ymax + origin[1])
+        for uuid, layer in copc_layers:
+            if uuid in self._copc_workers:
+                continue  # one refine per layer at a time
+            worker = CopcRefineWorker(layer['copc'], bounds, spacing, parent=self)
+            worker.finished_signal.connect(lambda result, u=uuid: self._on_copc_refined(u, result))
+            worker.finished.connect(lambda u=uuid: self._copc_workers.pop(u, None))
+            worker.finished.connect(worker.deleteLater)
+            self._copc_workers[uuid] = worker
+            worker.start()
+
+    def _on_copc_refined(self, uuid, result):
+        if result is None or uuid not in self.layer_manager.layers:
+            return
+        self.layer_manager.replace_layer_points(uuid, result['points'], result['las'], origin=result['origin'],
+                                                lod=result.get('lod'))
+        # Swap the new points into the layer's actor; redraw only if it has none
+        if not self.layer_manager.refresh_layer_actor(uuid, self.viewer, sidebar=self.sidebar):
+            self.plot_all_layers()
+        self.sidebar.set_status(f"Detail level {result['level']}: {len(result['points']):,} points")
+
+    def cancel_loading(self):
+        """Cancel the background load in progress, if any"""
+        worker = getattr(self, '_load_worker', None)
+        if worker is not None and worker.isRunning():
+            print(f"[INFO] Cancelling load of {worker.file_path}")
+            worker.cancel()
+        self._load_worker = None
+        self.viewer.end_progressive_display()
+        self.sidebar.set_loading(False)
+
+    def closeEvent(self, event):
+        # Stop background loads before the window (their parent) is destroyed
+        from fileio.load_worker import PointCloudLoadWorker, MultiFileLoadWorker, LasStatisticsWorker, CopcRefineWorker
+        for worker in self.findChildren(PointCloudLoadWorker) + self.findChildren(MultiFileLoadWorker):
+            worker.cancel()
+            worker.wait()
+        for worker in self.findChildren(CopcRefineWorker):
+            worker.wait()
+        for worker in self.findChildren(LasStatisticsWorker):
+            worker.cancel()
+            worker.wait()
+        super().closeEvent(event)
+
+    def _on_load_chunk(self, worker, xyz):
+        if worker is self._load_worker:
+            self.viewer.append_progressive_chunk(xyz)
+
+    def _on_load_progress(self, worker, value):
+        if worker is self._load_worker:
+            self.sidebar.set_status(f"Loading: {os.path.basename(worker.file_path)} ... {value}%")
+
+    def _on_file_load_failed(self, worker, error_msg):
+        if worker is not self._load_worker:
+            return
+        self._load_worker = None
+        self.viewer.end_progressive_display()
+        self.sidebar.set_loading(False)
+        print(f"[ERROR] Failed to load file: {worker.file_path}: {error_msg}")
+        self.sidebar.set_status(f"Failed to load: {os.path.basename(worker.file_path)}")
+
+    def _on_file_load_cancelled(self, worker):
+        self.sidebar.set_status(f"Cancelled: {os.path.basename(worker.file_path)}")
+
+    def _on_file_loaded(self, worker, data):
+        if worker is not self._load_worker:
+            return
+        self._load_worker = None
+        self.viewer.end_progressive_display()
+        self.sidebar.set_loading(False)
+        self._add_loaded_layer(worker.file_path, data)
+
+    def _add_loaded_layer(self, file_path, data):
+        """Add a loaded file (dict from load_point_cloud_data) as a new layer and show it."""
+        try:
             print(f"[INFO] File loaded: {file_path}")
             self._las = data["las"]
-            self._cloud = data["cloud"]
-            self._points = data["points"]
             new_layer_id = generate_layer_id()
-            self.layer_manager.add_layer(new_layer_id, file_path, self._points, self._las, visible=True, actor=None)
+            self.layer_manager.add_layer(new_layer_id, file_path, data["points"], self._las, visible=True, actor=None,
+                                         origin=data["origin"], lod=data.get("lod"))
+            self._points = self.layer_manager.layers[new_layer_id]['points']
+            if data.get("copc") is not None:
+                # Deeper octree levels are fetched as the camera moves in
+                self.layer_manager.layers[new_layer_id]['copc'] = data["copc"]
             settings = load_layer_settings(new_layer_id)
             if settings:
                 print(f"[INFO] Loaded sidebar settings from DB for layer {new_layer_id}")
@@ -807,11 +973,10 @@ class MainWindow(QMainWindow):
             checked_uuids = set(uuid for uuid, l in self.layer_manager.layers.items() if l['visible'])
             self.sidebar.update_layers(all_layers, current_uuid=new_layer_id, checked_uuids=checked_uuids)
         except Exception as e:
-            print(f"[ERROR] Failed to load file: {file_path}: {e}")
+            print(f"[ERROR] Failed to display file: {file_path}: {e}")
             status_msg = f"Failed to load: {os.path.basename(file_path)}"
         finally:
             self.sidebar.set_status(status_msg)
-            QApplication.processEvents()
 
     def _update_all_layers_in_viewer(self):
         # Deprecated: replaced by plot_all_layers()
@@ -876,12 +1041,21 @@ class MainWindow(QMainWindow):
             if hasattr(self.viewer, 'plotter'):
                 self.viewer.plotter.update()
 
-    def _toggle_height_profile_mode(self, enabled):
-        """Enable/disable height profile drawing mode"""
+    def _toggle_height_profile_mode(self, enabled, polyline=False):
+        """Enable/disable height profile drawing mode (``polyline`` for multi-segment lines)"""
         if enabled:
-            self.line_drawer.start_line_drawing()
+            # Switching between line and polyline mode starts over
+            if getattr(self.line_drawer, 'line_actor', None):
+                self.line_drawer.clear_completed_line()
+            self.line_drawer.start_line_drawing(polyline=polyline)
+            if polyline:
+                self.height_profile_status_label.setText(
+                    "Polyline Profile Mode: Click vertices, Enter to finish, Backspace to undo")
+            else:
+                self.height_profile_status_label.setText("Height Profile Mode: Click two points")
             self._show_height_profile_status(True)
-            print("[INFO] Height profile mode enabled. Click two points to draw a line.")
+            print(f"[INFO] Height profile mode enabled. "
+                  f"{'Click vertices and press Enter to finish' if polyline else 'Click two points to draw a line'}.")
         else:
             # When disabling, clear any existing line and fully stop the mode
             self.line_drawer.stop_line_drawing()
@@ -901,6 +1075,16 @@ class MainWindow(QMainWindow):
     def _on_profile_line_completed(self, start_point, end_point):
         """Called when user completes drawing a line"""
         print(f"[INFO] Profile line completed: {start_point} -> {end_point}")
+        self._calculate_and_show_profile([start_point, end_point])
+        
+    def _on_profile_polyline_completed(self, vertices):
+        """Called when user finishes drawing a polyline"""
+        print(f"[INFO] Profile polyline completed: {len(vertices)} vertices")
+        self._calculate_and_show_profile(vertices)
+        
+    def _calculate_and_show_profile(self, vertices):
+        """Calculate the profile along a line or polyline on the current layer and show it"""
+        start_point, end_point = vertices[0], vertices[-1]
         
         # Get current layer points
         current_layer_id = self.layer_manager.get_current_layer_id()
@@ -918,12 +1102,20 @@ class MainWindow(QMainWindow):
         # Calculate profile
         try:
             print("[INFO] Starting height profile calculation...")
-            profile_data = self.profile_calculator.calculate_profile(
-                points, start_point, end_point, num_samples=100, tolerance=1.0
-            )
+            spatial_index = self.layer_manager.get_spatial_index(current_layer_id)
+            if len(vertices) > 2:
+                profile_data = self.profile_calculator.calculate_polyline_profile(
+                    points, vertices, num_samples=100, tolerance=1.0, spatial_index=spatial_index
+                )
+            else:
+                profile_data = self.profile_calculator.calculate_profile(
+                    points, start_point, end_point, num_samples=100, tolerance=1.0,
+                    spatial_index=spatial_index
+                )
             
             # Display profile in viewer
-            self.profile_viewer.display_profile(profile_data, points, start_point, end_point)
+            self.profile_viewer.display_profile(profile_data, points, start_point, end_point,
+                                                spatial_index=spatial_index, vertices=vertices)
             self.profile_viewer.show()
             self.profile_viewer.raise_()
             self.profile_viewer.activateWindow()
@@ -950,8 +1142,8 @@ class MainWindow(QMainWindow):
             
             print(f"[INFO] Importing cross-section layer from: {temp_file_path}")
             
-            # Load the temporary LAZ file
-            data = load_point_cloud_data(temp_file_path)
+            # Load the temporary LAZ file into the scene's coordinate frame
+            data = load_point_cloud_data(temp_file_path, use_cache=False, origin=self.layer_manager.scene_origin)
             points = data["points"]
             las = data["las"]
             
@@ -971,7 +1163,7 @@ class MainWindow(QMainWindow):
             layer_name = f"{base_name}_{point_count}pts"
             
             # Add layer to manager
-            self.layer_manager.add_layer(uuid, layer_name, points, las, visible=True, actor=None)
+            self.layer_manager.add_layer(uuid, layer_name, points, las, visible=True, actor=None, origin=data["origin"])
             
             # Save default settings for new layer
             default_settings = self.sidebar.get_sidebar_settings()
@@ -1034,7 +1226,7 @@ class MainWindow(QMainWindow):
         default_name = f"exported_{os.path.splitext(os.path.basename(file_path))[0]}.laz"
         output_path, _ = QFileDialog.getSaveFileName(
             self, "Export Layer as LAZ", default_name, 
-            "LAZ Files (*.laz);;LAS Files (*.las);;All Files (*)"
+            "LAZ Files (*.laz);;LAS Files (*.las);;COPC Files (*.copc.laz);;All Files (*)"
         )
         
         if not output_path:
@@ -1042,13 +1234,20 @@ class MainWindow(QMainWindow):
             
         try:
             from fileio.las_exporter import export_points_to_laz
+            from fileio.pdal_exporter import export_points_to_copc, COPC_SUFFIX
             
             # Create all point indices for full export
             point_indices = np.arange(len(points))
             
-            success = export_points_to_laz(
-                points, output_path, las_data, point_indices, preserve_all_dimensions=True
-            )
+            if output_path.lower().endswith(COPC_SUFFIX):
+                success = export_points_to_copc(
+                    points, output_path, las_data, point_indices, origin=layer.get('origin')
+                )
+            else:
+                success = export_points_to_laz(
+                    points, output_path, las_data, point_indices, preserve_all_dimensions=True,
+                    origin=layer.get('origin')
+                )
             
             if success:
                 from PyQt6.QtWidgets import QMessageBox
@@ -76,6 +76,26 @@ class PluginAPI:
         self.layer_manager.add_layer(layer_id, name, points, las_data, visible=visible, actor=None)
         return layer_id
     
+    def load_file(self, file_path: str, bounds=None, polygon=None):
+        """
+        Open a LAS/LAZ file as a new layer in the background.
+
+        Pass ``bounds`` (xmin, ymin, xmax, ymax) or ``polygon`` (list of x, y
+        vertices) in world coordinates to load only that area of the file.
+        """
+        self.main_window.load_and_display(file_path, bounds=bounds, polygon=polygon)
+    
+    def get_spatial_index(self, layer_id: str = None):
+        """
+        Get the shared SpatialIndex of a layer (the current layer by default).
+
+        It is built once per layer and reused by profiles, picking and every
+        plugin, e.g. ``api.get_spatial_index().query_bbox(xmin, ymin, xmax, ymax)``.
+        Queries use scene coordinates (the frame of the layer's points) and
+        return indices into the layer's points.
+        """
+        return self.layer_manager.get_spatial_index(layer_id)
+    
     def update_status(self, message: str):
         """Update the status message in the sidebar"""
         self.sidebar.set_status(message)
@@ -385,7 +405,13 @@ class FilterPlugin(BasePlugin):
     
     @abstractmethod
     def filter_points(self, points, **kwargs):
-        """Filter point cloud data"""
+        """
+        Filter point cloud data.
+        
+        Return the kept points, or (points, indices) where indices are the
+        kept points' positions in ``points``; exports use the indices to copy
+        the original dimensions of each point.
+        """
         pass
 
 
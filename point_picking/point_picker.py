@@ -4,6 +4,11 @@ PointPicker module for interactive point selection in the LiDAR viewer.
 This module will provide tools for picking points in the 3D view, handling user clicks, and returning selected point data.
 """
 
+import numpy as np
+import pyvista as pv
+
+from viewer.lod_system import LAYER_POINT_IDS
+
 class PointPicker:
     """
     Handles interactive point picking in the viewer.
@@ -11,9 +16,10 @@ class PointPicker:
         - Connect to the viewer's picking/click events.
         - Return selected point coordinates and metadata.
     """
-    def __init__(self, viewer):
+    def __init__(self, viewer, layer_manager=None):
         self.viewer = viewer
-        self.picked_points = []  # Store picked points (coords, index)
+        self.layer_manager = layer_manager  # converts picked scene-local coords to world coords
+        self.picked_points = []  # Store picked points (coords, layer uuid, index)
         self._enabled = False  # Disable point picking by default
         self._picker_callback = None
 
@@ -49,17 +55,52 @@ class PointPicker:
         """Check if point picking is currently enabled"""
         return self._enabled
 
-    def _on_point_picked(self, picked):
+    def _on_point_picked(self, point, picker=None):
+        """
+        Record a pick (pyvista's use_picker=True callback).
+
+        Returns:
+            tuple: (world coords, layer uuid, index in that layer's points and
+            columns), with None for what could not be resolved; None if
+            nothing was picked
+        """
         print("[DEBUG] _on_point_picked callback triggered.")
-        # picked is a pyvista.PolyData with one point
-        if picked is not None and picked.n_points > 0:
-            coords = picked.points[0]
-            # Try to get point index if available
-            point_id = None
-            if hasattr(picked, 'point_arrays') and 'vtkOriginalPointIds' in picked.point_arrays:
-                point_id = int(picked.point_arrays['vtkOriginalPointIds'][0])
-            self.picked_points.append((coords, point_id))
-            print(f"[INFO] Picked point: coords={coords}, index={point_id}")
-            # TODO: Integrate with UI (highlight, sidebar, etc.)
-        else:
+        # With use_picker=True pyvista passes the picked position and the vtk picker
+        if point is None:
             print("[WARN] No point picked.")
+            return None
+        local_coords = np.asarray(point, dtype=np.float64)
+        coords = local_coords
+        layer_id = None
+        if self.layer_manager is not None:
+            coords = self.layer_manager.to_world(local_coords)
+            actor = picker.GetActor() if picker is not None and hasattr(picker, 'GetActor') else None
+            layer_id = self.layer_manager.get_layer_id_for_actor(actor)
+        point_id = self._picked_layer_index(picker)
+        if point_id is None and self.layer_manager is not None:
+            # No id from the picker: look it up in the picked (or current) layer's shared index
+            layer_id = layer_id or self.layer_manager.get_current_layer_id()
+            spatial_index = self.layer_manager.get_spatial_index(layer_id)
+            if spatial_index is not None:
+                point_id = spatial_index.nearest_3d(local_coords)
+        self.picked_points.append((coords, layer_id, point_id))
+        print(f"[INFO] Picked point: coords={coords}, layer={layer_id}, index={point_id}")
+        # TODO: Integrate with UI (highlight, sidebar, etc.)
+        return coords, layer_id, point_id
+
+    @staticmethod
+    def _picked_layer_index(picker):
+        """Index in the layer of the point the picker snapped to, or None."""
+        if picker is None or not hasattr(picker, 'GetPointId'):
+            return None
+        vtk_id = picker.GetPointId()
+        dataset = picker.GetDataSet()
+        if vtk_id < 0 or dataset is None:
+            return None
+        point_data = pv.wrap(dataset).point_data
+        for name in (LAYER_POINT_IDS, 'vtkOriginalPointIds'):
+            if name in point_data:
+                # Decimated actor: map back to the point's index in the layer
+                return int(point_data[name][vtk_id])
+        # Undecimated actor: its points are the layer's points in order
+        return int(vtk_id)
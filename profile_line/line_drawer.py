@@ -19,17 +19,32 @@ class LineDrawer:
         self.viewer = viewer
         self.start_point = None
         self.end_point = None
+        self.vertices = []
+        self.polyline = False
         self.line_actor = None
         self.is_drawing = False
         self._picking_callback = None
+        self._key_events_added = False
         self.on_line_completed_callback = None
+        # Called with the list of vertices when a polyline is finished
+        self.on_polyline_completed_callback = None
         
-    def start_line_drawing(self):
-        """Enable line drawing mode with two-click interaction"""
-        print("[INFO] Starting line drawing mode")
+    def start_line_drawing(self, polyline=False):
+        """
+        Enable line drawing mode.
+        
+        By default two clicks draw a straight line.  With ``polyline`` every
+        click adds a vertex; Enter finishes the polyline and Backspace removes
+        the last vertex.
+        """
+        print(f"[INFO] Starting {'polyline' if polyline else 'line'} drawing mode")
         self.is_drawing = True
+        self.polyline = polyline
         self.start_point = None
         self.end_point = None
+        self.vertices = []
+        if polyline:
+            self._add_key_events()
         self._enable_picking()
         
     def stop_line_drawing(self):
@@ -54,6 +69,17 @@ class LineDrawer:
         except Exception as e:
             print(f"[ERROR] Failed to enable picking for line drawing: {e}")
         
+    def _add_key_events(self):
+        """Bind Enter/Backspace in the plotter to finish or undo polyline vertices (once)."""
+        if self._key_events_added:
+            return
+        try:
+            self.viewer.plotter.add_key_event('Return', self.finish_polyline)
+            self.viewer.plotter.add_key_event('BackSpace', self.remove_last_vertex)
+            self._key_events_added = True
+        except Exception as e:
+            print(f"[WARN] Could not bind polyline keys: {e}")
+        
     def _disable_picking(self):
         """Disable point picking"""
         try:
@@ -88,7 +114,9 @@ class LineDrawer:
             
         print(f"[DEBUG] Point picked: {point}")
         
-        if self.start_point is None:
+        if self.polyline:
+            self.add_vertex(point)
+        elif self.start_point is None:
             self.on_first_click(point)
         else:
             self.on_second_click(point)
@@ -108,15 +136,59 @@ class LineDrawer:
         if hasattr(self, 'on_line_completed_callback') and self.on_line_completed_callback:
             self.on_line_completed_callback(self.start_point, self.end_point)
         
+    def add_vertex(self, picked_point):
+        """Append a polyline vertex and redraw the line so far"""
+        self.vertices.append(np.array(picked_point, dtype=np.float64))
+        self.start_point = self.vertices[0]
+        print(f"[INFO] Polyline vertex {len(self.vertices)} selected: {picked_point}")
+        if len(self.vertices) > 1:
+            self.draw_polyline(self.vertices)
+        
+    def remove_last_vertex(self):
+        """Undo the last polyline vertex"""
+        if not (self.is_drawing and self.polyline and self.vertices):
+            return
+        self.vertices.pop()
+        print(f"[INFO] Removed polyline vertex ({len(self.vertices)} left)")
+        if len(self.vertices) > 1:
+            self.draw_polyline(self.vertices)
+        else:
+            self.clear_line()
+        
+    def finish_polyline(self):
+        """Finish the polyline and trigger the profile calculation"""
+        if not (self.is_drawing and self.polyline):
+            return
+        if len(self.vertices) < 2:
+            print("[WARN] A polyline needs at least two vertices")
+            return
+        self.end_point = self.vertices[-1]
+        self.draw_polyline(self.vertices)
+        print(f"[INFO] Polyline finished with {len(self.vertices)} vertices")
+        try:
+            if self.on_polyline_completed_callback:
+                self.on_polyline_completed_callback(list(self.vertices))
+            elif self.on_line_completed_callback:
+                self.on_line_completed_callback(self.vertices[0], self.vertices[-1])
+        finally:
+            # The finished line stays drawn; later clicks and Enter must not extend it
+            self.vertices = []
+            if self.is_drawing:
+                self.stop_line_drawing()
+        
     def draw_line(self, start, end):
         """Create and display line actor in 3D viewer"""
+        self.draw_polyline([start, end])
+        
+    def draw_polyline(self, vertices):
+        """Create and display a polyline actor in 3D viewer (replacing any previous line)"""
         try:
             # Create line points
-            line_points = np.array([start, end])
+            line_points = np.array(vertices)
             line = pv.PolyData(line_points)
             
-            # Create line cells
-            cells = np.array([2, 0, 1])  # Line with 2 points, connecting points 0 and 1
+            # Create line cells: one polyline through all vertices
+            cells = np.concatenate(([len(line_points)], np.arange(len(line_points))))
             line.lines = cells
             
             # Add line to plotter
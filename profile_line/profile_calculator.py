@@ -4,7 +4,75 @@ This module provides the ProfileCalculator class for computing height statistics
 """
 
 import numpy as np
-from scipy.spatial import cKDTree
+
+# Points projected per pass in corridor_selection (bounds the float64 temporaries)
+CORRIDOR_CHUNK_SIZE = 4_000_000
+
+
+def corridor_candidates(spatial_index, start_point, end_point, tolerance):
+    """
+    Indices (sorted) of the points a spatial index finds near a segment: balls
+    of radius tolerance * sqrt(2) centred every 2 * tolerance along it cover
+    the whole corridor, end caps included.
+
+    ``spatial_index`` is a layers.spatial_index.SpatialIndex or a cKDTree over X,Y.
+    """
+    # (a cKDTree has a .tree attribute of its own, its root node)
+    tree = spatial_index.tree if hasattr(spatial_index, 'query_bbox') else spatial_index
+    start = np.asarray(start_point, dtype=np.float64)[:2]
+    end = np.asarray(end_point, dtype=np.float64)[:2]
+    segment_length = np.linalg.norm(end - start)
+    count = max(2, int(np.ceil(segment_length / (2 * tolerance))) + 1) if tolerance > 0 else 2
+    t = np.linspace(0, 1, count)[:, None]
+    centres = start + t * (end - start)
+    radius = max(tolerance, 1e-9) * np.sqrt(2)
+    found = tree.query_ball_point(centres, radius, return_sorted=False)
+    parts = [np.asarray(hits, dtype=np.intp) for hits in found if len(hits)]
+    return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+
+def corridor_selection(points, start_point, end_point, tolerance, chunk_size=CORRIDOR_CHUNK_SIZE,
+                       spatial_index=None):
+    """
+    Select the points in the XY corridor around a line segment, in vectorized passes.
+
+    Every point is projected onto the segment once: a point is kept when its
+    perpendicular distance is at most ``tolerance`` and its projection falls
+    between the two ends.  Points are processed ``chunk_size`` at a time so
+    the float64 temporaries stay bounded on very large layers.  With a
+    ``spatial_index`` (see corridor_candidates) only the points it finds near
+    the segment are projected.
+
+    Returns:
+        tuple: (indices into ``points``, distance along the line from
+        start_point, perpendicular distance), one entry per selected point
+    """
+    start = np.asarray(start_point, dtype=np.float64)[:2]
+    direction = np.asarray(end_point, dtype=np.float64)[:2] - start
+    length = np.linalg.norm(direction)
+    unit = direction / length if length > 0 else np.zeros(2)
+    candidates = None
+    if spatial_index is not None:
+        candidates = corridor_candidates(spatial_index, start_point, end_point, tolerance)
+    source = points if candidates is None else points[candidates]
+    indices, along_parts, perp_parts = [], [], []
+    for offset in range(0, len(source), chunk_size):
+        xy = np.asarray(source[offset:offset + chunk_size, :2], dtype=np.float64) - start
+        along = xy @ unit
+        if length > 0:
+            perp = np.abs(xy[:, 0] * unit[1] - xy[:, 1] * unit[0])
+        else:
+            perp = np.hypot(xy[:, 0], xy[:, 1])
+        keep = np.flatnonzero((perp <= tolerance) & (along >= 0) & (along <= length))
+        indices.append(keep + offset)
+        along_parts.append(along[keep])
+        perp_parts.append(perp[keep])
+    if not indices:
+        return np.empty(0, dtype=np.intp), np.empty(0), np.empty(0)
+    indices = np.concatenate(indices)
+    if candidates is not None:
+        indices = candidates[indices]
+    return indices, np.concatenate(along_parts), np.concatenate(perp_parts)
 
 
 class ProfileCalculator:
@@ -16,16 +84,26 @@ class ProfileCalculator:
         self.line_start = None
         self.line_end = None
         
-    def calculate_profile(self, points, start_point, end_point, num_samples=100, tolerance=1.0):
+    def calculate_profile(self, points, start_point, end_point, num_samples=100, tolerance=1.0,
+                          percentiles=None, spatial_index=None):
         """
         Calculate height profile along a line
         
+        Points in the corridor (within ``tolerance`` of the line, see
+        corridor_selection) are projected onto it once and binned by distance
+        along the line, each bin centred on a sample.  Statistics for all bins
+        come from a few vectorized passes (bincount for count/mean/std, one sort
+        for min/max and percentiles), not a spatial query per sample.
+        
         Args:
             points: Nx3 numpy array of LiDAR points (x, y, z)
             start_point: 3D start point of line
             end_point: 3D end point of line
             num_samples: Number of sample points along the line
-            tolerance: Search radius around each sample point (meters)
+            tolerance: Corridor half-width around the line (meters)
+            percentiles: Optional percentiles (0-100) of height to compute per sample
+            spatial_index: Optional SpatialIndex of ``points`` (LayerManager.get_spatial_index)
+                used to skip points far from the line
             
         Returns:
             dict: Profile data with distances, heights, statistics
@@ -47,64 +125,17 @@ class ProfileCalculator:
         self.line_start = np.array(start_point)
         self.line_end = np.array(end_point)
         
-        # Generate sample points along the line
-        line_points = self.interpolate_line_points(start_point, end_point, num_samples)
-        
-        # Build spatial index for efficient queries (2D for horizontal distance)
-        print("[INFO] Building spatial index...")
-        tree = cKDTree(points[:, :2])  # Only use X,Y for 2D distance
+        # Calculate total line length
+        line_length = np.linalg.norm(end_point - start_point)
+        print(f"[INFO] Profile line length: {line_length:.2f} meters")
         
         profile_data = {
-            'distances': [],
-            'min_heights': [],
-            'max_heights': [],
-            'mean_heights': [],
-            'std_heights': [],
-            'point_counts': [],
             'line_start': start_point,
             'line_end': end_point,
-            'total_length': np.linalg.norm(end_point - start_point)
+            'total_length': line_length
         }
-        
-        # Calculate total line length
-        line_length = np.linalg.norm(end_point - start_point)
-        print(f"[INFO] Profile line length: {line_length:.2f} meters")
-        
-        # Process each sample point along the line
-        for i, sample_point in enumerate(line_points):
-            # Find nearby points within tolerance
-            indices = tree.query_ball_point(sample_point[:2], tolerance)
-            
-            # Distance along line
-            distance = (i / (num_samples - 1)) * line_length
-            
-            if len(indices) > 0:
-                # Get heights of nearby points
-                nearby_points = points[indices]
-                heights = nearby_points[:, 2]  # Z values
-                
-                # Calculate statistics
-                stats = self.calculate_height_statistics(heights)
-                
-                profile_data['distances'].append(distance)
-                profile_data['min_heights'].append(stats['min'])
-                profile_data['max_heights'].append(stats['max'])
-                profile_data['mean_heights'].append(stats['mean'])
-                profile_data['std_heights'].append(stats['std'])
-                profile_data['point_counts'].append(len(heights))
-                
-            else:
-                # No points found - use NaN for missing data
-                profile_data['distances'].append(distance)
-                profile_data['min_heights'].append(np.nan)
-                profile_data['max_heights'].append(np.nan)
-                profile_data['mean_heights'].append(np.nan)
-                profile_data['std_heights'].append(np.nan)
-                profile_data['point_counts'].append(0)
-        
-        # Convert lists to numpy arrays for easier processing
-        for key in ['distances', 'min_heights', 'max_heights', 'mean_heights', 'std_heights', 'point_counts']:
-            profile_data[key] = np.array(profile_data[key])
+        profile_data.update(self._segment_profile(points, start_point, end_point, num_samples, tolerance,
+                                                  percentiles, spatial_index))
             
         # Post-process to handle missing data
         profile_data = self.interpolate_missing_data(profile_data)
@@ -116,6 +147,168 @@ class ProfileCalculator:
         
         return profile_data
         
+    def _segment_profile(self, points, start_point, end_point, num_samples, tolerance,
+                         percentiles=None, spatial_index=None):
+        """Sample distances and binned height statistics for one straight segment."""
+        # Project the corridor points onto the line once
+        indices, along, _ = corridor_selection(points, start_point, end_point, tolerance,
+                                               spatial_index=spatial_index)
+        heights = np.asarray(points[indices, 2], dtype=np.float64)
+        
+        # Bin each point to its nearest sample along the (XY) line
+        horizontal_length = np.linalg.norm(np.asarray(end_point, dtype=np.float64)[:2] -
+                                           np.asarray(start_point, dtype=np.float64)[:2])
+        step = horizontal_length / (num_samples - 1) if num_samples > 1 else max(horizontal_length, 1.0)
+        bins = np.clip(np.rint(along / step).astype(np.intp), 0, num_samples - 1) if step > 0 \
+            else np.zeros(len(along), dtype=np.intp)
+        
+        line_length = np.linalg.norm(np.asarray(end_point, dtype=np.float64) - np.asarray(start_point, dtype=np.float64))
+        segment = {'distances': np.linspace(0, line_length, num_samples) if num_samples > 1 else np.zeros(1)}
+        segment.update(self.binned_height_statistics(bins, heights, num_samples, percentiles))
+        return segment
+        
+    def calculate_polyline_profile(self, points, vertices, num_samples=100, tolerance=1.0,
+                                   percentiles=None, spatial_index=None, max_workers=None):
+        """
+        Calculate a height profile along a polyline.
+        
+        The samples are shared between segments in proportion to their length
+        (at least two each), and the segments are profiled concurrently in a
+        thread pool (the NumPy and KD-tree work releases the GIL).  Distances
+        are cumulative along the whole polyline; the sample at each inner
+        vertex is taken from the segment that starts there.
+        
+        Args:
+            points: Nx3 numpy array of LiDAR points (x, y, z)
+            vertices: Sequence of at least two 3D polyline vertices
+            num_samples: Total number of sample points along the polyline
+            tolerance: Corridor half-width around each segment (meters)
+            percentiles: Optional percentiles (0-100) of height to compute per sample
+            spatial_index: Optional SpatialIndex of ``points``, shared by all segments
+            max_workers: Threads to use (default: one per segment, up to the CPU count)
+            
+        Returns:
+            dict: Same keys as calculate_profile, plus vertices and
+            vertex_distances (cumulative distance of each vertex)
+        """
+        if points is None or points.shape[0] == 0:
+            raise ValueError("No points provided for profile calculation")
+        vertices = np.asarray(vertices, dtype=np.float64)
+        # Drop repeated clicks on the same vertex
+        keep = np.concatenate(([True], np.any(np.diff(vertices, axis=0) != 0, axis=1)))
+        vertices = vertices[keep]
+        if len(vertices) < 2:
+            raise ValueError("A polyline profile needs at least two distinct vertices")
+        if len(vertices) == 2:
+            profile_data = self.calculate_profile(points, vertices[0], vertices[1], num_samples, tolerance,
+                                                  percentiles, spatial_index)
+            profile_data['vertices'] = vertices
+            profile_data['vertex_distances'] = np.array([0.0, profile_data['total_length']])
+            return profile_data
+        
+        lengths = np.linalg.norm(np.diff(vertices, axis=0), axis=1)
+        vertex_distances = np.concatenate(([0.0], np.cumsum(lengths)))
+        total_length = vertex_distances[-1]
+        samples = np.maximum(2, np.rint(num_samples * lengths / total_length).astype(int))
+        print(f"[INFO] Calculating polyline profile: {len(lengths)} segments, {total_length:.2f} m, "
+              f"{points.shape[0]} points, tolerance={tolerance}m")
+        
+        self.points = points
+        self.line_start = vertices[0]
+        self.line_end = vertices[-1]
+        
+        from concurrent.futures import ThreadPoolExecutor
+        import os
+        workers = max_workers or min(len(lengths), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            segments = list(pool.map(
+                lambda i: self._segment_profile(points, vertices[i], vertices[i + 1], samples[i], tolerance,
+                                                percentiles, spatial_index),
+                range(len(lengths))
+            ))
+        
+        profile_data = {
+            'line_start': vertices[0],
+            'line_end': vertices[-1],
+            'total_length': total_length,
+            'vertices': vertices,
+            'vertex_distances': vertex_distances
+        }
+        last = len(segments) - 1
+        
+        def joined(arrays):
+            # Each inner vertex's sample comes from the segment starting there
+            return np.concatenate([arr if i == last else arr[:-1] for i, arr in enumerate(arrays)])
+        
+        profile_data['distances'] = joined([segment['distances'] + vertex_distances[i]
+                                            for i, segment in enumerate(segments)])
+        for key in ('min_heights', 'max_heights', 'mean_heights', 'std_heights', 'point_counts'):
+            profile_data[key] = joined([segment[key] for segment in segments])
+        profile_data['percentile_heights'] = {
+            p: joined([segment['percentile_heights'][p] for segment in segments]) for p in (percentiles or ())
+        }
+        
+        profile_data = self.interpolate_missing_data(profile_data)
+        profile_data['summary'] = self.calculate_profile_summary(profile_data)
+        print(f"[INFO] Polyline profile complete. {np.sum(~np.isnan(profile_data['mean_heights']))} valid samples")
+        return profile_data
+        
+    def binned_height_statistics(self, bins, heights, num_bins, percentiles=None):
+        """
+        Height statistics for every bin at once.
+        
+        Args:
+            bins: Bin number (0..num_bins-1) of each height
+            heights: Heights to summarize
+            num_bins: Number of bins
+            percentiles: Optional percentiles (0-100) to compute per bin
+            
+        Returns:
+            dict: min_heights, max_heights, mean_heights, std_heights (NaN for
+            empty bins), point_counts, and percentile_heights mapping each
+            requested percentile to its per-bin array
+        """
+        counts = np.bincount(bins, minlength=num_bins)
+        sums = np.bincount(bins, weights=heights, minlength=num_bins)
+        squares = np.bincount(bins, weights=heights * heights, minlength=num_bins)
+        filled = counts > 0
+        
+        mean = np.full(num_bins, np.nan)
+        std = np.full(num_bins, np.nan)
+        mean[filled] = sums[filled] / counts[filled]
+        std[filled] = np.sqrt(np.maximum(squares[filled] / counts[filled] - mean[filled] ** 2, 0.0))
+        
+        # Sorting by (bin, height) puts each bin's heights in order, in one contiguous run
+        order = np.lexsort((heights, bins))
+        sorted_heights = heights[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        
+        minimum = np.full(num_bins, np.nan)
+        maximum = np.full(num_bins, np.nan)
+        minimum[filled] = sorted_heights[starts[filled]]
+        maximum[filled] = sorted_heights[starts[filled] + counts[filled] - 1]
+        
+        percentile_heights = {}
+        for p in percentiles or ():
+            # Linear interpolation between closest ranks, as np.percentile does
+            rank = (counts[filled] - 1) * (p / 100.0)
+            lower = np.floor(rank).astype(np.intp)
+            upper = np.minimum(lower + 1, counts[filled] - 1)
+            base = starts[filled]
+            low_values = sorted_heights[base + lower]
+            values = low_values + (sorted_heights[base + upper] - low_values) * (rank - lower)
+            percentile_heights[p] = np.full(num_bins, np.nan)
+            percentile_heights[p][filled] = values
+        
+        return {
+            'min_heights': minimum,
+            'max_heights': maximum,
+            'mean_heights': mean,
+            'std_heights': std,
+            'point_counts': counts,
+            'percentile_heights': percentile_heights
+        }
+        
     def interpolate_line_points(self, start, end, num_samples):
         """Generate evenly spaced points along the line"""
         t = np.linspace(0, 1, num_samples)
@@ -221,47 +414,64 @@ class ProfileCalculator:
         
         return np.linalg.norm(point[:2] - proj_point)
         
-    def get_cross_section_points(self, points, start_point, end_point, tolerance=1.0):
+    def get_cross_section_points(self, points, start_point, end_point, tolerance=1.0,
+                                 spatial_index=None, chunk_size=CORRIDOR_CHUNK_SIZE):
         """
         Get all points within tolerance distance of the line for detailed analysis
         
+        Distances are computed for whole arrays at a time, ``chunk_size`` points
+        per pass.  ``spatial_index`` (the layer's SpatialIndex, or a cKDTree
+        over the X,Y of ``points``) first narrows the search to points near
+        the line, so only those are measured.
+        
         Returns:
-            dict: Cross-section data with points, distances along line, and perpendicular distances
+            dict: Cross-section data with points, their indices in ``points``,
+            distances along line, and perpendicular distances
         """
+        empty = {'points': np.array([]), 'indices': np.array([], dtype=np.intp),
+                 'line_distances': np.array([]), 'perp_distances': np.array([])}
         if points is None or points.shape[0] == 0:
-            return {'points': np.array([]), 'line_distances': np.array([]), 'perp_distances': np.array([])}
+            return empty
             
-        line_start = np.array(start_point)
-        line_end = np.array(end_point)
-        
-        # Calculate perpendicular distances for all points
-        perp_distances = np.array([
-            self.point_to_line_distance_2d(point, line_start, line_end) 
-            for point in points
-        ])
+        line_start = np.array(start_point, dtype=np.float64)
+        line_end = np.array(end_point, dtype=np.float64)
         
-        # Filter points within tolerance
-        within_tolerance = perp_distances <= tolerance
-        cross_section_points = points[within_tolerance]
-        perp_distances = perp_distances[within_tolerance]
+        candidates = None
+        if spatial_index is not None:
+            candidates = corridor_candidates(spatial_index, line_start, line_end, tolerance)
+        source = points if candidates is None else points[candidates]
         
-        if len(cross_section_points) == 0:
-            return {'points': np.array([]), 'line_distances': np.array([]), 'perp_distances': np.array([])}
-        
-        # Calculate distances along the line
+        # 2D segment for perpendicular distances (as point_to_line_distance_2d)
+        segment = line_end[:2] - line_start[:2]
+        segment_length = np.linalg.norm(segment)
+        segment_unit = segment / segment_length if segment_length > 0 else np.zeros(2)
+        # 3D line for distances along it
         line_vec = line_end - line_start
         line_length = np.linalg.norm(line_vec)
         line_unitvec = line_vec / line_length if line_length > 0 else np.zeros(3)
         
-        line_distances = np.array([
-            np.dot(point - line_start, line_unitvec) 
-            for point in cross_section_points
-        ])
+        index_parts, along_parts, perp_parts = [], [], []
+        for offset in range(0, len(source), chunk_size):
+            chunk = np.asarray(source[offset:offset + chunk_size, :3], dtype=np.float64)
+            rel = chunk[:, :2] - line_start[:2]
+            proj_length = np.clip(rel @ segment_unit, 0, segment_length)
+            perp = np.hypot(rel[:, 0] - proj_length * segment_unit[0], rel[:, 1] - proj_length * segment_unit[1])
+            keep = np.flatnonzero(perp <= tolerance)
+            index_parts.append(keep + offset)
+            perp_parts.append(perp[keep])
+            along_parts.append((chunk[keep] - line_start) @ line_unitvec)
+        
+        indices = np.concatenate(index_parts)
+        if len(indices) == 0:
+            return empty
+        if candidates is not None:
+            indices = candidates[indices]
         
         return {
-            'points': cross_section_points,
-            'line_distances': line_distances,
-            'perp_distances': perp_distances,
+            'points': points[indices],
+            'indices': indices,
+            'line_distances': np.concatenate(along_parts),
+            'perp_distances': np.concatenate(perp_parts),
             'line_start': line_start,
             'line_end': line_end,
             'total_length': line_length
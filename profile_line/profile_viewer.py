@@ -29,6 +29,8 @@ class ProfileViewer(QDialog):
         self.profile_data = None
         self.profile_calculator = None
         self.current_points = None
+        self.current_spatial_index = None
+        self.current_vertices = None
         self.current_start = None
         self.current_end = None
         self.setup_ui()
@@ -128,13 +130,21 @@ class ProfileViewer(QDialog):
         """Set the profile calculator for recalculation"""
         self.profile_calculator = calculator
         
-    def display_profile(self, profile_data, points=None, start_point=None, end_point=None):
-        """Plot height vs distance graph"""
+    def display_profile(self, profile_data, points=None, start_point=None, end_point=None, spatial_index=None,
+                        vertices=None):
+        """
+        Plot height vs distance graph.
+        
+        ``spatial_index`` of ``points`` is reused by recalculation; ``vertices``
+        holds all vertices of a polyline profile.
+        """
         if not MATPLOTLIB_AVAILABLE:
             return
             
         self.profile_data = profile_data
         self.current_points = points
+        self.current_spatial_index = spatial_index
+        self.current_vertices = list(vertices) if vertices is not None else None
         self.current_start = start_point
         self.current_end = end_point
         
@@ -169,6 +179,10 @@ class ProfileViewer(QDialog):
         ax_main.legend(loc='upper right')
         ax_main.grid(True, alpha=0.3)
         
+        # Mark the inner vertices of a polyline profile
+        for vertex_distance in profile_data.get('vertex_distances', [])[1:-1]:
+            ax_main.axvline(vertex_distance, color='gray', linestyle=':', linewidth=1)
+        
         # Add elevation markers at start and end
         if len(distances) > 0:
             start_height = profile_data['mean_heights'][0]
@@ -252,14 +266,23 @@ class ProfileViewer(QDialog):
             print(f"[INFO] Recalculating profile with tolerance={tolerance}, samples={num_samples}")
             
             # Recalculate profile
-            new_profile_data = self.profile_calculator.calculate_profile(
-                self.current_points, self.current_start, self.current_end,
-                num_samples=num_samples, tolerance=tolerance
-            )
+            if self.current_vertices is not None and len(self.current_vertices) > 2:
+                new_profile_data = self.profile_calculator.calculate_polyline_profile(
+                    self.current_points, self.current_vertices,
+                    num_samples=num_samples, tolerance=tolerance,
+                    spatial_index=self.current_spatial_index
+                )
+            else:
+                new_profile_data = self.profile_calculator.calculate_profile(
+                    self.current_points, self.current_start, self.current_end,
+                    num_samples=num_samples, tolerance=tolerance,
+                    spatial_index=self.current_spatial_index
+                )
             
             # Update display
             self.display_profile(new_profile_data, self.current_points, 
-                               self.current_start, self.current_end)
+                               self.current_start, self.current_end, self.current_spatial_index,
+                               self.current_vertices)
             
             # Reset button style
             self.recalculate_button.setStyleSheet("")
@@ -355,7 +378,7 @@ class ProfileViewer(QDialog):
             print(f"[INFO] Creating cross-section layer with tolerance={tolerance}")
             
             # Find all points within tolerance of the line
-            cross_section_points = self._extract_cross_section_points(
+            cross_section_points, point_indices = self._extract_cross_section_points(
                 self.current_points, self.current_start, self.current_end, tolerance
             )
             
@@ -365,7 +388,7 @@ class ProfileViewer(QDialog):
                 return
                 
             # Export as temporary LAZ file
-            temp_file = self._export_cross_section_to_laz(cross_section_points)
+            temp_file = self._export_cross_section_to_laz(cross_section_points, point_indices)
             
             if temp_file:
                 # Signal parent to import the file
@@ -387,66 +410,49 @@ class ProfileViewer(QDialog):
             traceback.print_exc()
     
     def _extract_cross_section_points(self, points, start_point, end_point, tolerance):
-        """Extract points within tolerance distance of the line"""
-        from scipy.spatial import cKDTree
-        
-        # Generate many sample points along the line for better coverage
-        num_line_samples = max(100, int(np.linalg.norm(end_point - start_point) * 10))
-        line_points = self._interpolate_line_points(start_point, end_point, num_line_samples)
-        
-        # Build spatial index for line points
-        line_tree = cKDTree(line_points[:, :2])  # Only X,Y for 2D distance
-        
-        # Find all points within tolerance of any line point
-        point_indices = set()
-        
-        for point in points:
-            distances, indices = line_tree.query(point[:2], k=1)
-            if distances <= tolerance:
-                # Find the original point index
-                original_idx = np.where((points == point).all(axis=1))[0]
-                if len(original_idx) > 0:
-                    point_indices.add(original_idx[0])
-        
-        # Convert to list and extract points
-        selected_indices = list(point_indices)
-        return points[selected_indices] if selected_indices else np.array([]).reshape(0, 3)
-    
-    def _interpolate_line_points(self, start, end, num_samples):
-        """Generate evenly spaced points along the line"""
-        t = np.linspace(0, 1, num_samples)
-        line_points = np.array([start + t_val * (end - start) for t_val in t])
-        return line_points
+        """Extract points within tolerance distance of the line, with their indices in ``points``"""
+        from profile_line.profile_calculator import corridor_selection
+        
+        vertices = self.current_vertices if self.current_vertices is not None else [start_point, end_point]
+        # A polyline's corridor is the union of its segments' corridors
+        parts = [
+            corridor_selection(points, vertices[i], vertices[i + 1], tolerance,
+                               spatial_index=self.current_spatial_index)[0]
+            for i in range(len(vertices) - 1)
+        ]
+        indices = np.unique(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+        print(f"[INFO] Cross-section corridor holds {len(indices):,} of {len(points):,} points")
+        return points[indices], indices
     
-    def _export_cross_section_to_laz(self, points):
-        """Export cross-section points to a temporary LAZ file with full dimension preservation"""
+    def _export_cross_section_to_laz(self, points, point_indices=None):
+        """
+        Export cross-section points to a temporary LAZ file with full dimension preservation.
+        
+        ``point_indices`` are the indices of ``points`` in the current layer, as
+        returned by _extract_cross_section_points; they select the original
+        records whose dimensions are copied.
+        """
         try:
-            from fileio.las_exporter import create_temp_laz_file, find_original_point_indices
+            from fileio.las_exporter import create_temp_laz_file
         except ImportError:
             # Fallback to basic export
-            return self._basic_export_cross_section_to_laz(points)
+            return self._basic_export_cross_section_to_laz(points, point_indices)
             
         try:
-            # Get original LAS data and find point indices
+            # Get original LAS data
             original_las = None
-            original_points = None
-            point_indices = None
+            origin = None
             
             if hasattr(self.parent(), 'layer_manager'):
                 current_layer_id = self.parent().layer_manager.get_current_layer_id()
                 if current_layer_id and current_layer_id in self.parent().layer_manager.layers:
                     layer_data = self.parent().layer_manager.layers[current_layer_id]
                     original_las = layer_data.get('las', None)
-                    original_points = layer_data.get('points', None)
-            
-            # Find indices of cross-section points in original data
-            if original_points is not None:
-                point_indices = find_original_point_indices(points, original_points)
-                print(f"[INFO] Found {len(point_indices)} matching point indices")
+                    origin = layer_data.get('origin', None)
             
             # Create temporary LAZ file with full preservation
             temp_path = create_temp_laz_file(
-                points, original_las, point_indices, prefix="cross_section"
+                points, original_las, point_indices, prefix="cross_section", origin=origin
             )
             
             if temp_path:
@@ -454,13 +460,13 @@ class ProfileViewer(QDialog):
                 return temp_path
             else:
                 print("[WARN] Enhanced export failed, trying basic export")
-                return self._basic_export_cross_section_to_laz(points)
+                return self._basic_export_cross_section_to_laz(points, point_indices)
                 
         except Exception as e:
             print(f"[ERROR] Enhanced export failed: {e}")
-            return self._basic_export_cross_section_to_laz(points)
+            return self._basic_export_cross_section_to_laz(points, point_indices)
     
-    def _basic_export_cross_section_to_laz(self, points):
+    def _basic_export_cross_section_to_laz(self, points, point_indices=None):
         """Basic LAZ export fallback"""
         import tempfile
         import os
@@ -482,8 +488,10 @@ class ProfileViewer(QDialog):
                 current_layer_id = self.parent().layer_manager.get_current_layer_id()
                 if current_layer_id and current_layer_id in self.parent().layer_manager.layers:
                     original_las = self.parent().layer_manager.layers[current_layer_id].get('las', None)
+                # Layer points are relative to the scene origin; the file gets world coordinates
+                points = self.parent().layer_manager.to_world(points)
             
-            if original_las:
+            if original_las is not None and hasattr(original_las, 'point_format') and point_indices is not None:
                 # Create new LAS file based on original header
                 header = laspy.LasHeader(point_format=original_las.header.point_format, 
                                        version=original_las.header.version)
@@ -501,17 +509,6 @@ class ProfileViewer(QDialog):
                 las_file.y = points[:, 1] 
                 las_file.z = points[:, 2]
                 
-                # Copy other dimensions if they exist in original
-                point_indices = []
-                for point in points:
-                    # Find matching points in original data
-                    distances = np.sqrt(np.sum((original_las.xyz - point)**2, axis=1))
-                    closest_idx = np.argmin(distances)
-                    if distances[closest_idx] < 0.001:  # Very close match
-                        point_indices.append(closest_idx)
-                    else:
-                        point_indices.append(0)  # Fallback
-                
                 # Copy available dimensions
                 for dim_name in original_las.point_format.dimension_names:
                     if dim_name not in ['X', 'Y', 'Z']:
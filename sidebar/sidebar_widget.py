@@ -235,6 +235,10 @@ class SidebarWidget(QWidget):
         print(f"[DEBUG] set_status called with text: {text}")
         self.status_label.setText(text)
     
+    def set_loading(self, loading):
+        """Show the cancel button while a file is loading in the background"""
+        self.cancel_load_button.setVisible(loading)
+    
     def update_lod_status(self, lod_info):
         """Update LOD status label with current performance information"""
         if not lod_info:
@@ -245,12 +249,24 @@ class SidebarWidget(QWidget):
         final_count = lod_info.get('final_count', 0)
         reduction = lod_info.get('reduction_percent', 0)
         
-        if reduction > 0:
+        budget = lod_info.get('budget')
+        
+        if budget:
+            status_text = f"LOD: {level.title()} ({final_count:,}/{budget:,}pts)"
+        elif reduction > 0:
             status_text = f"LOD: {level.title()} ({final_count:,}pts, -{reduction:.0f}%)"
         else:
             status_text = f"LOD: {level.title()} ({final_count:,}pts)"
         
+        # Per-layer share of the scene point budget
+        allocation = lod_info.get('allocation') or []
+        tooltip_lines = ["Current LOD system status and performance info"]
+        for name, count, allocated in allocation:
+            share = f" of {allocated:,} allocated" if allocated is not None else ""
+            tooltip_lines.append(f"{name}: {count:,}pts{share}")
+        
         self.lod_status_label.setText(status_text)
+        self.lod_status_label.setToolTip("\n".join(tooltip_lines))
         print(f"[DEBUG] Updated LOD status: {status_text}")
 
     def update_file_info(self, filename, num_points):
@@ -284,6 +300,8 @@ class SidebarWidget(QWidget):
         # Initialize components first
         self.layer_manager = LayerManagerWidget()
         self.button = QPushButton("Open LAS/LAZ File")
+        self.cancel_load_button = QPushButton("Cancel Loading")
+        self.cancel_load_button.hide()
         self.status_label = QLabel("")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.info_group = QGroupBox("Point Cloud Info")
@@ -340,6 +358,7 @@ class SidebarWidget(QWidget):
         # Store styled components for theme updates
         self._styled_components = [
             ('button', self.button),
+            ('button', self.cancel_load_button),
             ('groupbox', self.info_group),
             ('combobox', self.projection_box),
             ('combobox', self.theme_box),
@@ -359,6 +378,7 @@ class SidebarWidget(QWidget):
         # Bottom part (existing controls)
         bottom_layout = QVBoxLayout()
         bottom_layout.addWidget(self.button)
+        bottom_layout.addWidget(self.cancel_load_button)
         bottom_layout.addWidget(self.status_label)
         bottom_layout.addWidget(self.info_group)
         bottom_layout.addWidget(self.color_controls)
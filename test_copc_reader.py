@@ -0,0 +1,27 @@
+from fileio.copc_reader import CopcPointSource
+
+
+def _source(root_spacing=8.0):
+    # Level selection only needs the root spacing; no file is opened
+    source = CopcPointSource.__new__(CopcPointSource)
+    source.root_spacing = root_spacing
+    return source
+
+
+def test_level_for_spacing_halves_per_level():
+    source = _source(8.0)
+
+    assert source.level_for_spacing(8.0) == 0
+    assert source.level_for_spacing(4.0) == 1
+    assert source.level_for_spacing(3.0) == 2
+    assert source.level_for_spacing(100.0) == 0
+
+
+def test_deepest_level_within_budget():
+    source = _source()
+    counts = {0: 100, 1: 400, 2: 1600, 3: 6400}
+
+    assert source._deepest_level_within(counts, 600, first_level=0) == 1
+    assert source._deepest_level_within(counts, 10, first_level=0) == 0
+    assert source._deepest_level_within(counts, 2000, first_level=2) == 2
+    assert source._deepest_level_within(counts, 1000, first_level=2) == 1
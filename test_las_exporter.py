@@ -0,0 +1,114 @@
+import laspy
+import numpy as np
+
+from fileio.las_exporter import export_points_to_laz
+from test_las_loader import _write_test_las
+
+
+def test_export_streams_chunks_and_copies_original_records(tmp_path):
+    reference = _write_test_las(str(tmp_path / "tile.las"))
+    origin = np.array([500000.0, 4800000.0, 0.0])
+    world = np.column_stack((reference.x, reference.y, reference.z))
+    indices = np.arange(0, len(world), 3)
+    local = (world[indices] - origin).astype(np.float32)
+
+    out = str(tmp_path / "subset.las")
+    assert export_points_to_laz(local, out, reference, indices, origin=origin, chunk_size=200)
+
+    written = laspy.read(out)
+    assert written.header.point_count == len(indices)
+    assert np.allclose(written.x, world[indices, 0], atol=1e-3)
+    assert np.allclose(written.z, world[indices, 2], atol=1e-3)
+    assert np.array_equal(written.intensity, np.asarray(reference.intensity)[indices])
+    assert np.array_equal(written.classification, np.asarray(reference.classification)[indices])
+    assert np.allclose(written.header.mins, world[indices].min(axis=0), atol=0.01)
+
+
+def test_export_without_original_writes_basic_file(tmp_path):
+    reference = _write_test_las(str(tmp_path / "tile.las"))
+    world = np.column_stack((reference.x, reference.y, reference.z))
+
+    out = str(tmp_path / "basic.las")
+    assert export_points_to_laz(world, out, chunk_size=700)
+
+    written = laspy.read(out)
+    assert written.header.point_format.id == 3
+    assert np.array_equal(written.header.offsets, np.floor(world.min(axis=0)))
+    assert np.allclose(np.column_stack((written.x, written.y, written.z)), world, atol=0.01)
+
+
+def test_export_from_layer_columns_keeps_header_and_dimensions(tmp_path):
+    from fileio.las_loader import load_point_cloud_data
+
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+    data = load_point_cloud_data(path, use_cache=False)
+    las = data["las"]
+    assert las.header["point_format"].id == 3
+    indices = np.arange(10, 2000, 7)
+
+    out = str(tmp_path / "layer.las")
+    assert export_points_to_laz(data["points"][indices], out, las, indices, origin=data["origin"], chunk_size=100)
+
+    written = laspy.read(out)
+    assert written.header.point_format.id == 3
+    assert np.array_equal(written.header.scales, reference.header.scales)
+    assert np.array_equal(written.header.offsets, reference.header.offsets)
+    assert np.array_equal(written.X, np.asarray(reference.X)[indices])
+    assert np.array_equal(written.intensity, np.asarray(reference.intensity)[indices])
+    assert np.array_equal(written.classification, np.asarray(reference.classification)[indices])
+    # Lazy dimensions were decoded a chunk's rows at a time, not cached on the layer
+    assert not las.is_loaded("Intensity") and not las.is_loaded("Classification")
+
+
+def test_export_reads_lazy_region_columns_in_one_pass_for_unsorted_indices(tmp_path, monkeypatch):
+    import fileio.las_loader as las_loader
+    from fileio.spatial_filter import SpatialFilter
+
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+    world = np.column_stack((reference.x, reference.y, reference.z))
+    mins = world.min(axis=0)
+    region = SpatialFilter(bounds=(mins[0], mins[1], mins[0] + 60, mins[1] + 60))
+    las, _ = las_loader.open_las_columns(path, use_cache=False, region=region, chunk_size=300)
+    inside = np.flatnonzero(region.mask(world[:, 0], world[:, 1]))
+    assert las.point_count == len(inside)
+    # A profile-like subset spread over the whole layer, in no particular order
+    rows = np.random.default_rng(1).permutation(len(inside))[:len(inside) // 3]
+
+    def no_restream(*args, **kwargs):
+        raise AssertionError("region columns must not be re-streamed from the start of the file")
+
+    monkeypatch.setattr(las_loader, "iter_las_chunks", no_restream)
+    out = str(tmp_path / "region.las")
+    assert export_points_to_laz(world[inside][rows], out, las, rows, chunk_size=50)
+
+    written = laspy.read(out)
+    assert np.array_equal(written.intensity, np.asarray(reference.intensity)[inside][rows])
+    assert np.array_equal(written.classification, np.asarray(reference.classification)[inside][rows])
+    assert not las.is_loaded("Intensity")
+
+
+def test_export_reads_sparse_rows_of_lazy_columns_in_bounded_spans(tmp_path, monkeypatch):
+    from fileio.las_loader import open_las_columns
+
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+    las, _ = open_las_columns(path, use_cache=False, chunk_size=100)
+    rows = np.random.default_rng(2).choice(len(reference.x), 300, replace=False)
+    read_sizes = []
+    real_read_points = laspy.LasReader.read_points
+
+    def read_points(self, n):
+        read_sizes.append(n)
+        return real_read_points(self, n)
+
+    monkeypatch.setattr(laspy.LasReader, "read_points", read_points)
+    out = str(tmp_path / "sparse.las")
+    world = np.column_stack((reference.x, reference.y, reference.z))
+    assert export_points_to_laz(world[rows], out, las, rows, chunk_size=100)
+
+    written = laspy.read(out)
+    assert np.array_equal(written.intensity, np.asarray(reference.intensity)[rows])
+    # Each span stays within one loader chunk instead of covering the file
+    assert read_sizes and max(read_sizes) <= 100
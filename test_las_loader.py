@@ -0,0 +1,244 @@
+import laspy
+import numpy as np
+import pytest
+
+from fileio.las_loader import iter_las_chunks, load_las_file
+
+
+def _write_test_las(path, count=2500):
+    header = laspy.LasHeader(point_format=3, version="1.2")
+    header.offsets = [500000.0, 4800000.0, 0.0]
+    header.scales = [0.01, 0.01, 0.01]
+    las = laspy.LasData(header)
+    rng = np.random.default_rng(0)
+    las.x = 500000.0 + rng.uniform(0, 100, count)
+    las.y = 4800000.0 + rng.uniform(0, 100, count)
+    las.z = rng.uniform(0, 30, count)
+    las.intensity = rng.integers(0, 65535, count, dtype=np.uint16)
+    las.classification = rng.integers(1, 7, count, dtype=np.uint8)
+    las.write(path)
+    return laspy.read(path)
+
+
+def test_load_las_file_streams_into_native_columns(tmp_path):
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+
+    las, dims = load_las_file(path, chunk_size=1000)
+
+    assert dims == sorted(dims)
+    assert {"X", "Y", "Z", "Intensity", "Classification"} <= set(dims)
+    assert len(las["X"]) == len(reference.x)
+    assert np.allclose(las["X"], reference.x)
+    assert np.allclose(las["Z"], reference.z)
+    assert las["Intensity"].dtype == np.uint16
+    assert las["Classification"].dtype == np.uint8
+    assert np.array_equal(las["Classification"], np.asarray(reference.classification))
+
+
+def test_iter_las_chunks_respects_chunk_size(tmp_path):
+    path = str(tmp_path / "tile.las")
+    _write_test_las(path)
+
+    sizes = [len(chunk["X"]) for chunk in iter_las_chunks(path, chunk_size=1000)]
+
+    assert sizes == [1000, 1000, 500]
+
+
+def test_load_las_file_raw_xyz_scales_on_access(tmp_path):
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+
+    las, _ = load_las_file(path, raw_xyz=True)
+
+    assert las.is_raw("X")
+    assert las.raw("X").dtype == np.int32
+    assert np.array_equal(las.raw("Y"), np.asarray(reference.Y))
+    assert las["X"].dtype == np.float64
+    assert np.allclose(las["X"], reference.x)
+    assert not las.is_raw("Intensity")
+
+
+def test_open_las_columns_decodes_other_dimensions_on_access(tmp_path):
+    from fileio.las_loader import open_las_columns
+
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+
+    las, dims = open_las_columns(path, use_cache=False)
+
+    assert "Intensity" in dims and "Intensity" in las
+    assert las.loaded_dims == ["X", "Y", "Z"]
+    assert np.allclose(las["Z"], reference.z)
+    assert np.array_equal(las["Intensity"], np.asarray(reference.intensity))
+    assert las.is_loaded("Intensity")
+    assert not las.is_loaded("Classification")
+
+
+def test_chunk_callback_can_cancel_load(tmp_path):
+    import pytest
+    from fileio.las_loader import LoadCancelled, open_las_columns
+
+    path = str(tmp_path / "tile.las")
+    _write_test_las(path)
+    seen = []
+
+    def on_chunk(xyz):
+        seen.append(xyz.shape)
+        raise LoadCancelled(path)
+
+    with pytest.raises(LoadCancelled):
+        open_las_columns(path, chunk_size=1000, use_cache=False, chunk_callback=on_chunk)
+    assert seen == [(1000, 3)]
+
+
+def test_load_point_cloud_data_stores_float32_offsets_from_origin(tmp_path):
+    from fileio.las_loader import load_point_cloud_data
+
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+
+    data = load_point_cloud_data(path, use_cache=False)
+    points, origin = data["points"], data["origin"]
+
+    assert points.dtype == np.float32 and points.flags.c_contiguous
+    assert origin.dtype == np.float64
+    assert origin[2] == 0.0
+    assert np.all(points[:, :2] >= 0) and np.all(points[:, :2] < 101)
+    world = points.astype(np.float64) + origin
+    assert np.allclose(world, np.column_stack((reference.x, reference.y, reference.z)), atol=1e-3)
+
+    shifted = load_point_cloud_data(path, use_cache=False, origin=origin - [1000.0, 0.0, 0.0])
+    assert np.allclose(shifted["points"][:, 0], points[:, 0] + 1000.0, atol=1e-3)
+
+
+def test_metadata_summary_reads_header_only(tmp_path, monkeypatch):
+    import fileio.las_loader as las_loader
+
+    path = str(tmp_path / "tile.las")
+    _write_test_las(path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("points must not be decoded for the metadata summary")
+
+    monkeypatch.setattr(las_loader, "iter_las_chunks", fail)
+    meta = las_loader.read_las_metadata(path)
+    summary = las_loader.get_las_metadata_summary(path)
+
+    assert meta["point_count"] == 2500
+    assert meta["point_format"] == 3
+    assert "Classification" in [dim["name"] for dim in meta["schema"]]
+    assert "Point count: 2,500" in summary
+
+
+def test_compute_las_statistics_is_cached_per_file(tmp_path):
+    from fileio.las_loader import compute_las_statistics
+    from fileio.point_cache import PointCache
+    import fileio.point_cache as point_cache
+
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+    cache = PointCache(str(tmp_path / "cache"))
+    point_cache._point_cache, previous = cache, point_cache._point_cache
+    try:
+        stats = compute_las_statistics(path, chunk_size=1000)
+        assert cache.load_stats(path) == stats
+    finally:
+        point_cache._point_cache = previous
+
+    assert stats["Z"]["minimum"] == reference.z.min()
+    assert stats["Intensity"]["maximum"] == reference.intensity.max()
+    assert np.isclose(stats["X"]["average"], np.asarray(reference.x).mean())
+
+
+def test_load_point_cloud_data_reads_only_points_in_region(tmp_path):
+    from fileio.las_loader import load_point_cloud_data
+
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+    x, y = np.asarray(reference.x), np.asarray(reference.y)
+
+    boxed = load_point_cloud_data(path, use_cache=False, bounds=(500010, 4800020, 500040, 4800050))
+    inside = (x >= 500010) & (x <= 500040) & (y >= 4800020) & (y <= 4800050)
+    world = boxed["points"].astype(np.float64) + boxed["origin"]
+    assert len(world) == inside.sum()
+    assert np.allclose(np.sort(world[:, 0]), np.sort(x[inside]), atol=1e-3)
+    assert np.array_equal(np.sort(boxed["las"]["Intensity"]), np.sort(np.asarray(reference.intensity)[inside]))
+
+    triangle = [(500000, 4800000), (500100, 4800000), (500000, 4800100)]
+    clipped = load_point_cloud_data(path, use_cache=False, polygon=triangle)
+    assert len(clipped["points"]) == ((x - 500000) + (y - 4800000) < 100).sum()
+
+    outside = load_point_cloud_data(path, use_cache=False, bounds=(0, 0, 10, 10))
+    assert outside["points"].shape == (0, 3)
+    assert len(outside["las"]["Intensity"]) == 0
+
+
+def test_cache_hit_previews_the_local_points_without_copies(tmp_path, monkeypatch):
+    import fileio.point_cache as point_cache
+    from fileio.las_loader import load_point_cloud_data
+
+    monkeypatch.setattr(point_cache, "_point_cache", point_cache.PointCache(str(tmp_path / "cache")))
+    path = str(tmp_path / "tile.las")
+    _write_test_las(path)
+    first = []
+    load_point_cloud_data(path, chunk_size=1000, chunk_callback=first.append)
+    assert len(first) > 1 and all(chunk.dtype == np.float32 for chunk in first)
+
+    chunks = []
+    data = load_point_cloud_data(path, chunk_size=1000, chunk_callback=chunks.append)
+
+    assert len(chunks) == 1 and chunks[0] is data["points"]
+    assert np.allclose(np.concatenate(first), data["points"])
+
+
+def test_load_las_file_skips_empty_chunks(tmp_path, monkeypatch):
+    import fileio.las_loader as las_loader
+
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path)
+    real_chunks = las_loader.iter_las_chunks
+
+    def chunks_after_empty_ones(*args, **kwargs):
+        # What a region filter can hand back before the first point inside it
+        yield {}
+        yield {"X": np.empty(0, dtype=np.int32)}
+        yield from real_chunks(*args, **kwargs)
+
+    monkeypatch.setattr(las_loader, "iter_las_chunks", chunks_after_empty_ones)
+    las, _ = las_loader.load_las_file(path, chunk_size=1000)
+
+    assert np.array_equal(las["Intensity"], reference.intensity)
+
+
+def test_laz_without_backend_is_read_through_pdal(tmp_path, monkeypatch):
+    import fileio.las_loader as las_loader
+
+    path = str(tmp_path / "tile.las")
+    _write_test_las(path)
+    # Same file with the header's compressed flag set: laspy reads the header, not the points
+    data = bytearray(open(path, "rb").read())
+    data[104] |= 0x80
+    laz_path = str(tmp_path / "tile.laz")
+    open(laz_path, "wb").write(data)
+
+    monkeypatch.setattr(las_loader, "LAZ_BACKEND_AVAILABLE", False)
+    monkeypatch.setattr(las_loader, "PDAL_AVAILABLE", True)
+    assert las_loader._laspy_decodes(path)
+    assert not las_loader._laspy_decodes(laz_path)
+
+
+@pytest.mark.skipif(not laspy.LazBackend.detect_available(), reason="no LAZ backend (lazrs/laszip) installed")
+def test_laz_round_trip(tmp_path):
+    from fileio.las_loader import load_point_cloud_data
+
+    las_path = str(tmp_path / "tile.las")
+    reference = _write_test_las(las_path)
+    laz_path = str(tmp_path / "tile.laz")
+    reference.write(laz_path)
+
+    data = load_point_cloud_data(laz_path, use_cache=False)
+
+    world = data["points"].astype(np.float64) + data["origin"]
+    assert np.allclose(world, np.column_stack((reference.x, reference.y, reference.z)), atol=1e-3)
+    assert np.array_equal(data["las"]["Intensity"], reference.intensity)
@@ -0,0 +1,48 @@
+import numpy as np
+
+from profile_line.line_drawer import LineDrawer
+
+
+class _Plotter:
+    def __init__(self):
+        self.picking = False
+
+    def enable_point_picking(self, **kwargs):
+        self.picking = True
+
+    def disable_picking(self):
+        self.picking = False
+
+    def add_key_event(self, key, callback):
+        pass
+
+    def add_mesh(self, mesh, **kwargs):
+        return mesh
+
+    def remove_actor(self, actor):
+        pass
+
+    def update(self):
+        pass
+
+
+class _Viewer:
+    def __init__(self):
+        self.plotter = _Plotter()
+
+
+def test_finished_polyline_is_not_extended_by_later_clicks():
+    drawer = LineDrawer(_Viewer())
+    finished = []
+    drawer.on_polyline_completed_callback = finished.append
+    drawer.start_line_drawing(polyline=True)
+    for point in ([0, 0, 0], [10, 0, 0], [10, 10, 0]):
+        drawer._on_point_picked(np.array(point, dtype=float))
+
+    drawer.finish_polyline()
+
+    assert len(finished) == 1 and len(finished[0]) == 3
+    assert not drawer.is_drawing and not drawer.viewer.plotter.picking
+    drawer._on_point_picked(np.array([20.0, 10.0, 0.0]))
+    drawer.finish_polyline()
+    assert len(finished) == 1 and drawer.vertices == []
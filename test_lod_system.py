@@ -0,0 +1,135 @@
+import warnings
+
+import numpy as np
+
+from viewer.lod_system import LODSystem, voxel_lod_order
+
+
+def _scan_lines(rows=200, cols=200):
+    # Row-major "scan line" ordering, as many LAS files are stored
+    y, x = np.mgrid[0:rows, 0:cols]
+    z = np.sin(x / 10.0) * 2
+    return np.column_stack((x.ravel(), y.ravel(), z.ravel())).astype(np.float32)
+
+
+def _occupied_cells(points, cell=10):
+    return len(np.unique((points[:, 0] // cell) * 1000 + points[:, 1] // cell))
+
+
+def test_voxel_lod_order_is_a_permutation_with_uniform_prefixes():
+    points = _scan_lines()
+    order = voxel_lod_order(points)
+
+    assert np.array_equal(np.sort(order), np.arange(len(points)))
+    prefix = points[order[:len(points) // 20]]
+    assert _occupied_cells(prefix) == _occupied_cells(points)
+
+
+
+def test_voxel_lod_order_handles_duplicate_points_without_warnings():
+    points = np.repeat(_scan_lines(20, 20), 3, axis=0)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        order = voxel_lod_order(points)
+
+    assert np.array_equal(np.sort(order), np.arange(len(points)))
+    # Each location's first copy comes before any duplicate
+    assert _occupied_cells(points[order[:400]], cell=1) == 400
+
+def test_apply_lod_levels_are_nested_prefix_slices():
+    points = _scan_lines()
+    scalars = np.arange(len(points))
+    lod = LODSystem()
+    order = voxel_lod_order(points)
+
+    far_points, far_scalars, far = lod.apply_lod(points, scalars, 'far', order=lambda: order)
+    _, _, medium = lod.apply_lod(points, scalars, 'medium', order=order)
+
+    assert far['final_count'] == len(points) // 20
+    assert np.array_equal(far['indices'], medium['indices'][:far['final_count']])
+    assert np.array_equal(far_points, points[far['indices']])
+    assert np.array_equal(far_scalars, far['indices'])
+    # Every-Nth striding on scan-line order would leave most 10x10 cells of a row band empty
+    assert _occupied_cells(far_points) == _occupied_cells(points)
+
+
+def test_interaction_coarsens_large_layers_only():
+    lod = LODSystem()
+    viewer = object()  # no camera: distance 1.0
+    large = np.zeros((lod.size_thresholds['medium'], 3), dtype=np.float32)
+    small = np.zeros((lod.size_thresholds['small'] + 1, 3), dtype=np.float32)
+
+    assert lod.determine_lod_level(large, viewer, scene_size=10.0) == 'close'
+    assert lod.determine_lod_level(large, viewer, interacting=True, scene_size=10.0) == lod.interaction_level
+    # Already coarser than the interaction level: unchanged
+    assert lod.determine_lod_level(large, viewer, interacting=True, scene_size=0.1) == 'far'
+    assert lod.determine_lod_level(small, viewer, interacting=True, scene_size=10.0) == 'close'
+
+
+def test_point_budget_follows_screen_coverage_and_redistributes_unused_share():
+    lod = LODSystem()
+    lod.min_layer_points = 1000
+    layers = {'big': (50_000_000, 0.6), 'small': (2_000_000, 0.3), 'hidden': (10_000_000, 0.0)}
+
+    shares = lod.allocate_point_budget(layers, budget=20_000_000)
+
+    assert sum(shares.values()) <= 20_000_000
+    assert shares['hidden'] == 1000
+    # 'small' is capped at its point count; what it leaves goes to 'big'
+    assert shares['small'] == 2_000_000
+    assert shares['big'] >= 20_000_000 - 2_000_000 - 1000 - 1
+    # Everything fits: every layer is drawn whole
+    assert lod.allocate_point_budget(layers, budget=100_000_000) == {k: v[0] for k, v in layers.items()}
+
+    # A share below the level's count caps the LOD prefix
+    points = _scan_lines()
+    order = voxel_lod_order(points)
+    _, _, info = lod.apply_lod(points, None, 'close', order=order, max_points=1000)
+    assert np.array_equal(info['indices'], order[:1000])
+
+
+def test_screen_coverage_of_projected_bounds():
+    lod = LODSystem()
+    # Orthographic top-down view of x, y in [-10, 10]
+    view = {'projection': np.diag([0.1, 0.1, -0.1, 1.0])}
+
+    assert lod.screen_coverage(([-10, -10, 0], [10, 10, 1]), view) == 1.0
+    assert np.isclose(lod.screen_coverage(([0, 0, 0], [10, 10, 1]), view), 0.25)
+    assert lod.screen_coverage(([20, 20, 0], [30, 30, 1]), view) == 0.0
+    assert lod.screen_coverage(([0, 0, 0], [1, 1, 1]), None) == 0.0
+
+
+def test_auto_adjust_holds_target_frame_rate_with_hysteresis():
+    lod = LODSystem()
+    lod.adjust_min_interval = 0.0
+    target = 1.0 / lod.target_fps
+
+    for _ in range(lod.adjust_min_frames - 1):
+        lod.update_performance_stats(target * 3)
+    assert not lod.auto_adjust()  # too few frames to call it a trend
+    lod.update_performance_stats(target * 3)
+    assert lod.auto_adjust()
+    assert lod.detail_scale == lod.tighten_step
+    assert lod.decimation_factor('medium') > lod.decimation_factors['medium']
+    assert lod.point_budget() < lod.scene_point_budget
+
+    # Inside the band: no change, however many frames
+    for _ in range(3 * lod.adjust_min_frames):
+        lod.update_performance_stats(target * 0.9)
+    assert not lod.auto_adjust()
+
+    # A single slow frame among fast ones is not a trend
+    for _ in range(2 * lod.adjust_min_frames):
+        lod.update_performance_stats(target * 0.3)
+    lod.update_performance_stats(target * 50)
+    assert lod.auto_adjust()
+    assert lod.detail_scale < lod.tighten_step
+
+    # Fast frames relax the detail back, but never past the configured budget
+    while lod.detail_scale > lod.detail_scale_limits[0]:
+        for _ in range(lod.adjust_min_frames):
+            lod.update_performance_stats(target * 0.1)
+        lod._last_adjust_time = 0.0
+        assert lod.auto_adjust()
+    assert lod.point_budget() == lod.scene_point_budget
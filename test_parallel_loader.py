@@ -0,0 +1,92 @@
+import os
+import time
+
+import numpy as np
+
+from test_las_loader import _write_test_las
+
+
+def test_load_files_parallel_shares_one_origin(tmp_path, monkeypatch):
+    import fileio.point_cache as point_cache
+    from fileio.parallel_loader import load_files_parallel
+
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setenv("LIDAR_VIEWER_CACHE_DIR", cache_dir)  # worker processes
+    monkeypatch.setattr(point_cache, "_point_cache", point_cache.PointCache(cache_dir))
+    references = {}
+    for i in range(2):
+        path = str(tmp_path / f"tile_{i}.las")
+        references[path] = _write_test_las(path, count=1000 + i)
+
+    results = list(load_files_parallel(list(references), workers=2))
+
+    assert sorted(r["file_path"] for r in results) == sorted(references)
+    for result in results:
+        reference = references[result["file_path"]]
+        assert result["points"].dtype == np.float32
+        assert np.array_equal(result["origin"], results[0]["origin"])
+        world = result["points"].astype(np.float64) + result["origin"]
+        assert np.allclose(world, np.column_stack((reference.x, reference.y, reference.z)), atol=1e-3)
+        assert np.array_equal(result["las"]["Intensity"], np.asarray(reference.intensity))
+
+
+def test_load_files_parallel_opens_columns_lazily_on_cache_miss(tmp_path, monkeypatch):
+    import fileio.point_cache as point_cache
+    from fileio.parallel_loader import load_files_parallel
+
+    monkeypatch.setenv("LIDAR_VIEWER_CACHE_DIR", str(tmp_path / "worker_cache"))
+    # The parent looks elsewhere, as if the worker's entry had been evicted
+    monkeypatch.setattr(point_cache, "_point_cache", point_cache.PointCache(str(tmp_path / "parent_cache")))
+    path = str(tmp_path / "tile.las")
+    reference = _write_test_las(path, count=1500)
+
+    [result] = list(load_files_parallel([path], workers=1))
+
+    las = result["las"]
+    assert las.point_count == 1500
+    assert not las.is_loaded("X")
+    assert np.allclose(las["X"], reference.x)
+    assert np.array_equal(las["Intensity"], np.asarray(reference.intensity))
+
+
+def _decode_at_rendezvous(file_path, *args):
+    # Worker process: only proceeds once every worker has started decoding
+    from fileio.parallel_loader import _decode_into_shared_memory
+    rendezvous = os.environ["PARALLEL_TEST_RENDEZVOUS"]
+    open(os.path.join(rendezvous, f"{os.getpid()}.started"), "w").close()
+    deadline = time.time() + 30
+    while len([name for name in os.listdir(rendezvous) if name.endswith(".started")]) < 2:
+        if time.time() > deadline:
+            raise TimeoutError("the other file was not being decoded at the same time")
+        time.sleep(0.01)
+    return _decode_into_shared_memory(file_path, *args)
+
+
+def test_load_files_parallel_decodes_files_concurrently_with_their_lod(tmp_path, monkeypatch):
+    import fileio.parallel_loader as parallel_loader
+    import fileio.point_cache as point_cache
+
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setenv("LIDAR_VIEWER_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(point_cache, "_point_cache", point_cache.PointCache(cache_dir))
+    rendezvous = tmp_path / "rendezvous"
+    rendezvous.mkdir()
+    monkeypatch.setenv("PARALLEL_TEST_RENDEZVOUS", str(rendezvous))
+    monkeypatch.setattr(parallel_loader, "_decode_into_shared_memory", _decode_at_rendezvous)
+    paths = []
+    for i in range(2):
+        paths.append(str(tmp_path / f"tile_{i}.las"))
+        _write_test_las(paths[-1], count=2000)
+    missing = str(tmp_path / "missing.las")
+
+    results = list(parallel_loader.load_files_parallel(paths + [missing], workers=2, octree_min_points=2000))
+
+    errors = [r for r in results if "error" in r]
+    assert [r["file_path"] for r in errors] == [missing]
+    loaded = [r for r in results if "error" not in r]
+    assert sorted(r["file_path"] for r in loaded) == paths
+    for result in loaded:
+        octree = result["lod"]["octree"]
+        assert result["lod"]["lod_order"] is None and len(octree) == 2000
+        assert np.array_equal(np.sort(octree.order), np.arange(2000))
+        assert len(octree.select(500)) <= 500
@@ -0,0 +1,52 @@
+import os
+
+from fileio import pdal_exporter
+from fileio.pdal_exporter import convert_to_copc, copc_output_path, find_conversion_inputs
+from test_las_loader import _write_test_las
+
+
+def test_copc_output_path():
+    assert copc_output_path("/data/tile.laz") == os.path.join("/data", "tile.copc.laz")
+    assert copc_output_path("/data/tile.las", "/out") == os.path.join("/out", "tile.copc.laz")
+
+
+def test_find_conversion_inputs_skips_copc_and_other_files(tmp_path):
+    _write_test_las(str(tmp_path / "a.las"), count=10)
+    _write_test_las(str(tmp_path / "b.las"), count=10)
+    (tmp_path / "c.copc.laz").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("x")
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    _write_test_las(str(sub / "d.las"), count=10)
+
+    assert [os.path.basename(p) for p in find_conversion_inputs(str(tmp_path))] == ["a.las", "b.las"]
+    assert len(find_conversion_inputs(str(tmp_path), recursive=True)) == 3
+
+
+def test_convert_to_copc_untwine_writes_a_single_file(tmp_path, monkeypatch):
+    input_path = str(tmp_path / "tile.las")
+    _write_test_las(input_path, count=10)
+    calls = []
+
+    def fake_run(args, **kwargs):
+        calls.append(args)
+        # untwine's --output_dir is the COPC file itself in single-file mode
+        with open(args[2][len("--output_dir="):], "wb") as f:
+            f.write(b"copc")
+
+    monkeypatch.setattr(pdal_exporter, "PDAL_AVAILABLE", False)
+    monkeypatch.setattr(pdal_exporter.shutil, "which", lambda name: "/usr/bin/" + name)
+    monkeypatch.setattr(pdal_exporter.subprocess, "run", fake_run)
+
+    output_path = convert_to_copc(input_path)
+
+    assert output_path == str(tmp_path / "tile.copc.laz")
+    assert len(calls) == 1
+    args = calls[0]
+    assert args[0] == "untwine"
+    assert args[1] == f"--files={input_path}"
+    assert args[2].startswith("--output_dir=") and args[2].endswith(".copc.laz")
+    assert args[3:] == ["--single_file"]
+    with open(output_path, "rb") as f:
+        assert f.read() == b"copc"
+    assert sorted(os.listdir(tmp_path)) == ["tile.copc.laz", "tile.las"]
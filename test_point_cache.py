@@ -0,0 +1,147 @@
+import os
+import time
+
+import numpy as np
+
+from fileio.las_columns import LasColumns
+from fileio.point_cache import PointCache
+
+
+def _columns(count=1000):
+    rng = np.random.default_rng(1)
+    return LasColumns({
+        "X": rng.integers(0, 10000, count, dtype=np.int32),
+        "Y": rng.integers(0, 10000, count, dtype=np.int32),
+        "Z": rng.integers(0, 3000, count, dtype=np.int32),
+        "Intensity": rng.integers(0, 65535, count, dtype=np.uint16),
+    }, scales=[0.01, 0.01, 0.01], offsets=[500000.0, 4800000.0, 0.0])
+
+
+def _source(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"LASF" + os.urandom(64))
+    return str(path)
+
+
+def test_store_then_load_memory_maps_columns(tmp_path):
+    cache = PointCache(str(tmp_path / "cache"))
+    source = _source(tmp_path, "a.las")
+    las = _columns()
+    dims = sorted(las)
+
+    assert cache.load(source) is None
+    assert cache.store(source, las, dims)
+    cached, cached_dims = cache.load(source)
+
+    assert sorted(cached_dims) == dims
+    assert isinstance(cached.raw("Intensity"), np.memmap)
+    assert cached.is_raw("X")
+    assert np.allclose(cached["X"], las["X"])
+    assert np.array_equal(cached["Intensity"], las["Intensity"])
+
+
+def test_modified_source_misses_cache(tmp_path):
+    cache = PointCache(str(tmp_path / "cache"))
+    source = _source(tmp_path, "a.las")
+    las = _columns()
+    cache.store(source, las, sorted(las))
+
+    with open(source, "ab") as f:
+        f.write(b"more")
+
+    assert cache.load(source) is None
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    las = _columns()
+    entry_bytes = las.nbytes
+    cache = PointCache(str(tmp_path / "cache"), max_bytes=int(entry_bytes * 2.5))
+    sources = [_source(tmp_path, f"{name}.las") for name in "abc"]
+
+    cache.store(sources[0], las, sorted(las))
+    time.sleep(0.01)
+    cache.store(sources[1], las, sorted(las))
+    time.sleep(0.01)
+    cache.load(sources[0])
+    time.sleep(0.01)
+    cache.store(sources[2], las, sorted(las))
+
+    assert cache.has(sources[0])
+    assert not cache.has(sources[1])
+    assert cache.has(sources[2])
+    assert cache.total_bytes() <= cache.max_bytes
+
+
+def test_lazily_decoded_columns_are_added_to_entry(tmp_path):
+    cache = PointCache(str(tmp_path / "cache"))
+    source = _source(tmp_path, "a.las")
+    las = _columns()
+
+    cache.store(source, las, ["X", "Y", "Z"])
+    assert cache.store_column(source, "Intensity", las.raw("Intensity"))
+    cached, dims = cache.load(source)
+
+    assert dims == list(las)
+    assert cached.loaded_dims == ["X", "Y", "Z", "Intensity"]
+
+
+def test_interrupted_touch_leaves_meta_intact(tmp_path, monkeypatch):
+    import fileio.point_cache as point_cache
+
+    cache = PointCache(str(tmp_path / "cache"))
+    source = _source(tmp_path, "a.las")
+    cache.store(source, _columns(), ["X", "Y", "Z"])
+
+    def crash_mid_write(obj, f):
+        f.write("{")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(point_cache.json, "dump", crash_mid_write)
+    assert cache.load(source) is not None
+    monkeypatch.undo()
+
+    assert cache.load(source) is not None
+    assert [name for name in os.listdir(cache.entry_dir(source)) if "tmp" in name] == []
+
+
+def test_statistics_count_towards_the_bound_and_are_evicted(tmp_path):
+    las = _columns()
+    cache = PointCache(str(tmp_path / "cache"))
+    sources = [_source(tmp_path, f"{name}.las") for name in "ab"]
+    stats = {f"Dim{i}": {"minimum": 0.0, "maximum": float(i), "average": 0.5} for i in range(200)}
+    cache.store_stats(sources[0], stats)
+    stats_bytes = cache.total_bytes()
+    assert stats_bytes > 0
+
+    cache.max_bytes = las.nbytes + stats_bytes // 2
+    time.sleep(0.01)
+    cache.store(sources[1], las, sorted(las))
+
+    assert cache.load_stats(sources[0]) is None
+    assert cache.has(sources[1])
+    assert cache.total_bytes() <= cache.max_bytes
+
+
+def test_entry_still_in_use_is_evicted_on_a_later_pass(tmp_path, monkeypatch):
+    import fileio.point_cache as point_cache
+
+    las = _columns()
+    cache = PointCache(str(tmp_path / "cache"), max_bytes=int(las.nbytes * 1.5))
+    old, new = _source(tmp_path, "old.las"), _source(tmp_path, "new.las")
+    cache.store(old, las, sorted(las))
+    time.sleep(0.01)
+    real_remove = os.remove
+
+    def locked(path):
+        # What Windows does to a column a layer still memory-maps
+        if path.endswith(".npy"):
+            raise PermissionError("file is in use")
+        real_remove(path)
+
+    monkeypatch.setattr(point_cache.os, "remove", locked)
+    cache.store(new, las, sorted(las))
+    assert cache.has(old)
+    monkeypatch.undo()
+
+    assert cache.evict(keep=os.path.basename(cache.entry_dir(new))) == 1
+    assert not cache.has(old) and cache.has(new)
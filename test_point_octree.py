@@ -0,0 +1,63 @@
+import numpy as np
+
+from viewer.point_octree import PointOctree, build_layer_lod
+
+
+def _tile(count=400_000, extent=1000.0):
+    rng = np.random.default_rng(3)
+    points = rng.random((count, 3)) * [extent, extent, 10.0]
+    return points.astype(np.float32)
+
+
+def _box_planes(xmin, xmax, ymin, ymax):
+    # Inward facing side planes of a top-down view over the box
+    return np.array([[1, 0, 0, -xmin], [-1, 0, 0, xmax], [0, 1, 0, -ymin], [0, -1, 0, ymax]], dtype=np.float64)
+
+
+def test_overview_selection_respects_budget_and_covers_the_layer():
+    points = _tile()
+    octree = PointOctree(points, leaf_points=4096)
+    assert np.array_equal(np.sort(octree.order), np.arange(len(points)))
+
+    selected = octree.select(50_000)
+    assert len(selected) <= 50_000
+    assert len(np.unique(selected)) == len(selected)
+    cells = np.unique((points[selected, 0] // 100) * 10 + points[selected, 1] // 100)
+    assert len(cells) == 100
+
+
+def test_view_selection_culls_leaves_and_keeps_full_density_when_zoomed_in():
+    points = _tile()
+    octree = PointOctree(points, leaf_points=4096)
+    view = {'planes': _box_planes(0, 100, 0, 100), 'position': [50, 50, 150], 'view_angle': 30, 'height': 1000}
+
+    selected = octree.select(1_000_000, view)
+    corner = (points[:, 0] <= 100) & (points[:, 1] <= 100)
+    assert np.all(np.isin(np.flatnonzero(corner), selected))
+    # Only leaves touching the corner: far less than the whole tile
+    assert len(selected) < len(points) // 10
+
+    # Same view with a small budget stays within it
+    assert len(octree.select(2_000, view)) <= 2_000
+
+
+def test_prebuilt_layer_lod_is_adopted_without_rebuilding():
+    from layers.layer_db import LayerManager
+
+    small, large = _tile(20_000), _tile()
+    small_lod = build_layer_lod(small, octree_min_points=100_000)
+    large_lod = build_layer_lod(large, octree_min_points=100_000)
+    assert small_lod['octree'] is None and np.array_equal(np.sort(small_lod['lod_order']), np.arange(len(small)))
+    assert large_lod['lod_order'] is None and len(large_lod['octree']) == len(large)
+
+    manager = LayerManager()
+    manager.add_layer("a", "a.las", small, None, origin=[0.0, 0.0, 0.0], lod=small_lod)
+    assert manager.get_lod_order("a") is small_lod['lod_order']
+    manager.replace_layer_points("a", large, None, origin=[0.0, 0.0, 0.0], lod=large_lod)
+    assert manager.get_octree("a") is large_lod['octree']
+    assert manager.get_layer_bounds("a") is large_lod['bounds']
+
+    # Points shifted onto the scene origin no longer match the prebuilt structures
+    manager.replace_layer_points("a", small, None, origin=[5.0, 0.0, 0.0], lod=small_lod)
+    assert manager.layers["a"]['lod_order'] is None
+    assert manager.get_layer_bounds("a")[0][0] >= 5.0
@@ -0,0 +1,82 @@
+import numpy as np
+import pyvista as pv
+
+from point_picking.point_picker import PointPicker
+from viewer.lod_system import LAYER_POINT_IDS
+
+
+class _Picker:
+    """The vtkPointPicker accessors the pick callback reads."""
+
+    def __init__(self, dataset, point_id, actor=None):
+        self._dataset = dataset
+        self._point_id = point_id
+        self._actor = actor
+
+    def GetActor(self):
+        return self._actor
+
+    def GetDataSet(self):
+        return self._dataset
+
+    def GetPointId(self):
+        return self._point_id
+
+
+class _Layers:
+    def __init__(self, origin, actors=None, current=None):
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.actors = actors or {}
+        self.current = current
+
+    def to_world(self, points):
+        return np.asarray(points, dtype=np.float64) + self.origin
+
+    def get_layer_id_for_actor(self, actor):
+        for uuid, layer_actor in self.actors.items():
+            if layer_actor is actor:
+                return uuid
+        return None
+
+    def get_current_layer_id(self):
+        return self.current
+
+    def get_spatial_index(self, uuid=None):
+        return None
+
+
+def test_pick_maps_decimated_actor_point_to_layer_index():
+    layer_ids = np.array([7, 3, 42, 11])
+    mesh = pv.PolyData(np.arange(12, dtype=np.float32).reshape(4, 3))
+    mesh.point_data[LAYER_POINT_IDS] = layer_ids
+    picker = PointPicker(viewer=None, layer_manager=_Layers((100.0, 200.0, 0.0)))
+
+    # pyvista's use_picker=True signature: callback(picked_point, picker)
+    picker._on_point_picked(mesh.points[2], _Picker(mesh, 2))
+
+    coords, layer_id, index = picker.picked_points[-1]
+    assert layer_id is None
+    assert index == 42
+    np.testing.assert_allclose(coords, [106.0, 207.0, 8.0])
+
+
+def test_pick_on_undecimated_actor_uses_the_vtk_point_id():
+    mesh = pv.PolyData(np.zeros((5, 3), dtype=np.float32))
+    picker = PointPicker(viewer=None)
+
+    picker._on_point_picked(mesh.points[4], _Picker(mesh, 4))
+
+    assert picker.picked_points[-1][2] == 4
+
+
+def test_pick_reports_the_layer_of_the_picked_actor():
+    mesh = pv.PolyData(np.zeros((3, 3), dtype=np.float32))
+    mesh.point_data[LAYER_POINT_IDS] = np.array([5, 6, 9])
+    first, second = object(), object()
+    layers = _Layers((0.0, 0.0, 0.0), actors={'a': first, 'b': second}, current='a')
+    picker = PointPicker(viewer=None, layer_manager=layers)
+
+    coords, layer_id, index = picker._on_point_picked(mesh.points[1], _Picker(mesh, 1, actor=second))
+
+    assert (layer_id, index) == ('b', 6)
+    assert picker.picked_points[-1][1:] == ('b', 6)
@@ -0,0 +1,103 @@
+import numpy as np
+
+from profile_line.profile_calculator import ProfileCalculator
+
+
+def _points(count=2000):
+    rng = np.random.default_rng(1)
+    return np.column_stack((rng.uniform(0, 100, count), rng.uniform(0, 100, count), rng.uniform(0, 30, count)))
+
+
+def test_cross_section_points_carry_their_indices():
+    points = _points()
+    section = ProfileCalculator().get_cross_section_points(points, np.array([0.0, 50.0, 0.0]),
+                                                          np.array([100.0, 50.0, 0.0]), tolerance=2.0)
+
+    assert np.array_equal(section["indices"], np.flatnonzero(np.abs(points[:, 1] - 50.0) <= 2.0))
+    assert np.array_equal(section["points"], points[section["indices"]])
+
+
+def test_corridor_selection_matches_brute_force_in_chunks():
+    from profile_line.profile_calculator import corridor_selection
+
+    points = _points(5000)
+    start, end = np.array([10.0, 20.0, 0.0]), np.array([80.0, 90.0, 0.0])
+
+    indices, along, perp = corridor_selection(points.astype(np.float32), start, end, 3.0, chunk_size=700)
+
+    unit = (end - start)[:2] / np.linalg.norm((end - start)[:2])
+    rel = points[:, :2] - start[:2]
+    t = rel @ unit
+    d = np.abs(rel[:, 0] * unit[1] - rel[:, 1] * unit[0])
+    expected = np.flatnonzero((d <= 3.0) & (t >= 0) & (t <= np.linalg.norm((end - start)[:2])))
+    assert np.array_equal(indices, expected)
+    assert np.allclose(along, t[expected], atol=1e-3)
+    assert np.allclose(perp, d[expected], atol=1e-3)
+
+
+def test_cross_section_points_match_per_point_distances_with_and_without_index():
+    from scipy.spatial import cKDTree
+
+    points = _points(3000)
+    calculator = ProfileCalculator()
+    start, end = np.array([20.0, 10.0, 5.0]), np.array([60.0, 70.0, 9.0])
+    perp = np.array([calculator.point_to_line_distance_2d(p, start, end) for p in points])
+    expected = np.flatnonzero(perp <= 4.0)
+
+    plain = calculator.get_cross_section_points(points, start, end, tolerance=4.0, chunk_size=500)
+    indexed = calculator.get_cross_section_points(points, start, end, tolerance=4.0,
+                                                  spatial_index=cKDTree(points[:, :2]))
+
+    unit = (end - start) / np.linalg.norm(end - start)
+    for section in (plain, indexed):
+        assert np.array_equal(section["indices"], expected)
+        assert np.allclose(section["perp_distances"], perp[expected])
+        assert np.allclose(section["line_distances"], (points[expected] - start) @ unit)
+
+
+def test_binned_profile_statistics_match_per_bin_reference():
+    from profile_line.profile_calculator import corridor_selection
+
+    points = _points(20000)
+    start, end = np.array([0.0, 40.0, 0.0]), np.array([100.0, 40.0, 0.0])
+
+    profile = ProfileCalculator().calculate_profile(points, start, end, num_samples=51, tolerance=2.0,
+                                                    percentiles=(10, 50))
+
+    indices, along, _ = corridor_selection(points, start, end, 2.0)
+    bins = np.rint(along / 2.0).astype(int)
+    assert profile["point_counts"].sum() == len(indices)
+    for b in (0, 17, 50):
+        heights = points[indices[bins == b], 2]
+        assert profile["point_counts"][b] == len(heights)
+        assert np.isclose(profile["min_heights"][b], heights.min())
+        assert np.isclose(profile["max_heights"][b], heights.max())
+        assert np.isclose(profile["mean_heights"][b], heights.mean())
+        assert np.isclose(profile["std_heights"][b], heights.std())
+        assert np.isclose(profile["percentile_heights"][50][b], np.percentile(heights, 50))
+        assert np.isclose(profile["percentile_heights"][10][b], np.percentile(heights, 10))
+
+
+def test_polyline_profile_joins_segments_on_a_cumulative_axis():
+    from layers.spatial_index import SpatialIndex
+
+    points = _points(20000)
+    vertices = [(10.0, 10.0, 0.0), (90.0, 10.0, 0.0), (90.0, 70.0, 0.0)]
+    calculator = ProfileCalculator()
+
+    profile = calculator.calculate_polyline_profile(points, vertices, num_samples=71, tolerance=2.0,
+                                                    spatial_index=SpatialIndex(points))
+
+    assert np.allclose(profile["vertex_distances"], [0.0, 80.0, 140.0])
+    assert profile["total_length"] == 140.0
+    distances = profile["distances"]
+    assert distances[0] == 0.0 and np.isclose(distances[-1], 140.0)
+    assert np.all(np.diff(distances) > 0)
+    assert len(distances) == len(profile["mean_heights"]) == len(profile["point_counts"])
+
+    # Samples after the corner match a straight profile of the second segment
+    second = calculator.calculate_profile(points, np.array(vertices[1]), np.array(vertices[2]),
+                                          num_samples=30, tolerance=2.0)
+    after = distances >= 80.0
+    assert np.allclose(distances[after], second["distances"] + 80.0)
+    assert np.array_equal(profile["point_counts"][after], second["point_counts"])
@@ -0,0 +1,49 @@
+import numpy as np
+
+from layers.spatial_index import SpatialIndex
+
+
+def _points(count=5000):
+    rng = np.random.default_rng(2)
+    return np.column_stack((rng.uniform(0, 200, count), rng.uniform(0, 100, count),
+                            rng.uniform(0, 30, count))).astype(np.float32)
+
+
+def test_query_bbox_and_polygon_match_brute_force():
+    points = _points()
+    index = SpatialIndex(points)
+    x, y = points[:, 0], points[:, 1]
+
+    box = index.query_bbox(20.5, 10.0, 75.25, 60.0)
+    assert np.array_equal(box, np.flatnonzero((x >= 20.5) & (x <= 75.25) & (y >= 10.0) & (y <= 60.0)))
+    assert len(index.query_bbox(300, 300, 400, 400)) == 0
+
+    triangle = [(0, 0), (200, 0), (0, 100)]
+    inside = index.query_polygon(triangle)
+    assert np.array_equal(inside, np.flatnonzero(x / 200 + y / 100 < 1))
+
+
+def test_radius_and_nearest_queries_share_one_tree():
+    points = _points()
+    index = SpatialIndex(points)
+
+    near = index.query_radius((100, 50), 5.0)
+    distance = np.hypot(points[:, 0] - 100, points[:, 1] - 50)
+    assert np.array_equal(near, np.flatnonzero(distance <= 5.0))
+
+    tree = index.tree
+    assert index.nearest_3d(points[1234]) == 1234
+    assert index.tree is tree
+
+
+def test_layer_manager_rebuilds_index_when_points_change():
+    from layers.layer_db import LayerManager
+
+    manager = LayerManager()
+    manager.add_layer("a", "a.las", _points(), None)
+    index = manager.get_spatial_index()
+    assert manager.get_spatial_index("a") is index
+
+    manager.replace_layer_points("a", _points(100), None)
+    assert manager.get_spatial_index("a") is not index
+    assert len(manager.get_spatial_index("a")) == 100
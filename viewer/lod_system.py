@@ -7,9 +7,93 @@ for large point cloud datasets.
 """
 
 import numpy as np
-from typing import Tuple, Optional, Dict, Any
+from collections import deque
+from typing import Tuple, Optional, Dict, Any, Callable, Union
 import time
 
+# LOD levels from full detail to coarsest
+LOD_LEVELS = ('close', 'near', 'medium', 'far')
+
+# Point data array holding, for each rendered point, its index in the layer's points
+LAYER_POINT_IDS = "layer_point_ids"
+
+# Deepest voxel level of the LOD ordering (3 x 20 bits fit an int64 Morton code)
+MAX_LOD_ORDER_LEVELS = 20
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """Insert two zero bits between each of the low 21 bits (for 3D Morton codes)."""
+    v = v.astype(np.uint64) & np.uint64(0x1fffff)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1f00000000ffff)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1f0000ff0000ff)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100f00f00f00f00f)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10c30c30c30c30c3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+def voxel_lod_order(points: np.ndarray, seed: int = 0) -> np.ndarray:
+    """
+    Order a layer's points so that every prefix is a spatially uniform subsample.
+
+    The bounding cube is split into nested voxel grids, each level halving the
+    voxel size.  Every voxel keeps one representative (the point with the
+    lowest random rank inside it); a voxel's representative is also the
+    representative of the child voxel it falls in, so the sets are nested.
+    Points are ordered by the coarsest level they represent, randomly within
+    a level, so ``order[:n // factor]`` covers the whole extent evenly
+    regardless of the file's scan order, and switching LOD level is a slice.
+
+    Cost is one shuffle and one sort of the points' Morton codes: after the
+    sort each voxel, at every level, is a contiguous run whose first entry is
+    its lowest-ranked point, and the level a point represents follows from
+    the highest bit in which its code differs from the previous one.
+
+    Returns:
+        np.ndarray: Permutation of range(len(points))
+    """
+    count = len(points)
+    if count == 0:
+        return np.empty(0, dtype=np.intp)
+    levels = int(min(MAX_LOD_ORDER_LEVELS, max(1, np.ceil(np.log2(max(count, 2)) / 2) + 1)))
+    rng = np.random.default_rng(seed)
+    # Random rank = position in this shuffle
+    shuffled = rng.permutation(count)
+    xyz = np.asarray(points[shuffled, :3], dtype=np.float64)
+    mins = xyz.min(axis=0)
+    size = max(float((xyz.max(axis=0) - mins).max()), 1e-9)
+    cells = 1 << levels
+    quantized = np.minimum(((xyz - mins) * (cells / size)).astype(np.int64), cells - 1)
+    del xyz
+    codes = (_spread_bits(quantized[:, 0]) | (_spread_bits(quantized[:, 1]) << np.uint64(1))
+             | (_spread_bits(quantized[:, 2]) << np.uint64(2)))
+    del quantized
+
+    # Stable: within a voxel the lowest rank comes first
+    by_code = np.argsort(codes, kind='stable')
+    sorted_codes = codes[by_code]
+    del codes
+    diff = sorted_codes[1:] ^ sorted_codes[:-1]
+    del sorted_codes
+    # Highest differing bit, split in two halves so float64 log2 stays exact
+    high = diff >> np.uint64(30)
+    low = diff & np.uint64((1 << 30) - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        msb = np.where(high > 0, 30 + np.floor(np.log2(high.astype(np.float64))),
+                       np.floor(np.log2(low.astype(np.float64))))
+    # Voxel levels whose run starts here: level L voxels are 3 * (levels - L) bits wide
+    sorted_level = np.empty(count, dtype=np.int8)
+    sorted_level[0] = 0
+    # Duplicate codes (msb = -inf) share every voxel with their predecessor
+    sorted_level[1:] = levels
+    distinct = np.flatnonzero(diff)
+    sorted_level[1:][distinct] = np.clip(levels - msb[distinct] // 3, 0, levels)
+
+    level_by_rank = np.empty(count, dtype=np.int8)
+    level_by_rank[by_code] = sorted_level
+    return shuffled[np.argsort(level_by_rank, kind='stable')]
+
+
 class LODSystem:
     """
     Level-of-Detail system for optimizing point cloud rendering performance.
@@ -49,7 +133,19 @@ class LODSystem:
             'massive': 1000000  # > 500K: Aggressive LOD
         }
         
-        # Performance tracking
+        # Coarsest-at-least level used while the camera is being dragged
+        self.interaction_level = 'medium'
+        
+        # Layers with at least this many points are drawn through a PointOctree,
+        # showing the visible part of the layer within its share of the budget
+        self.octree_min_points = 5000000
+        
+        # Points drawn across all visible layers, shared out by allocate_point_budget
+        self.scene_point_budget = 20000000
+        # Every visible layer keeps at least this many points (or all of them)
+        self.min_layer_points = 50000
+        
+        # Performance tracking (frame times measured by the viewer's render window)
         self.performance_stats = {
             'last_render_time': 0.0,
             'average_render_time': 0.0,
@@ -57,6 +153,22 @@ class LODSystem:
             'auto_adjustments': 0
         }
         
+        # Adaptive detail: auto_adjust scales the decimation factors up (and the
+        # scene point budget down) by detail_scale to hold target_fps
+        self.target_fps = 30.0
+        self.detail_scale = 1.0
+        self.detail_scale_limits = (0.5, 16.0)
+        # Hysteresis: tighten above 1.25x the target frame time, relax below 0.6x,
+        # in steps of 1.5x / 1.25x, judged on the median of recent frames
+        self.tighten_ratio = 1.25
+        self.relax_ratio = 0.6
+        self.tighten_step = 1.5
+        self.relax_step = 1.25
+        self.adjust_min_frames = 15
+        self.adjust_min_interval = 1.0  # seconds
+        self._recent_frame_times = deque(maxlen=30)
+        self._last_adjust_time = 0.0
+        
         print("[LOD] Level-of-Detail system initialized")
     
     def set_enabled(self, enabled: bool):
@@ -106,7 +218,8 @@ class LODSystem:
             print(f"[LOD] Error getting camera distance: {e}")
             return 1.0
     
-    def determine_lod_level(self, points: np.ndarray, viewer, force_level: Optional[str] = None) -> str:
+    def determine_lod_level(self, points: np.ndarray, viewer, force_level: Optional[str] = None,
+                            interacting: bool = False, scene_size: Optional[float] = None) -> str:
         """
         Determine the appropriate LOD level based on dataset size and camera distance.
         
@@ -114,6 +227,8 @@ class LODSystem:
             points: The point cloud data
             viewer: The viewer instance for camera information
             force_level: Force a specific LOD level (for testing/manual override)
+            interacting: The camera is being dragged; use at least interaction_level
+            scene_size: The points' calculate_scene_size, if already known
             
         Returns:
             str: LOD level ('close', 'near', 'medium', 'far')
@@ -132,41 +247,139 @@ class LODSystem:
         
         # Get camera distance relative to scene size
         camera_distance = self.get_camera_distance(viewer)
-        scene_size = self.calculate_scene_size(points)
+        if scene_size is None:
+            scene_size = self.calculate_scene_size(points)
         relative_distance = camera_distance / scene_size if scene_size > 0 else 1.0
         
         # Determine LOD level based on distance and dataset size
         if relative_distance > self.distance_thresholds['far']:
-            return 'far'
+            level = 'far'
         elif relative_distance > self.distance_thresholds['medium']:
-            return 'medium'
+            level = 'medium'
         elif relative_distance > self.distance_thresholds['near']:
-            return 'near'
+            level = 'near'
         else:
-            return 'close'
+            level = 'close'
+        
+        if interacting and point_count >= self.size_thresholds['medium']:
+            level = max(level, self.interaction_level, key=LOD_LEVELS.index)
+        return level
+    
+    def screen_coverage(self, bounds: Tuple[np.ndarray, np.ndarray], view: Optional[Dict[str, Any]]) -> float:
+        """
+        Fraction of the screen covered by the projection of a bounding box.
+        
+        Args:
+            bounds: (mins, maxs) of the box
+            view: Camera description from PointCloudViewer.get_camera_view
+            
+        Returns:
+            float: 0 (off screen) to 1 (fills the view)
+        """
+        if view is None or view.get('projection') is None:
+            return 0.0
+        mins, maxs = (np.asarray(b, dtype=np.float64) for b in bounds)
+        corners = np.array([[x, y, z, 1.0] for x in (mins[0], maxs[0])
+                            for y in (mins[1], maxs[1]) for z in (mins[2], maxs[2])])
+        clip = corners @ np.asarray(view['projection'], dtype=np.float64).T
+        w = clip[:, 3]
+        if (w <= 1e-12).all():
+            return 0.0  # behind the camera
+        if (w <= 1e-12).any():
+            return 1.0  # the camera is inside or next to the box
+        ndc = clip[:, :2] / w[:, None]
+        lo = np.clip(ndc.min(axis=0), -1.0, 1.0)
+        hi = np.clip(ndc.max(axis=0), -1.0, 1.0)
+        return float(np.prod(hi - lo)) / 4.0
+    
+    def allocate_point_budget(self, layers: Dict[Any, Tuple[int, float]],
+                              budget: Optional[int] = None) -> Dict[Any, int]:
+        """
+        Share a point budget between layers by their screen coverage.
+        
+        Every layer first gets min_layer_points (or all its points); the rest
+        is handed out in proportion to coverage, and what a layer cannot use
+        (it has fewer points than its share) goes to the others.  Without any
+        coverage, shares follow point counts.
+        
+        Args:
+            layers: key -> (point_count, screen_coverage)
+            budget: Total points (point_budget() by default)
+            
+        Returns:
+            dict: key -> number of points to draw
+        """
+        budget = self.point_budget() if budget is None else budget
+        keys = list(layers)
+        if not keys:
+            return {}
+        counts = np.array([layers[k][0] for k in keys], dtype=np.float64)
+        weights = np.array([layers[k][1] for k in keys], dtype=np.float64)
+        if weights.sum() <= 0:
+            weights = counts.copy()
+        allocated = np.minimum(counts, self.min_layer_points)
+        if allocated.sum() > budget:
+            allocated *= budget / allocated.sum()
+        remaining = budget - allocated.sum()
+        while remaining > 0.5:
+            open_ = allocated < counts
+            w = weights * open_
+            if w.sum() <= 0:
+                w = (counts - allocated) * open_
+                if w.sum() <= 0:
+                    break
+            added = np.minimum(remaining * w / w.sum(), counts - allocated)
+            allocated += added
+            remaining -= added.sum()
+            if not (allocated >= counts)[open_].any():
+                break  # nobody reached their point count: all of it was handed out
+        return {k: int(a) for k, a in zip(keys, allocated)}
+    
+    def lod_point_count(self, point_count: int, lod_level: str, max_points: Optional[int] = None) -> int:
+        """Number of points apply_lod keeps for ``lod_level`` (and ``max_points``)."""
+        keep = -(-point_count // self.decimation_factor(lod_level))
+        if max_points is not None:
+            keep = min(keep, max(int(max_points), 1))
+        return keep
     
     def apply_lod(self, points: np.ndarray, scalars: Optional[np.ndarray], 
-                  lod_level: str) -> Tuple[np.ndarray, Optional[np.ndarray], Dict[str, Any]]:
+                  lod_level: str,
+                  order: Union[np.ndarray, Callable[[], np.ndarray], None] = None,
+                  max_points: Optional[int] = None
+                  ) -> Tuple[np.ndarray, Optional[np.ndarray], Dict[str, Any]]:
         """
         Apply Level-of-Detail decimation to point cloud data.
         
+        A level keeps the first ``len(points) / decimation`` entries of the
+        layer's voxel_lod_order, so coverage stays uniform at any level and
+        each level is a superset of the coarser ones.
+        
         Args:
             points: Original point cloud data (N, 3)
             scalars: Optional scalar values for coloring (N,)
             lod_level: LOD level to apply ('close', 'near', 'medium', 'far')
+            order: The points' voxel_lod_order, or a callable returning it (only
+                called when decimating); computed here if not given
+            max_points: Keep at most this many points (the layer's share of the
+                scene budget, see allocate_point_budget)
             
         Returns:
-            Tuple of (decimated_points, decimated_scalars, lod_info)
+            Tuple of (decimated_points, decimated_scalars, lod_info); lod_info['indices']
+            holds the indices of the kept points in ``points`` (None when nothing was dropped)
         """
         start_time = time.time()
         
         if not self.enabled or points is None or len(points) == 0:
-            return points, scalars, {'level': 'close', 'decimation': 1, 'original_count': len(points) if points is not None else 0}
+            return points, scalars, {'level': 'close', 'decimation': 1, 'original_count': len(points) if points is not None else 0,
+                                     'indices': None}
         
         original_count = len(points)
-        decimation_factor = self.decimation_factors.get(lod_level, 1)
+        keep = self.lod_point_count(original_count, lod_level, max_points)
+        decimation_factor = self.decimation_factor(lod_level)
+        if keep < -(-original_count // decimation_factor):
+            decimation_factor = original_count / keep
         
-        if decimation_factor <= 1:
+        if keep >= original_count:
             # No decimation needed
             lod_info = {
                 'level': lod_level,
@@ -174,14 +387,18 @@ class LODSystem:
                 'original_count': original_count,
                 'final_count': original_count,
                 'reduction_percent': 0.0,
-                'processing_time': time.time() - start_time
+                'processing_time': time.time() - start_time,
+                'indices': None
             }
             return points, scalars, lod_info
         
         try:
-            # Apply systematic decimation (every Nth point)
-            # This preserves spatial distribution better than random sampling
-            decimated_indices = np.arange(0, len(points), decimation_factor)
+            # Uniform subsample: a prefix of the nested voxel ordering
+            if callable(order):
+                order = order()
+            if order is None:
+                order = voxel_lod_order(points)
+            decimated_indices = order[:keep]
             decimated_points = points[decimated_indices]
             
             # Apply same decimation to scalars if provided
@@ -198,7 +415,8 @@ class LODSystem:
                 'original_count': original_count,
                 'final_count': final_count,
                 'reduction_percent': reduction_percent,
-                'processing_time': time.time() - start_time
+                'processing_time': time.time() - start_time,
+                'indices': decimated_indices
             }
             
             print(f"[LOD] Applied {lod_level} LOD: {original_count:,} → {final_count:,} points "
@@ -216,10 +434,35 @@ class LODSystem:
                 'final_count': original_count,
                 'reduction_percent': 0.0,
                 'processing_time': time.time() - start_time,
-                'error': str(e)
+                'error': str(e),
+                'indices': None
             }
             return points, scalars, lod_info
     
+    def apply_selection(self, points: np.ndarray, scalars: Optional[np.ndarray], indices: np.ndarray,
+                        level: str = 'octree') -> Tuple[np.ndarray, Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Like apply_lod, for a subset chosen elsewhere (e.g. PointOctree.select).
+        
+        Returns:
+            Tuple of (selected_points, selected_scalars, lod_info)
+        """
+        start_time = time.time()
+        original_count = len(points)
+        selected_points = points[indices]
+        selected_scalars = scalars[indices] if scalars is not None else None
+        final_count = len(indices)
+        lod_info = {
+            'level': level,
+            'decimation': original_count / final_count if final_count else 1,
+            'original_count': original_count,
+            'final_count': final_count,
+            'reduction_percent': ((original_count - final_count) / original_count * 100) if original_count else 0.0,
+            'processing_time': time.time() - start_time,
+            'indices': indices
+        }
+        return selected_points, selected_scalars, lod_info
+    
     def get_adaptive_decimation(self, point_count: int) -> int:
         """
         Get adaptive decimation factor based on dataset size.
@@ -239,10 +482,22 @@ class LODSystem:
         else:
             return 10  # Aggressive decimation for massive datasets
     
+    def decimation_factor(self, lod_level: str) -> int:
+        """Decimation factor of a level, scaled by the adaptive detail_scale."""
+        return max(1, int(round(self.decimation_factors.get(lod_level, 1) * self.detail_scale)))
+    
+    def point_budget(self) -> int:
+        """
+        Scene point budget, scaled by the adaptive detail_scale.  Adapting only
+        lowers it: scene_point_budget stays the cap however fast frames are.
+        """
+        return min(self.scene_point_budget, int(self.scene_point_budget / self.detail_scale))
+    
     def update_performance_stats(self, render_time: float):
-        """Update performance statistics for auto-adjustment"""
+        """Record the duration of one rendered frame (seconds)"""
         self.performance_stats['last_render_time'] = render_time
         self.performance_stats['render_count'] += 1
+        self._recent_frame_times.append(render_time)
         
         # Calculate rolling average
         if self.performance_stats['render_count'] == 1:
@@ -255,14 +510,52 @@ class LODSystem:
                 (1 - alpha) * self.performance_stats['average_render_time']
             )
     
+    def _frame_time_trend(self) -> Optional[str]:
+        """'tighten', 'relax' or None from the median of the frames since the last adjustment."""
+        if len(self._recent_frame_times) < self.adjust_min_frames:
+            return None
+        # Median, so one slow frame (e.g. uploading a new layer) does not count as a trend
+        frame_time = float(np.median(self._recent_frame_times))
+        target = 1.0 / self.target_fps
+        if frame_time > target * self.tighten_ratio and self.detail_scale < self.detail_scale_limits[1]:
+            return 'tighten'
+        if frame_time < target * self.relax_ratio and self.detail_scale > self.detail_scale_limits[0]:
+            return 'relax'
+        return None
+    
     def should_auto_adjust(self) -> bool:
         """Determine if automatic LOD adjustment is needed based on performance"""
-        if not self.auto_mode:
+        if not self.auto_mode or not self.enabled:
             return False
+        if time.time() - self._last_adjust_time < self.adjust_min_interval:
+            return False
+        return self._frame_time_trend() is not None
+    
+    def auto_adjust(self) -> bool:
+        """
+        Tighten or relax detail_scale when recent frames miss the target frame
+        rate (see the hysteresis settings in __init__).  Frame times are
+        collected afresh after each change, so it is judged on its own frames.
         
-        # If average render time is too high, suggest more aggressive LOD
-        target_render_time = 0.05  # 50ms target for smooth interaction
-        return self.performance_stats['average_render_time'] > target_render_time
+        Returns:
+            bool: True if detail_scale changed (the caller re-applies LOD)
+        """
+        if not self.should_auto_adjust():
+            return False
+        trend = self._frame_time_trend()
+        low, high = self.detail_scale_limits
+        if trend == 'tighten':
+            scale = min(high, self.detail_scale * self.tighten_step)
+        else:
+            scale = max(low, self.detail_scale / self.relax_step)
+        frame_time = float(np.median(self._recent_frame_times))
+        print(f"[LOD] Auto-adjust ({trend}): median frame {frame_time * 1000:.1f}ms vs target "
+              f"{1000 / self.target_fps:.1f}ms, detail scale {self.detail_scale:.2f} -> {scale:.2f}")
+        self.detail_scale = scale
+        self.performance_stats['auto_adjustments'] += 1
+        self._recent_frame_times.clear()
+        self._last_adjust_time = time.time()
+        return True
     
     def get_lod_summary(self) -> Dict[str, Any]:
         """Get a summary of current LOD system status"""
@@ -271,6 +564,8 @@ class LODSystem:
             'auto_mode': self.auto_mode,
             'distance_thresholds': self.distance_thresholds,
             'decimation_factors': self.decimation_factors,
+            'detail_scale': self.detail_scale,
+            'target_fps': self.target_fps,
             'performance_stats': self.performance_stats.copy()
         }
     
@@ -17,6 +17,7 @@ class PlotterUpdateManager:
         self._batch_mode = False
         self._debounce_timer = None
         self._debounce_delay = 50  # milliseconds
+        self._debounced_calls = {}  # key -> single-shot QTimer
         
     def request_update(self, immediate: bool = False):
         """
@@ -50,6 +51,22 @@ class PlotterUpdateManager:
         if self._debounce_timer is not None:
             self._debounce_timer = None
     
+    def debounce(self, key: str, callback, delay_ms: Optional[int] = None):
+        """
+        Run ``callback`` once, ``delay_ms`` after the last debounce call with
+        the same ``key`` (a burst of calls restarts the wait each time)
+        """
+        timer = self._debounced_calls.get(key)
+        if timer is None:
+            timer = QTimer()
+            timer.setSingleShot(True)
+            self._debounced_calls[key] = timer
+        else:
+            timer.stop()
+            timer.timeout.disconnect()
+        timer.timeout.connect(callback)
+        timer.start(self._debounce_delay if delay_ms is None else delay_ms)
+    
     def start_batch_mode(self):
         """Start batching updates - no updates will occur until end_batch_mode"""
         self._batch_mode = True
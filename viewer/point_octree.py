@@ -0,0 +1,166 @@
+"""
+Octree partition of a layer for view-dependent rendering.
+
+Very large layers cannot be drawn whole.  PointOctree splits a layer's
+bounding cube into a regular octree and stores the point indices grouped by
+leaf, shuffled within each leaf, so any prefix of a leaf's run is an unbiased
+subsample of that leaf.  select() culls the leaves outside the camera
+frustum and gives each visible leaf a share of a fixed point budget by its
+projected size on screen: a zoomed-in corner of a huge tile is drawn at full
+density, while the whole tile seen from afar stays within the same budget.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from .lod_system import _spread_bits, get_lod_system, voxel_lod_order
+
+# Leaf keys are Morton codes of at most 3 x 5 bits, so they fit uint16, which numpy sorts by radix
+MAX_OCTREE_DEPTH = 5
+# Aim for about this many points per leaf
+LEAF_POINTS = 65536
+# Points drawn per pixel of a leaf's projected size
+POINTS_PER_PIXEL = 1.0
+OCTREE_CHUNK_SIZE = 4_000_000
+
+
+class PointOctree:
+    """Leaf-grouped point ordering of an Nx3 array with frustum/screen-size selection."""
+
+    def __init__(self, points: np.ndarray, leaf_points: int = LEAF_POINTS, seed: int = 0):
+        count = len(points)
+        self.count = count
+        # Occupied leaves grow about 4x per level for terrain-like clouds
+        depth = 0
+        while depth < MAX_OCTREE_DEPTH and count / 4 ** depth > leaf_points:
+            depth += 1
+        self.depth = depth
+        cells = 1 << depth
+        if count:
+            self.mins = np.asarray(points[:, :3].min(axis=0), dtype=np.float64)
+            self.size = max(float((points[:, :3].max(axis=0) - self.mins).max()), 1e-9)
+        else:
+            self.mins = np.zeros(3)
+            self.size = 1.0
+        self.leaf_size = self.size / cells
+
+        keys = np.empty(count, dtype=np.uint16)
+        for start in range(0, count, OCTREE_CHUNK_SIZE):
+            chunk = np.asarray(points[start:start + OCTREE_CHUNK_SIZE, :3], dtype=np.float64)
+            cell = np.minimum(((chunk - self.mins) / self.leaf_size).astype(np.int64), cells - 1)
+            keys[start:start + len(chunk)] = (
+                _spread_bits(cell[:, 0]) | (_spread_bits(cell[:, 1]) << np.uint64(1))
+                | (_spread_bits(cell[:, 2]) << np.uint64(2))
+            )
+        # Shuffle, then a stable sort by leaf: leaf runs in random order within
+        shuffled = np.random.default_rng(seed).permutation(count)
+        order = shuffled[np.argsort(keys[shuffled], kind='stable')]
+        self.order = order.astype(np.int32) if count < 2 ** 31 else order
+
+        counts = np.bincount(keys, minlength=cells ** 3)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        occupied = np.flatnonzero(counts)
+        self.leaf_counts = counts[occupied]
+        self.leaf_starts = starts[occupied]
+        self.leaf_mins = self.mins + _leaf_cells(occupied, depth) * self.leaf_size
+        print(f"[OCTREE] {count:,} points in {len(occupied):,} leaves (depth {depth})")
+
+    def __len__(self):
+        return self.count
+
+    def state(self) -> Dict:
+        """Everything but ``order``, for rebuilding the octree elsewhere (from_state) without sorting again."""
+        return {name: value for name, value in vars(self).items() if name != 'order'}
+
+    @classmethod
+    def from_state(cls, state: Dict, order: np.ndarray) -> "PointOctree":
+        """Octree from another one's state() and point ordering (e.g. built in a worker process)."""
+        octree = cls.__new__(cls)
+        vars(octree).update(state)
+        octree.order = order
+        return octree
+
+    def select(self, budget: int, view: Optional[Dict] = None) -> np.ndarray:
+        """
+        Indices of at most ``budget`` points to draw for ``view``.
+
+        Args:
+            budget: Maximum number of points
+            view: Camera description from PointCloudViewer.get_camera_view; without
+                one every leaf counts as visible with a share proportional to its size,
+                i.e. a uniform subsample of the whole layer
+
+        Returns:
+            np.ndarray: Indices into the layer's points, grouped by leaf
+        """
+        counts = self.leaf_counts
+        if view is None:
+            wanted = counts.astype(np.float64)
+        else:
+            visible = self._in_frustum(view['planes'])
+            wanted = np.where(visible, np.minimum(counts, self._projected_pixels(view) ** 2 * POINTS_PER_PIXEL), 0.0)
+        total = wanted.sum()
+        if total > budget:
+            wanted *= budget / total
+        take = np.minimum(np.floor(wanted).astype(np.int64), counts)
+        keep = take > 0
+        take, starts = take[keep], self.leaf_starts[keep]
+        # Concatenated ranges starts[i]:starts[i] + take[i]
+        offsets = np.arange(take.sum()) + np.repeat(starts - (np.cumsum(take) - take), take)
+        return self.order[offsets]
+
+    def _in_frustum(self, planes: np.ndarray) -> np.ndarray:
+        """Leaves whose box is not entirely behind any of the (inward facing) planes."""
+        lo = self.leaf_mins
+        hi = lo + self.leaf_size
+        normals, offsets = planes[:, :3], planes[:, 3]
+        # The corner of each box furthest along each plane's normal
+        corners = np.where(normals[None, :, :] > 0, hi[:, None, :], lo[:, None, :])
+        return (np.einsum('lpk,pk->lp', corners, normals) + offsets >= 0).all(axis=1)
+
+    def _projected_pixels(self, view: Dict) -> np.ndarray:
+        """Approximate on-screen size, in pixels, of each leaf."""
+        if view.get('parallel_scale'):
+            return np.full(len(self.leaf_counts), self.leaf_size / (2 * view['parallel_scale']) * view['height'])
+        centers = self.leaf_mins + self.leaf_size / 2
+        distance = np.maximum(np.linalg.norm(centers - np.asarray(view['position']), axis=1), self.leaf_size / 2)
+        return self.leaf_size / (2 * distance * np.tan(np.radians(view['view_angle']) / 2)) * view['height']
+
+
+def build_layer_lod(points: np.ndarray, octree_min_points: Optional[int] = None) -> Dict:
+    """
+    Build the structures LayerManager draws a layer with, ahead of its first
+    draw (e.g. on a load worker's thread instead of the GUI thread).
+
+    Layers of at least ``octree_min_points`` points (LODSystem.octree_min_points
+    by default) are drawn through a PointOctree, smaller ones by prefixes of
+    voxel_lod_order.
+
+    Returns:
+        dict: lod_order, octree (one of them None) and bounds (mins, maxs or
+        None when empty), for LayerManager.add_layer / replace_layer_points
+    """
+    if octree_min_points is None:
+        octree_min_points = get_lod_system().octree_min_points
+    count = len(points)
+    structures = {'lod_order': None, 'octree': None, 'bounds': None}
+    if count == 0:
+        return structures
+    structures['bounds'] = (np.asarray(points.min(axis=0), dtype=np.float64),
+                            np.asarray(points.max(axis=0), dtype=np.float64))
+    if count >= octree_min_points:
+        structures['octree'] = PointOctree(points)
+    else:
+        structures['lod_order'] = voxel_lod_order(points)
+    return structures
+
+
+def _leaf_cells(keys: np.ndarray, depth: int) -> np.ndarray:
+    """Decode leaf Morton keys into (i, j, k) cell coordinates."""
+    cells = np.zeros((len(keys), 3), dtype=np.int64)
+    keys = keys.astype(np.int64)
+    for bit in range(depth):
+        for axis in range(3):
+            cells[:, axis] |= ((keys >> (3 * bit + axis)) & 1) << bit
+    return cells
@@ -4,7 +4,7 @@ import pyvista as pv
 from pyvistaqt import QtInteractor
 from PyQt6.QtWidgets import QWidget, QHBoxLayout
 from .plotter_update_manager import PlotterUpdateManager
-from .lod_system import get_lod_system
+from .lod_system import get_lod_system, LAYER_POINT_IDS
 import time
 import numpy as np
 
@@ -124,6 +124,23 @@ class PointCloudViewer(QWidget):
         self.lod_system = get_lod_system()
         print("[PERFORMANCE] LOD system initialized for point cloud viewer")
 
+        # Preview of a cloud that is still loading (see begin_progressive_display)
+        self._progressive_chunks = None
+        self._progressive_preview_budget = 2_000_000
+        self._progressive_refresh_interval = 0.25  # seconds
+
+        # Callbacks run once the camera settles (see add_view_changed_callback)
+        self._view_changed_callbacks = []
+        self._view_observers_added = False
+        self._view_changed_delay_ms = 300
+        # Callbacks run when a camera drag starts moving (see add_interaction_started_callback)
+        self._interaction_callbacks = []
+        self._interaction_moving = False
+
+        # Frame times feed the LOD system's adaptive detail (see _on_render_end)
+        self._render_start_time = None
+        self._add_frame_timing()
+
     def set_performance_mode(self, mode="auto"):
         """
         Set rendering performance mode.
@@ -201,7 +218,29 @@ class PointCloudViewer(QWidget):
                 print(f"[PERFORMANCE] Large dataset detected ({point_count:,} points) - using flat point rendering for better performance")
             return use_spheres
 
-    def display_point_cloud(self, points, scalars=None, cmap=None, return_actor=False, show_scalar_bar=False, return_lod_info=False):
+    def make_point_mesh(self, points):
+        """
+        Wrap an Nx3 point array in a PolyData that shares its memory.
+
+        The array is handed to VTK without a copy when it is C-contiguous with a
+        float dtype, so a layer's points and its rendered mesh are one buffer.
+        """
+        points = np.ascontiguousarray(points)
+        return pv.PolyData(points, deep=False)
+
+    def display_point_cloud(self, points, scalars=None, cmap=None, return_actor=False, show_scalar_bar=False, return_lod_info=False, mesh=None,
+                            lod_order=None, lod_indices=None, max_points=None):
+        """
+        Add a point cloud actor to the plotter.
+
+        If ``mesh`` (from make_point_mesh) is given and no decimation is applied,
+        the actor renders a shallow copy of it, reusing the layer's point buffer
+        instead of building a new one.  ``lod_order`` is the layer's cached
+        LOD ordering (or a callable returning it), see LODSystem.apply_lod.
+        ``lod_indices`` draws that subset instead of choosing an LOD level
+        (e.g. a PointOctree selection).  ``max_points`` caps the LOD subset
+        (the layer's share of the scene point budget).
+        """
         print(f"[DEBUG] display_point_cloud called: points.shape={getattr(points, 'shape', None)}, return_actor={return_actor}, show_scalar_bar={show_scalar_bar}")
         
         # Performance optimization: determine rendering mode based on dataset size
@@ -210,8 +249,9 @@ class PointCloudViewer(QWidget):
         
         # Apply LOD (Level-of-Detail) processing for performance optimization
         start_time = time.time()
-        lod_level = self.lod_system.determine_lod_level(points, self)
-        lod_points, lod_scalars, lod_info = self.lod_system.apply_lod(points, scalars, lod_level)
+        lod_points, lod_scalars, lod_info = self._apply_lod(points, scalars, lod_order=lod_order, lod_indices=lod_indices,
+                                                            max_points=max_points)
+        lod_level = lod_info['level']
         
         # Log LOD performance information
         if lod_info['decimation'] > 1:
@@ -228,7 +268,7 @@ class PointCloudViewer(QWidget):
         actor = None
         
         # Use LOD-processed points and scalars for rendering
-        render_points = lod_points
+        render_points = self._lod_render_points(points, lod_points, lod_info, mesh)
         render_scalars = lod_scalars
         
         scalars_array = None
@@ -271,10 +311,7 @@ class PointCloudViewer(QWidget):
                 point_size=point_size, 
                 pickable=True
             )
-        
-        # Update performance statistics
-        render_time = time.time() - start_time
-        self.lod_system.update_performance_stats(render_time)
+        print(f"[PERFORMANCE] Point cloud actor ready in {(time.time() - start_time) * 1000:.1f}ms")
         
         self.update_manager.request_update()
         
@@ -287,3 +324,220 @@ class PointCloudViewer(QWidget):
             return actor
         else:
             return None
+
+    def _lod_render_points(self, points, lod_points, lod_info, mesh=None):
+        """What to hand the mapper for an apply_lod result: the layer mesh, a new mesh, or the array."""
+        if mesh is not None and lod_points is points:
+            # Shallow copy shares the point buffer; scalars attach to the copy only
+            return mesh.copy(deep=False)
+        if lod_info.get('indices') is not None:
+            # Carry each rendered point's index in the layer so picks map back to it
+            render_points = self.make_point_mesh(lod_points)
+            render_points.point_data[LAYER_POINT_IDS] = lod_info['indices']
+            return render_points
+        return lod_points
+
+    def _apply_lod(self, points, scalars, lod_level=None, lod_order=None, lod_indices=None, max_points=None):
+        if lod_indices is not None:
+            return self.lod_system.apply_selection(points, scalars, lod_indices)
+        if lod_level is None:
+            lod_level = self.lod_system.determine_lod_level(points, self)
+        return self.lod_system.apply_lod(points, scalars, lod_level, order=lod_order, max_points=max_points)
+
+    def get_camera_view(self):
+        """
+        Describe the camera for view-dependent selection (PointOctree.select).
+
+        Returns:
+            dict: planes (4x4 inward facing side planes of the view frustum, a, b,
+            c, d with ax + by + cz + d >= 0 inside), projection (4x4 matrix from
+            scene to clip coordinates), position, view_angle, parallel_scale
+            (None in perspective) and height (pixels)
+        """
+        camera = self.plotter.camera
+        width, height = self.plotter.window_size
+        height = max(1, height)
+        aspect = max(1, width) / height
+        planes = [0.0] * 24
+        camera.GetFrustumPlanes(aspect, planes)
+        matrix = camera.GetCompositeProjectionTransformMatrix(aspect, -1, 1)
+        return {
+            # Left, right, bottom, top; near/far follow the clipping range of what is drawn now
+            'planes': np.asarray(planes, dtype=np.float64).reshape(6, 4)[:4],
+            'projection': np.array([[matrix.GetElement(i, j) for j in range(4)] for i in range(4)]),
+            'position': np.asarray(camera.GetPosition(), dtype=np.float64),
+            'view_angle': camera.GetViewAngle(),
+            'parallel_scale': camera.GetParallelScale() if camera.GetParallelProjection() else None,
+            'height': height,
+        }
+
+    def swap_actor_points(self, actor, points, scalars, lod_level, mesh=None, lod_order=None, lod_indices=None,
+                          max_points=None):
+        """
+        Show another LOD level of a displayed cloud without rebuilding its actor.
+
+        The actor keeps its mapper, colour mapping and properties; only the
+        mapper's input is replaced by the ``lod_level`` subset of ``points``
+        (capped at ``max_points``, or the ``lod_indices`` subset if given) and
+        of ``scalars``, stored under the array name the mapper colours by.
+
+        Returns:
+            dict: lod_info of the new subset
+        """
+        lod_points, lod_scalars, lod_info = self._apply_lod(points, scalars, lod_level, lod_order, lod_indices,
+                                                            max_points)
+        render_points = self._lod_render_points(points, lod_points, lod_info, mesh)
+        if not isinstance(render_points, pv.PolyData):
+            render_points = self.make_point_mesh(render_points)
+        mapper = actor.GetMapper()
+        if lod_scalars is not None:
+            name = mapper.GetArrayName()
+            if not name and mapper.GetInput() is not None:
+                name = pv.wrap(mapper.GetInput()).active_scalars_name
+            render_points.point_data[name or 'Data'] = np.asarray(lod_scalars)
+            render_points.set_active_scalars(name or 'Data')
+        mapper.SetInputData(render_points)
+        return lod_info
+
+    def add_view_changed_callback(self, callback, delay_ms=300):
+        """
+        Call ``callback()`` once the camera has settled after the user rotates,
+        pans or zooms, debounced by ``delay_ms`` so a drag triggers one call.
+        """
+        self._add_view_observers()
+        self._view_changed_delay_ms = delay_ms
+        self._view_changed_callbacks.append(callback)
+
+    def add_interaction_started_callback(self, callback):
+        """Call ``callback()`` as soon as a camera drag starts moving (once per drag)."""
+        self._add_view_observers()
+        self._interaction_callbacks.append(callback)
+
+    def _add_view_observers(self):
+        if self._view_observers_added:
+            return
+        self._view_observers_added = True
+        for event in ("EndInteractionEvent", "MouseWheelForwardEvent", "MouseWheelBackwardEvent"):
+            self.plotter.iren.add_observer(event, self._schedule_view_changed)
+        # InteractionEvent (not StartInteractionEvent) so a plain click does not count as a drag
+        self.plotter.iren.add_observer("InteractionEvent", self._on_interaction)
+
+    def _on_interaction(self, *args):
+        if self._interaction_moving:
+            return
+        self._interaction_moving = True
+        for callback in list(self._interaction_callbacks):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[WARN] Interaction callback failed: {e}")
+
+    def _add_frame_timing(self):
+        """Time every frame the render window draws, from its StartEvent to its EndEvent."""
+        try:
+            ren_win = self.plotter.ren_win
+            ren_win.AddObserver("StartEvent", self._on_render_start)
+            ren_win.AddObserver("EndEvent", self._on_render_end)
+        except Exception as e:
+            print(f"[WARN] Frame timing unavailable: {e}")
+
+    def _on_render_start(self, *args):
+        self._render_start_time = time.perf_counter()
+
+    def _on_render_end(self, *args):
+        if self._render_start_time is None:
+            return
+        self.lod_system.update_performance_stats(time.perf_counter() - self._render_start_time)
+        self._render_start_time = None
+        if self.lod_system.auto_adjust() and not self._interaction_moving:
+            # Re-apply LOD with the new detail scale once this frame is done; a
+            # drag in progress picks it up when it ends
+            self.update_manager.debounce("view_changed", self._on_view_changed, self._view_changed_delay_ms)
+
+    def _schedule_view_changed(self, *args):
+        self._interaction_moving = False
+        self.update_manager.debounce("view_changed", self._on_view_changed, self._view_changed_delay_ms)
+
+    def _on_view_changed(self):
+        for callback in list(self._view_changed_callbacks):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[WARN] View changed callback failed: {e}")
+
+    def get_view_footprint(self):
+        """
+        Estimate what the camera sees, in scene coordinates.
+
+        Returns:
+            tuple: ((xmin, ymin, xmax, ymax) around the focal point covering the
+            view at any rotation, scene units per screen pixel at the focal point)
+        """
+        camera = self.plotter.camera
+        width, height = self.plotter.window_size
+        height = max(1, height)
+        if camera.GetParallelProjection():
+            half_height = camera.GetParallelScale()
+        else:
+            half_height = camera.GetDistance() * np.tan(np.radians(camera.GetViewAngle()) / 2)
+        half_width = half_height * max(1, width) / height
+        radius = float(np.hypot(half_width, half_height))
+        fx, fy, _ = camera.GetFocalPoint()
+        return (fx - radius, fy - radius, fx + radius, fy + radius), 2 * half_height / height
+
+    def begin_progressive_display(self, expected_count=0):
+        """
+        Start previewing a point cloud that is still being loaded.
+
+        Chunks passed to append_progressive_chunk are subsampled so the preview
+        never exceeds _progressive_preview_budget points, and the preview actor
+        is rebuilt at most every _progressive_refresh_interval seconds.
+        """
+        self.end_progressive_display()
+        budget = self._progressive_preview_budget
+        self._progressive_stride = max(1, int(np.ceil(expected_count / budget))) if expected_count else 1
+        self._progressive_chunks = []
+        self._progressive_count = 0
+        self._progressive_last_refresh = 0.0
+        self._progressive_shown = False
+
+    def append_progressive_chunk(self, points):
+        """Add a freshly decoded chunk of XYZ to the loading preview."""
+        if self._progressive_chunks is None or points is None or len(points) == 0:
+            return
+        if self._progressive_count >= self._progressive_preview_budget:
+            return
+        sample = np.asarray(points)[::self._progressive_stride]
+        self._progressive_chunks.append(sample)
+        self._progressive_count += len(sample)
+        if not self._progressive_shown or time.time() - self._progressive_last_refresh >= self._progressive_refresh_interval:
+            self._refresh_progressive_actor()
+
+    def _refresh_progressive_actor(self):
+        if not self._progressive_chunks:
+            return
+        preview = np.concatenate(self._progressive_chunks) if len(self._progressive_chunks) > 1 else self._progressive_chunks[0]
+        self._progressive_chunks = [preview]
+        self.plotter.add_points(
+            preview,
+            color="#3daee9",
+            render_points_as_spheres=False,
+            point_size=getattr(self, '_point_size', 3),
+            name='progressive_preview',
+            reset_camera=not self._progressive_shown,
+            pickable=False
+        )
+        self._progressive_shown = True
+        self._progressive_last_refresh = time.time()
+        self.update_manager.request_update(immediate=True)
+
+    def end_progressive_display(self):
+        """Remove the loading preview (the finished layer is drawn normally)."""
+        if self._progressive_chunks is None:
+            return
+        self._progressive_chunks = None
+        try:
+            self.plotter.remove_actor('progressive_preview')
+        except Exception as e:
+            print(f"[WARN] Could not remove loading preview: {e}")
+        self.update_manager.request_update()
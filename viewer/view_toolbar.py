@@ -56,6 +56,13 @@ class ViewToolbar(QToolBar):
         self.height_profile_action.setChecked(False)
         self.height_profile_action.triggered.connect(self._toggle_height_profile)
         self.addAction(self.height_profile_action)
+        
+        # Add polyline profile toggle action (click vertices, Enter to finish)
+        self.polyline_profile_action = QAction("Polyline Profile", self)
+        self.polyline_profile_action.setCheckable(True)
+        self.polyline_profile_action.setChecked(False)
+        self.polyline_profile_action.triggered.connect(self._toggle_polyline_profile)
+        self.addAction(self.polyline_profile_action)
 
     def _toggle_point_picking(self):
         print("[DEBUG] Point picking toggle triggered.")
@@ -90,6 +97,9 @@ class ViewToolbar(QToolBar):
         print("[DEBUG] Height profile toggle triggered.")
         if hasattr(self.main_window, '_toggle_height_profile_mode'):
             new_state = self.height_profile_action.isChecked()
+            if new_state and self.polyline_profile_action.isChecked():
+                self.polyline_profile_action.setChecked(False)
+                self.polyline_profile_action.setText("Polyline Profile")
             self.main_window._toggle_height_profile_mode(new_state)
             if new_state:
                 self.height_profile_action.setText("Cancel Profile")
@@ -97,3 +107,18 @@ class ViewToolbar(QToolBar):
                 self.height_profile_action.setText("Height Profile")
         else:
             print("[WARN] MainWindow missing _toggle_height_profile_mode method.")
+
+    def _toggle_polyline_profile(self):
+        print("[DEBUG] Polyline profile toggle triggered.")
+        if hasattr(self.main_window, '_toggle_height_profile_mode'):
+            new_state = self.polyline_profile_action.isChecked()
+            if new_state and self.height_profile_action.isChecked():
+                self.height_profile_action.setChecked(False)
+                self.height_profile_action.setText("Height Profile")
+            self.main_window._toggle_height_profile_mode(new_state, polyline=True)
+            if new_state:
+                self.polyline_profile_action.setText("Cancel Polyline")
+            else:
+                self.polyline_profile_action.setText("Polyline Profile")
+        else:
+            print("[WARN] MainWindow missing _toggle_height_profile_mode method.")